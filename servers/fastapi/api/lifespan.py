@@ -1,9 +1,17 @@
+import asyncio
 from contextlib import asynccontextmanager
 import os
 
 from fastapi import FastAPI
 
-from services.database import create_db_and_tables
+from services.asset_downloader_service import ASSET_DOWNLOADER_SERVICE
+from services.database import async_session_maker, create_db_and_tables
+from services.docling_service import DOCLING_SERVICE
+from services.icon_finder_service import ICON_FINDER_SERVICE
+from services.image_asset_store_service import IMAGE_ASSET_STORE_SERVICE
+from services.image_rendition_service import IMAGE_RENDITION_SERVICE
+from services.pdf_page_image_service import PDF_PAGE_IMAGE_SERVICE
+from services.stock_image_provider_service import STOCK_IMAGE_PROVIDER_SERVICE
 from utils.get_env import get_app_data_directory_env
 from utils.model_availability import (
     check_llm_and_image_provider_api_or_model_availability,
@@ -23,4 +31,18 @@ async def app_lifespan(_: FastAPI):
     
     await create_db_and_tables()
     await check_llm_and_image_provider_api_or_model_availability()
+    # Icon index loads in the background, readiness is at /api/v1/ppt/icons/health
+    icons_warm_up_task = asyncio.create_task(ICON_FINDER_SERVICE.warm_up())
+    docling_prewarm_task = asyncio.create_task(DOCLING_SERVICE.prewarm())
+    image_gc_task = asyncio.create_task(
+        IMAGE_ASSET_STORE_SERVICE.run_garbage_collector(async_session_maker)
+    )
     yield
+    icons_warm_up_task.cancel()
+    docling_prewarm_task.cancel()
+    image_gc_task.cancel()
+    await ASSET_DOWNLOADER_SERVICE.close()
+    await STOCK_IMAGE_PROVIDER_SERVICE.close()
+    DOCLING_SERVICE.shutdown()
+    PDF_PAGE_IMAGE_SERVICE.shutdown()
+    IMAGE_RENDITION_SERVICE.shutdown()
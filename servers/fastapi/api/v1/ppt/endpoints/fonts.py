@@ -1,11 +1,11 @@
 import os
 import uuid
-import shutil
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, File, UploadFile
 from pydantic import BaseModel
 from utils.asset_directory_utils import get_app_data_directory_env
+from utils.upload_utils import save_upload_file
 import uuid
 
 try:
@@ -164,8 +164,7 @@ async def upload_font(
         font_path = os.path.join(fonts_dir, unique_filename)
         
         # Save the uploaded file
-        with open(font_path, "wb") as buffer:
-            shutil.copyfileobj(font_file.file, buffer)
+        await save_upload_file(font_file, font_path)
         
         # Generate accessible URL
         font_url = f"/app_data/fonts/{unique_filename}"
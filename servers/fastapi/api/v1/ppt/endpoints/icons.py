@@ -1,5 +1,6 @@
 from typing import List
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from services.icon_finder_service import ICON_FINDER_SERVICE
 
 ICONS_ROUTER = APIRouter(prefix="/icons", tags=["Icons"])
@@ -8,3 +9,12 @@ ICONS_ROUTER = APIRouter(prefix="/icons", tags=["Icons"])
 @ICONS_ROUTER.get("/search", response_model=List[str])
 async def search_icons(query: str, limit: int = 20):
     return await ICON_FINDER_SERVICE.search_icons(query, limit)
+
+
+@ICONS_ROUTER.get("/health")
+async def get_icons_health():
+    """Reports whether the icon index is loaded, with 503 until it is"""
+    status = ICON_FINDER_SERVICE.get_status()
+    return JSONResponse(
+        status_code=200 if status["status"] == "ready" else 503, content=status
+    )
@@ -1,16 +1,26 @@
 from typing import List
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from constants.assets import IMAGE_RENDITION_CACHE_CONTROL
 from models.image_prompt import ImagePrompt
 from models.sql.image_asset import ImageAsset
 from services.database import get_async_session
+from services.image_asset_store_service import IMAGE_ASSET_STORE_SERVICE
+from services.image_generation_scheduler_service import (
+    IMAGE_GENERATION_SCHEDULER_SERVICE,
+)
 from services.image_generation_service import ImageGenerationService
+from services.image_rendition_service import IMAGE_RENDITION_SERVICE
+from services.stock_image_cache_service import STOCK_IMAGE_CACHE_SERVICE
+from services.stock_image_provider_service import STOCK_IMAGE_PROVIDER_SERVICE
 from utils.asset_directory_utils import get_images_directory
 import os
 import uuid
-from utils.file_utils import get_file_name_with_random_uuid
+from utils.file_utils import get_file_ext_or_none
+from utils.upload_utils import save_upload_file
 
 IMAGES_ROUTER = APIRouter(prefix="/images", tags=["Images"])
 
@@ -23,7 +33,8 @@ async def generate_image(
     image_prompt = ImagePrompt(prompt=prompt)
     image_generation_service = ImageGenerationService(images_directory)
 
-    image = await image_generation_service.generate_image(image_prompt)
+    # Asked for explicitly, e.g. to replace an image, so never a previous one
+    image = await image_generation_service.generate_image(image_prompt, reuse=False)
     if not isinstance(image, ImageAsset):
         return image
 
@@ -48,25 +59,74 @@ async def get_generated_images(sql_session: AsyncSession = Depends(get_async_ses
         )
 
 
+@IMAGES_ROUTER.get("/stock/usage")
+async def get_stock_image_usage():
+    return {
+        "cache": STOCK_IMAGE_CACHE_SERVICE.get_stats(),
+        "providers": STOCK_IMAGE_PROVIDER_SERVICE.get_metrics(),
+    }
+
+
+@IMAGES_ROUTER.get("/generation/metrics")
+async def get_image_generation_metrics():
+    return IMAGE_GENERATION_SCHEDULER_SERVICE.get_metrics()
+
+
+@IMAGES_ROUTER.get("/storage")
+async def get_image_storage_stats(
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    return await IMAGE_ASSET_STORE_SERVICE.get_storage_stats(sql_session)
+
+
+@IMAGES_ROUTER.get("/renditions/{variant}/{rendition_path:path}")
+async def get_image_rendition(variant: str, rendition_path: str):
+    """
+    Serves a WebP variant of an image, rendering it on the first request.
+    Renditions of an image never change, so they are cached for a year.
+    """
+    rendition_file_path = await IMAGE_RENDITION_SERVICE.get_rendition(
+        variant, rendition_path
+    )
+    if not rendition_file_path:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        rendition_file_path,
+        media_type="image/webp",
+        headers={"Cache-Control": IMAGE_RENDITION_CACHE_CONTROL},
+    )
+
+
 @IMAGES_ROUTER.post("/upload")
 async def upload_image(
     file: UploadFile = File(...), sql_session: AsyncSession = Depends(get_async_session)
 ):
     try:
-        new_filename = get_file_name_with_random_uuid(file)
-        image_path = os.path.join(
-            get_images_directory(), os.path.basename(new_filename)
+        # Named by its hash once saved, so identical uploads share one file
+        temp_path = os.path.join(
+            get_images_directory(),
+            f"{uuid.uuid4()}{get_file_ext_or_none(file.filename or '') or ''}",
+        )
+        upload_result = await save_upload_file(file, temp_path)
+        image_path = await IMAGE_ASSET_STORE_SERVICE.store_file(
+            temp_path, upload_result.sha256
         )
 
-        with open(image_path, "wb") as f:
-            f.write(await file.read())
-
-        image_asset = ImageAsset(path=image_path, is_uploaded=True)
-
-        sql_session.add(image_asset)
-        await sql_session.commit()
+        image_asset = (
+            await sql_session.scalars(
+                select(ImageAsset).where(
+                    ImageAsset.path == image_path, ImageAsset.is_uploaded == True
+                )
+            )
+        ).first()
+        if image_asset is None:
+            image_asset = ImageAsset(path=image_path, is_uploaded=True)
+            sql_session.add(image_asset)
+            await sql_session.commit()
 
         return image_asset
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload image: {str(e)}")
 
@@ -96,10 +156,10 @@ async def delete_uploaded_image_by_id(
         if not image:
             raise HTTPException(status_code=404, detail="Image not found")
 
-        os.remove(image.path)
-
         await sql_session.delete(image)
         await sql_session.commit()
 
+        await IMAGE_ASSET_STORE_SERVICE.remove_if_unreferenced(sql_session, image.path)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete image: {str(e)}")
@@ -18,7 +18,9 @@ from models.sse_response import (
 )
 from services.temp_file_service import TEMP_FILE_SERVICE
 from services.database import get_async_session
+from services.document_retrieval_service import DOCUMENT_RETRIEVAL_SERVICE
 from services.documents_loader import DocumentsLoader
+from utils.llm_calls.condense_documents import condense_documents
 from utils.llm_calls.generate_presentation_outlines import generate_ppt_outline
 from utils.ppt_utils import get_presentation_title_from_outlines
 
@@ -47,7 +49,8 @@ async def stream_outlines(
             await documents_loader.load_documents(temp_dir)
             documents = documents_loader.documents
             if documents:
-                additional_context = "\n\n".join(documents)
+                await DOCUMENT_RETRIEVAL_SERVICE.build_index(presentation.id, documents)
+                additional_context = await condense_documents(documents)
 
         presentation_outlines_text = ""
 
@@ -3,11 +3,14 @@ import shutil
 import tempfile
 import subprocess
 from typing import List, Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
-from services.documents_loader import DocumentsLoader
+from services.pdf_page_image_service import PDF_PAGE_IMAGE_SERVICE
 from utils.asset_directory_utils import get_images_directory
+from utils.pdf_slide_utils import save_pdf_slide_screenshots
+from utils.upload_utils import save_upload_file
 import uuid
 from constants.documents import PDF_MIME_TYPES
 
@@ -18,6 +21,7 @@ PDF_SLIDES_ROUTER = APIRouter(prefix="/pdf-slides", tags=["PDF Slides"])
 class PdfSlideData(BaseModel):
     slide_number: int
     screenshot_url: str
+    thumbnail_url: Optional[str] = None
 
 
 class PdfSlidesResponse(BaseModel):
@@ -28,7 +32,10 @@ class PdfSlidesResponse(BaseModel):
 
 @PDF_SLIDES_ROUTER.post("/process", response_model=PdfSlidesResponse)
 async def process_pdf_slides(
-    pdf_file: UploadFile = File(..., description="PDF file to process")
+    pdf_file: UploadFile = File(..., description="PDF file to process"),
+    lazy: bool = Form(
+        False, description="Render thumbnails only, full pages on request"
+    ),
 ):
     """
     Process a PDF file to extract slide screenshots.
@@ -63,54 +70,49 @@ async def process_pdf_slides(
         try:
             # Save uploaded PDF file
             pdf_path = os.path.join(temp_dir, "presentation.pdf")
-            with open(pdf_path, "wb") as f:
-                pdf_content = await pdf_file.read()
-                f.write(pdf_content)
+            await save_upload_file(pdf_file, pdf_path, 100, PDF_MIME_TYPES)
 
-            # Generate screenshots from PDF using ImageMagick
-            screenshot_paths = await DocumentsLoader.get_page_images_from_pdf_async(
-                pdf_path, temp_dir
+            # Generate screenshots from PDF
+            screenshot_urls = await save_pdf_slide_screenshots(
+                pdf_path, temp_dir, lazy
             )
-            print(f"Generated {len(screenshot_paths)} PDF screenshots")
 
-            # Move screenshots to images directory and generate URLs
-            images_dir = get_images_directory()
-            presentation_id = uuid.uuid4()
-            presentation_images_dir = os.path.join(images_dir, str(presentation_id))
-            os.makedirs(presentation_images_dir, exist_ok=True)
-
-            slides_data = []
-
-            for i, screenshot_path in enumerate(screenshot_paths, 1):
-                # Move screenshot to permanent location
-                screenshot_filename = f"slide_{i}.png"
-                permanent_screenshot_path = os.path.join(
-                    presentation_images_dir, screenshot_filename
+            slides_data = [
+                PdfSlideData(
+                    slide_number=i,
+                    screenshot_url=screenshot_url,
+                    thumbnail_url=thumbnail_url,
                 )
-
-                if (
-                    os.path.exists(screenshot_path)
-                    and os.path.getsize(screenshot_path) > 0
-                ):
-                    # Use shutil.copy2 instead of os.rename to handle cross-device moves
-                    shutil.copy2(screenshot_path, permanent_screenshot_path)
-                    screenshot_url = (
-                        f"/app_data/images/{presentation_id}/{screenshot_filename}"
-                    )
-                else:
-                    # Fallback if screenshot generation failed or file is empty placeholder
-                    screenshot_url = "/static/images/placeholder.jpg"
-
-                slides_data.append(
-                    PdfSlideData(slide_number=i, screenshot_url=screenshot_url)
+                for i, (screenshot_url, thumbnail_url) in enumerate(
+                    screenshot_urls, 1
                 )
+            ]
 
             return PdfSlidesResponse(
                 success=True, slides=slides_data, total_slides=len(slides_data)
             )
 
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error processing PDF slides: {str(e)}")
             raise HTTPException(
                 status_code=500, detail=f"Failed to process PDF: {str(e)}"
             )
+
+
+@PDF_SLIDES_ROUTER.get("/{presentation_id}/pages/{page_number}")
+async def get_pdf_slide_page(presentation_id: uuid.UUID, page_number: int):
+    """
+    Returns a full page image of a PDF processed in lazy mode, rendering it
+    on the first request.
+    """
+    presentation_images_dir = os.path.join(
+        get_images_directory(), str(presentation_id)
+    )
+    image_path = await PDF_PAGE_IMAGE_SERVICE.get_page_image(
+        presentation_images_dir, page_number
+    )
+    if not image_path:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return FileResponse(image_path)
@@ -5,15 +5,16 @@ import tempfile
 import subprocess
 import uuid
 from typing import List, Optional, Dict
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
 import aiohttp
 import asyncio
 import xml.etree.ElementTree as ET
 import re
 
-from services.documents_loader import DocumentsLoader
+from utils.pdf_slide_utils import save_pdf_slide_screenshots
 from utils.asset_directory_utils import get_images_directory
+from utils.upload_utils import save_upload_file
 import uuid
 from constants.documents import POWERPOINT_TYPES
 
@@ -24,6 +25,7 @@ PPTX_SLIDES_ROUTER = APIRouter(prefix="/pptx-slides", tags=["PPTX Slides"])
 class SlideData(BaseModel):
     slide_number: int
     screenshot_url: str
+    thumbnail_url: Optional[str] = None
     xml_content: str
     normalized_fonts: List[str]
 
@@ -290,6 +292,9 @@ async def analyze_fonts_in_all_slides(slide_xmls: List[str]) -> FontAnalysisResu
 async def process_pptx_slides(
     pptx_file: UploadFile = File(..., description="PPTX file to process"),
     fonts: Optional[List[UploadFile]] = File(None, description="Optional font files"),
+    lazy: bool = Form(
+        False, description="Render thumbnails only, full pages on request"
+    ),
 ):
     """
     Process a PPTX file to extract slide screenshots and XML content.
@@ -324,9 +329,7 @@ async def process_pptx_slides(
         if True:
             # Save uploaded PPTX file
             pptx_path = os.path.join(temp_dir, "presentation.pptx")
-            with open(pptx_path, "wb") as f:
-                pptx_content = await pptx_file.read()
-                f.write(pptx_content)
+            await save_upload_file(pptx_file, pptx_path, 100, POWERPOINT_TYPES)
 
             # Install fonts if provided
             if fonts:
@@ -338,11 +341,10 @@ async def process_pptx_slides(
             # Convert PPTX to PDF
             pdf_path = await _convert_pptx_to_pdf(pptx_path, temp_dir)
 
-            # Generate screenshots using LibreOffice
-            screenshot_paths = await DocumentsLoader.get_page_images_from_pdf_async(
-                pdf_path, temp_dir
+            # Generate screenshots from the converted PDF
+            screenshot_urls = await save_pdf_slide_screenshots(
+                pdf_path, temp_dir, lazy
             )
-            print(f"Screenshot paths: {screenshot_paths}")
 
             # Analyze fonts across all slides
             font_analysis = await analyze_fonts_in_all_slides(slide_xmls)
@@ -350,36 +352,11 @@ async def process_pptx_slides(
                 f"Font analysis completed: {len(font_analysis.internally_supported_fonts)} supported, {len(font_analysis.not_supported_fonts)} not supported"
             )
 
-            # Move screenshots to images directory and generate URLs
-            images_dir = get_images_directory()
-            presentation_id = uuid.uuid4()
-            presentation_images_dir = os.path.join(images_dir, str(presentation_id))
-            os.makedirs(presentation_images_dir, exist_ok=True)
-
             slides_data = []
 
-            for i, (xml_content, screenshot_path) in enumerate(
-                zip(slide_xmls, screenshot_paths), 1
+            for i, (xml_content, (screenshot_url, thumbnail_url)) in enumerate(
+                zip(slide_xmls, screenshot_urls), 1
             ):
-                # Move screenshot to permanent location
-                screenshot_filename = f"slide_{i}.png"
-                permanent_screenshot_path = os.path.join(
-                    presentation_images_dir, screenshot_filename
-                )
-
-                if (
-                    os.path.exists(screenshot_path)
-                    and os.path.getsize(screenshot_path) > 0
-                ):
-                    # Use shutil.copy2 instead of os.rename to handle cross-device moves
-                    shutil.copy2(screenshot_path, permanent_screenshot_path)
-                    screenshot_url = (
-                        f"/app_data/images/{presentation_id}/{screenshot_filename}"
-                    )
-                else:
-                    # Fallback if screenshot generation failed or file is empty placeholder
-                    screenshot_url = "/static/images/placeholder.jpg"
-
                 # Compute normalized fonts for this slide
                 raw_slide_fonts = extract_fonts_from_oxml(xml_content)
                 normalized_fonts = sorted(
@@ -390,6 +367,7 @@ async def process_pptx_slides(
                     SlideData(
                         slide_number=i,
                         screenshot_url=screenshot_url,
+                        thumbnail_url=thumbnail_url,
                         xml_content=xml_content,
                         normalized_fonts=normalized_fonts,
                     )
@@ -424,9 +402,7 @@ async def process_pptx_fonts(
     with tempfile.TemporaryDirectory() as temp_dir:
         # Save uploaded PPTX file
         pptx_path = os.path.join(temp_dir, "presentation.pptx")
-        with open(pptx_path, "wb") as f:
-            pptx_content = await pptx_file.read()
-            f.write(pptx_content)
+        await save_upload_file(pptx_file, pptx_path, 100, POWERPOINT_TYPES)
 
         # Extract slide XMLs from PPTX
         slide_xmls = _extract_slide_xmls(pptx_path, temp_dir)
@@ -486,9 +462,7 @@ async def _install_fonts(fonts: List[UploadFile], temp_dir: str) -> None:
     for font_file in fonts:
         # Save font file
         font_path = os.path.join(fonts_dir, font_file.filename)
-        with open(font_path, "wb") as f:
-            font_content = await font_file.read()
-            f.write(font_content)
+        await save_upload_file(font_file, font_path)
 
         # Install font (copy to system fonts directory)
         try:
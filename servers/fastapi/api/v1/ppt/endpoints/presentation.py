@@ -7,7 +7,16 @@ import random
 import traceback
 from typing import Annotated, List, Literal, Optional, Tuple
 import dirtyjson
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Path
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+)
 from fastapi.responses import StreamingResponse
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -32,12 +41,19 @@ from models.presentation_with_slides import (
 )
 from models.sql.template import TemplateModel
 
+from services.document_retrieval_service import DOCUMENT_RETRIEVAL_SERVICE
 from services.documents_loader import DocumentsLoader
 from services.webhook_service import WebhookService
 from utils.get_layout_by_name import get_layout_by_name
 from services.image_generation_service import ImageGenerationService
 from utils.dict_utils import deep_update
-from utils.export_utils import export_presentation
+from utils.export_utils import (
+    create_pptx,
+    export_presentation,
+    export_presentation_as_stream,
+    get_pptx_export_response,
+)
+from utils.llm_calls.condense_documents import condense_documents
 from utils.llm_calls.generate_presentation_outlines import generate_ppt_outline
 from models.sql.slide import SlideModel
 from models.sse_response import SSECompleteResponse, SSEErrorResponse, SSEResponse
@@ -45,8 +61,8 @@ from models.sse_response import SSECompleteResponse, SSEErrorResponse, SSERespon
 from services.database import get_async_session
 from services.temp_file_service import TEMP_FILE_SERVICE
 from services.concurrent_service import CONCURRENT_SERVICE
+from services.export_cache_service import EXPORT_CACHE_SERVICE
 from models.sql.presentation import PresentationModel
-from services.pptx_presentation_creator import PptxPresentationCreator
 from models.sql.async_presentation_generation_status import (
     AsyncPresentationGenerationTaskModel,
 )
@@ -64,6 +80,8 @@ from utils.ppt_utils import (
 from utils.process_slides import (
     process_slide_add_placeholder_assets,
     process_slide_and_fetch_assets,
+    process_slides_and_fetch_icons,
+    SlideAssetsPrefetcher,
 )
 import uuid
 
@@ -125,6 +143,9 @@ async def delete_presentation(
     await sql_session.delete(presentation)
     await sql_session.commit()
 
+    EXPORT_CACHE_SERVICE.invalidate(id)
+    DOCUMENT_RETRIEVAL_SERVICE.remove_index(id)
+
 
 @PRESENTATION_ROUTER.post("/create", response_model=PresentationModel)
 async def create_presentation(
@@ -282,57 +303,70 @@ async def stream_presentation(
 
         # These tasks will be gathered and awaited after all slides are generated
         async_assets_generation_tasks = []
+        # Assets are looked up while the text of each slide is still generated
+        assets_prefetcher = SlideAssetsPrefetcher(image_generation_service)
 
         slides: List[SlideModel] = []
         yield SSEResponse(
             event="response",
             data=json.dumps({"type": "chunk", "chunk": '{ "slides": [ '}),
         ).to_string()
-        for i, slide_layout_index in enumerate(structure.slides):
-            slide_layout = layout.slides[slide_layout_index]
+        try:
+            for i, slide_layout_index in enumerate(structure.slides):
+                slide_layout = layout.slides[slide_layout_index]
+
+                try:
+                    slide_content = await get_slide_content_from_type_and_outline(
+                        slide_layout,
+                        outline.slides[i],
+                        presentation.language,
+                        presentation.tone,
+                        presentation.verbosity,
+                        presentation.instructions,
+                        presentation_id=id,
+                        prefetch_asset=assets_prefetcher.prefetch,
+                    )
+                except HTTPException as e:
+                    yield SSEErrorResponse(detail=e.detail).to_string()
+                    return
 
-            try:
-                slide_content = await get_slide_content_from_type_and_outline(
-                    slide_layout,
-                    outline.slides[i],
-                    presentation.language,
-                    presentation.tone,
-                    presentation.verbosity,
-                    presentation.instructions,
+                slide = SlideModel(
+                    presentation=id,
+                    layout_group=layout.name,
+                    layout=slide_layout.id,
+                    index=i,
+                    speaker_note=slide_content.get("__speaker_note__", ""),
+                    content=slide_content,
                 )
-            except HTTPException as e:
-                yield SSEErrorResponse(detail=e.detail).to_string()
-                return
-
-            slide = SlideModel(
-                presentation=id,
-                layout_group=layout.name,
-                layout=slide_layout.id,
-                index=i,
-                speaker_note=slide_content.get("__speaker_note__", ""),
-                content=slide_content,
-            )
-            slides.append(slide)
+                slides.append(slide)
 
-            # This will mutate slide and add placeholder assets
-            process_slide_add_placeholder_assets(slide)
+                # This will mutate slide and add placeholder assets
+                process_slide_add_placeholder_assets(slide)
 
-            # This will mutate slide
-            async_assets_generation_tasks.append(
-                process_slide_and_fetch_assets(image_generation_service, slide)
-            )
+                # This will mutate slide, icons are fetched for all slides at once
+                async_assets_generation_tasks.append(
+                    process_slide_and_fetch_assets(
+                        image_generation_service, slide, fetch_icons=False
+                    )
+                )
+
+                yield SSEResponse(
+                    event="response",
+                    data=json.dumps({"type": "chunk", "chunk": slide.model_dump_json()}),
+                ).to_string()
 
             yield SSEResponse(
                 event="response",
-                data=json.dumps({"type": "chunk", "chunk": slide.model_dump_json()}),
+                data=json.dumps({"type": "chunk", "chunk": " ] }"}),
             ).to_string()
 
-        yield SSEResponse(
-            event="response",
-            data=json.dumps({"type": "chunk", "chunk": " ] }"}),
-        ).to_string()
-
-        generated_assets_lists = await asyncio.gather(*async_assets_generation_tasks)
+            generated_assets_lists, _ = await asyncio.gather(
+                asyncio.gather(*async_assets_generation_tasks),
+                process_slides_and_fetch_icons(slides),
+            )
+        finally:
+            # Lookups still running are no longer needed, e.g. after a failure
+            assets_prefetcher.cancel()
         generated_assets = []
         for assets_list in generated_assets_lists:
             generated_assets.extend(assets_list)
@@ -395,6 +429,8 @@ async def update_presentation(
 
     await sql_session.commit()
 
+    EXPORT_CACHE_SERVICE.invalidate(presentation.id)
+
     return PresentationWithSlides(
         **presentation.model_dump(),
         slides=slides or [],
@@ -404,11 +440,19 @@ async def update_presentation(
 @PRESENTATION_ROUTER.post("/export/pptx", response_model=str)
 async def export_presentation_as_pptx(
     pptx_model: Annotated[PptxPresentationModel, Body()],
+    stream: Annotated[
+        bool, Query(description="Stream the file in the response instead of a path")
+    ] = False,
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
+    if stream:
+        return await get_pptx_export_response(
+            pptx_model, f"{pptx_model.name or uuid.uuid4()}.pptx", if_none_match
+        )
+
     temp_dir = TEMP_FILE_SERVICE.create_temp_dir()
 
-    pptx_creator = PptxPresentationCreator(pptx_model, temp_dir)
-    await pptx_creator.create_ppt()
+    pptx_creator = await create_pptx(pptx_model, temp_dir)
 
     export_directory = get_exports_directory()
     pptx_path = os.path.join(
@@ -425,6 +469,10 @@ async def export_presentation_as_pptx_or_pdf(
     export_as: Annotated[
         Literal["pptx", "pdf"], Body(description="Format to export the presentation as")
     ] = "pptx",
+    stream: Annotated[
+        bool, Body(description="Stream the file in the response instead of a path")
+    ] = False,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     sql_session: AsyncSession = Depends(get_async_session),
 ):
     presentation = await sql_session.get(PresentationModel, id)
@@ -432,10 +480,25 @@ async def export_presentation_as_pptx_or_pdf(
     if not presentation:
         raise HTTPException(status_code=404, detail="Presentation not found")
 
+    slides = await sql_session.scalars(
+        select(SlideModel).where(SlideModel.presentation == id)
+    )
+    revision = presentation.get_content_revision(slides)
+
+    if stream:
+        return await export_presentation_as_stream(
+            id,
+            presentation.title or str(id),
+            export_as,
+            if_none_match,
+            revision,
+        )
+
     presentation_and_path = await export_presentation(
         id,
-        presentation.title or str(uuid.uuid4()),
+        presentation.title or str(id),
         export_as,
+        revision,
     )
 
     return PresentationPathAndEditPath(
@@ -515,7 +578,10 @@ async def generate_presentation_handler(
                 await documents_loader.load_documents()
                 documents = documents_loader.documents
                 if documents:
-                    additional_context = "\n\n".join(documents)
+                    await DOCUMENT_RETRIEVAL_SERVICE.build_index(
+                        presentation_id, documents
+                    )
+                    additional_context = await condense_documents(documents)
 
             # Finding number of slides to generate by considering table of contents
             n_slides_to_generate = request.n_slides
@@ -672,6 +738,8 @@ async def generate_presentation_handler(
 
         image_generation_service = ImageGenerationService(get_images_directory())
         async_assets_generation_tasks = []
+        # Assets are looked up while the text of each slide is still generated
+        assets_prefetcher = SlideAssetsPrefetcher(image_generation_service)
 
         # 7. Generate slide content concurrently (batched), then build slides and fetch assets
         slides: List[SlideModel] = []
@@ -679,58 +747,70 @@ async def generate_presentation_handler(
         slide_layout_indices = presentation_structure.slides
         slide_layouts = [layout_model.slides[idx] for idx in slide_layout_indices]
 
-        # Schedule slide content generation and asset fetching in batches of 10
-        batch_size = 10
-        for start in range(0, len(slide_layouts), batch_size):
-            end = min(start + batch_size, len(slide_layouts))
-
-            print(f"Generating slides from {start} to {end}")
-
-            # Generate contents for this batch concurrently
-            content_tasks = [
-                get_slide_content_from_type_and_outline(
-                    slide_layouts[i],
-                    presentation_outlines.slides[i],
-                    request.language,
-                    request.tone.value,
-                    request.verbosity.value,
-                    request.instructions,
-                )
-                for i in range(start, end)
-            ]
-            batch_contents: List[dict] = await asyncio.gather(*content_tasks)
-
-            # Build slides for this batch
-            batch_slides: List[SlideModel] = []
-            for offset, slide_content in enumerate(batch_contents):
-                i = start + offset
-                slide_layout = slide_layouts[i]
-                slide = SlideModel(
-                    presentation=presentation_id,
-                    layout_group=layout_model.name,
-                    layout=slide_layout.id,
-                    index=i,
-                    speaker_note=slide_content.get("__speaker_note__"),
-                    content=slide_content,
-                )
-                slides.append(slide)
-                batch_slides.append(slide)
+        try:
+            # Schedule slide content generation and asset fetching in batches of 10
+            batch_size = 10
+            for start in range(0, len(slide_layouts), batch_size):
+                end = min(start + batch_size, len(slide_layouts))
+
+                print(f"Generating slides from {start} to {end}")
+
+                # Generate contents for this batch concurrently
+                content_tasks = [
+                    get_slide_content_from_type_and_outline(
+                        slide_layouts[i],
+                        presentation_outlines.slides[i],
+                        request.language,
+                        request.tone.value,
+                        request.verbosity.value,
+                        request.instructions,
+                        presentation_id=presentation_id,
+                        prefetch_asset=assets_prefetcher.prefetch,
+                    )
+                    for i in range(start, end)
+                ]
+                batch_contents: List[dict] = await asyncio.gather(*content_tasks)
+
+                # Build slides for this batch
+                batch_slides: List[SlideModel] = []
+                for offset, slide_content in enumerate(batch_contents):
+                    i = start + offset
+                    slide_layout = slide_layouts[i]
+                    slide = SlideModel(
+                        presentation=presentation_id,
+                        layout_group=layout_model.name,
+                        layout=slide_layout.id,
+                        index=i,
+                        speaker_note=slide_content.get("__speaker_note__"),
+                        content=slide_content,
+                    )
+                    slides.append(slide)
+                    batch_slides.append(slide)
 
-            # Start asset fetch tasks for just-generated slides so they run while next batch is processed
-            asset_tasks = [
-                process_slide_and_fetch_assets(image_generation_service, slide)
-                for slide in batch_slides
-            ]
-            async_assets_generation_tasks.extend(asset_tasks)
+                # Start asset fetch tasks for just-generated slides so they run while next batch is processed
+                asset_tasks = [
+                    process_slide_and_fetch_assets(
+                        image_generation_service, slide, fetch_icons=False
+                    )
+                    for slide in batch_slides
+                ]
+                async_assets_generation_tasks.extend(asset_tasks)
 
-        if async_status:
-            async_status.message = "Fetching assets for slides"
-            async_status.updated_at = datetime.now()
-            sql_session.add(async_status)
-            await sql_session.commit()
+            if async_status:
+                async_status.message = "Fetching assets for slides"
+                async_status.updated_at = datetime.now()
+                sql_session.add(async_status)
+                await sql_session.commit()
 
-        # Run all asset tasks concurrently while batches may still be generating content
-        generated_assets_list = await asyncio.gather(*async_assets_generation_tasks)
+            # Run all asset tasks concurrently while batches may still be generating content
+            # Icons of the whole deck are looked up in one batch
+            generated_assets_list, _ = await asyncio.gather(
+                asyncio.gather(*async_assets_generation_tasks),
+                process_slides_and_fetch_icons(slides),
+            )
+        finally:
+            # Lookups still running are no longer needed, e.g. after a failure
+            assets_prefetcher.cancel()
         generated_assets = []
         for assets_list in generated_assets_list:
             generated_assets.extend(assets_list)
@@ -748,7 +828,10 @@ async def generate_presentation_handler(
 
         # 9. Export
         presentation_and_path = await export_presentation(
-            presentation_id, presentation.title or str(uuid.uuid4()), request.export_as
+            presentation_id,
+            presentation.title or str(presentation_id),
+            request.export_as,
+            presentation.get_content_revision(slides),
         )
 
         response = PresentationPathAndEditPath(
@@ -901,8 +984,16 @@ async def edit_presentation_with_new_content(
     sql_session.add_all(new_slides)
     await sql_session.commit()
 
+    EXPORT_CACHE_SERVICE.invalidate(presentation.id)
+
+    slides = await sql_session.scalars(
+        select(SlideModel).where(SlideModel.presentation == presentation.id)
+    )
     presentation_and_path = await export_presentation(
-        presentation.id, presentation.title or str(uuid.uuid4()), data.export_as
+        presentation.id,
+        presentation.title or str(presentation.id),
+        data.export_as,
+        presentation.get_content_revision(slides),
     )
 
     return PresentationPathAndEditPath(
@@ -942,7 +1033,10 @@ async def derive_presentation_from_existing_one(
     await sql_session.commit()
 
     presentation_and_path = await export_presentation(
-        new_presentation.id, new_presentation.title or str(uuid.uuid4()), data.export_as
+        new_presentation.id,
+        new_presentation.title or str(new_presentation.id),
+        data.export_as,
+        new_presentation.get_content_revision(new_slides),
     )
 
     return PresentationPathAndEditPath(
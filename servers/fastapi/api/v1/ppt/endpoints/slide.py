@@ -6,6 +6,7 @@ import uuid
 from models.sql.presentation import PresentationModel
 from models.sql.slide import SlideModel
 from services.database import get_async_session
+from services.export_cache_service import EXPORT_CACHE_SERVICE
 from services.image_generation_service import ImageGenerationService
 from utils.asset_directory_utils import get_images_directory
 from utils.llm_calls.edit_slide import get_edited_slide_content
@@ -59,6 +60,8 @@ async def edit_slide(
     sql_session.add_all(new_assets)
     await sql_session.commit()
 
+    EXPORT_CACHE_SERVICE.invalidate(slide.presentation)
+
     return slide
 
 
@@ -87,4 +90,6 @@ async def edit_slide_html(
     slide.html_content = edited_slide_html
     await sql_session.commit()
 
+    EXPORT_CACHE_SERVICE.invalidate(slide.presentation)
+
     return slide
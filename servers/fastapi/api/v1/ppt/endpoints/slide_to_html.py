@@ -9,6 +9,7 @@ from openai import OpenAI
 from openai import APIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
+from utils.pdf_slide_utils import get_lazy_page_image_path
 from utils.asset_directory_utils import get_images_directory
 from services.database import get_async_session
 from models.sql.presentation_layout_code import PresentationLayoutCodeModel
@@ -461,6 +462,9 @@ async def convert_slide_to_html(request: SlideToHtmlRequest):
             # Remove the /app_data/images/ prefix and join with actual images directory
             relative_path = image_path[len("/app_data/images/") :]
             actual_image_path = os.path.join(get_images_directory(), relative_path)
+        elif image_path.startswith("/api/v1/ppt/pdf-slides/"):
+            # Page of a PDF processed in lazy mode, rendered on first use
+            actual_image_path = await get_lazy_page_image_path(image_path) or ""
         elif image_path.startswith("/static/"):
             # Handle static files
             relative_path = image_path[len("/static/") :]
@@ -550,6 +554,8 @@ async def convert_html_to_react(request: HtmlToReactRequest):
             if image_path.startswith("/app_data/images/"):
                 relative_path = image_path[len("/app_data/images/") :]
                 actual_image_path = os.path.join(get_images_directory(), relative_path)
+            elif image_path.startswith("/api/v1/ppt/pdf-slides/"):
+                actual_image_path = await get_lazy_page_image_path(image_path) or ""
             elif image_path.startswith("/static/"):
                 relative_path = image_path[len("/static/") :]
                 actual_image_path = os.path.join("static", relative_path)
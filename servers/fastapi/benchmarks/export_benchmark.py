@@ -0,0 +1,290 @@
+"""
+Benchmark for PPTX export with PptxPresentationCreator and utils/image_utils.py.
+
+Builds synthetic decks from locally generated fixture images, so no network
+or Next.js service is needed. Each deck is exported in a fresh process to
+measure its peak RSS. Results are written as JSON and can be compared
+between commits.
+
+Usage:
+    python -m benchmarks.export_benchmark --output results.json
+    python -m benchmarks.export_benchmark --sizes 10 100 --kinds text
+    python -m benchmarks.export_benchmark --compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from PIL import Image, ImageDraw
+from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
+
+from benchmarks import image_utils_benchmark
+from models.pptx_models import (
+    PptxAutoShapeBoxModel,
+    PptxConnectorModel,
+    PptxFillModel,
+    PptxFontModel,
+    PptxObjectFitEnum,
+    PptxObjectFitModel,
+    PptxParagraphModel,
+    PptxPictureBoxModel,
+    PptxPictureModel,
+    PptxPositionModel,
+    PptxPresentationModel,
+    PptxSlideModel,
+    PptxTextBoxModel,
+)
+from services.pptx_presentation_creator import PptxPresentationCreator
+
+
+DECK_SIZES = [10, 100, 500]
+DECK_KINDS = ["text", "image"]
+
+PARAGRAPH_HTML = (
+    "Solar capacity grew <b>24%</b> last year, driven by <i>utility scale</i> "
+    "projects and <u>falling module prices</u>. Storage is the next "
+    "<strong>bottleneck</strong> for <code>grid</code> operators."
+)
+
+
+def create_fixture_images(directory: str) -> List[str]:
+    """Photo-like gradients with and without transparency."""
+    paths = []
+    for index, (size, mode, extension) in enumerate(
+        [
+            ((1600, 1200), "RGB", "jpg"),
+            ((1920, 1080), "RGB", "png"),
+            ((1200, 1200), "RGBA", "png"),
+            ((800, 600), "RGB", "jpg"),
+        ]
+    ):
+        image = Image.linear_gradient("L").resize(size).convert(mode)
+        draw = ImageDraw.Draw(image)
+        for offset in range(0, size[0], 80):
+            draw.line((offset, 0, size[0] - offset, size[1]), fill=(index * 60) % 255)
+        if mode == "RGBA":
+            image.putalpha(Image.radial_gradient("L").resize(size))
+
+        path = os.path.join(directory, f"fixture_{index}.{extension}")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def create_text_slide(index: int) -> PptxSlideModel:
+    font = PptxFontModel(size=18, color="1F2937")
+    return PptxSlideModel(
+        background=PptxFillModel(color="FFFFFF"),
+        note=f"Speaker notes for slide {index}",
+        shapes=[
+            PptxTextBoxModel(
+                position=PptxPositionModel(left=60, top=40, width=1160, height=80),
+                paragraphs=[
+                    PptxParagraphModel(
+                        text=f"<b>Slide {index}</b> Energy transition",
+                        font=PptxFontModel(size=40, font_weight=700),
+                    )
+                ],
+            ),
+            PptxAutoShapeBoxModel(
+                type=MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE,
+                position=PptxPositionModel(left=60, top=140, width=1160, height=500),
+                fill=PptxFillModel(color="F3F4F6", opacity=0.8),
+                border_radius=12,
+                paragraphs=[
+                    PptxParagraphModel(text=PARAGRAPH_HTML, font=font)
+                    for _ in range(6)
+                ],
+            ),
+            PptxConnectorModel(
+                position=PptxPositionModel(left=60, top=660, width=1160, height=0),
+                thickness=2,
+            ),
+        ],
+    )
+
+
+def create_image_slide(index: int, image_paths: List[str]) -> PptxSlideModel:
+    pictures = []
+    for picture_index in range(4):
+        image_path = image_paths[(index + picture_index) % len(image_paths)]
+        pictures.append(
+            PptxPictureBoxModel(
+                position=PptxPositionModel(
+                    left=60 + picture_index * 290, top=160, width=270, height=400
+                ),
+                clip=picture_index != 0,
+                border_radius=[16, 16, 16, 16] if picture_index == 1 else None,
+                object_fit=(
+                    PptxObjectFitModel(fit=PptxObjectFitEnum.COVER)
+                    if picture_index == 2
+                    else None
+                ),
+                opacity=0.8 if picture_index == 3 else None,
+                picture=PptxPictureModel(is_network=False, path=image_path),
+            )
+        )
+
+    return PptxSlideModel(
+        shapes=[
+            PptxTextBoxModel(
+                position=PptxPositionModel(left=60, top=40, width=1160, height=80),
+                paragraphs=[PptxParagraphModel(text=f"Gallery {index}")],
+            ),
+            *pictures,
+        ]
+    )
+
+
+def create_deck(
+    n_slides: int, kind: str, image_paths: List[str]
+) -> PptxPresentationModel:
+    if kind == "text":
+        slides = [create_text_slide(index) for index in range(n_slides)]
+    else:
+        slides = [create_image_slide(index, image_paths) for index in range(n_slides)]
+    return PptxPresentationModel(name=f"{kind}-{n_slides}", slides=slides)
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss /= 1024
+    return round(peak_rss / 1024, 2)
+
+
+def run_export_case(n_slides: int, kind: str, image_dpi: Optional[int]) -> dict:
+    """Runs in its own process so peak RSS belongs to this case only."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_paths = create_fixture_images(temp_dir)
+
+        start = time.perf_counter()
+        pptx_model = create_deck(n_slides, kind, image_paths)
+        build_model_s = time.perf_counter() - start
+
+        pptx_creator = PptxPresentationCreator(pptx_model, temp_dir, image_dpi)
+
+        start = time.perf_counter()
+        asyncio.run(pptx_creator.fetch_network_assets())
+        fetch_assets_s = time.perf_counter() - start
+
+        # create_ppt fetches assets again, which is a no-op for local fixtures
+        start = time.perf_counter()
+        asyncio.run(pptx_creator.create_ppt())
+        create_ppt_s = time.perf_counter() - start
+
+        output_path = os.path.join(temp_dir, "benchmark.pptx")
+        start = time.perf_counter()
+        pptx_creator.save(output_path)
+        save_s = time.perf_counter() - start
+
+        return {
+            "name": f"export/{kind}/{n_slides}",
+            "kind": kind,
+            "slides": n_slides,
+            "image_dpi": image_dpi,
+            "phases_s": {
+                "build_model": round(build_model_s, 4),
+                "fetch_network_assets": round(fetch_assets_s, 4),
+                "create_ppt": round(create_ppt_s, 4),
+                "save": round(save_s, 4),
+            },
+            "total_s": round(create_ppt_s + save_s, 4),
+            "peak_rss_mb": get_peak_rss_mb(),
+            "output_bytes": os.path.getsize(output_path),
+            "image_bytes_saved": pptx_creator.image_bytes_saved,
+        }
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def run(
+    sizes: List[int], kinds: List[str], image_dpi: Optional[int] = None
+) -> dict:
+    results = []
+    spawn_context = multiprocessing.get_context("spawn")
+    for kind in kinds:
+        for n_slides in sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as pool:
+                result = pool.submit(run_export_case, n_slides, kind, image_dpi).result()
+            print(
+                f"{result['name']}: {result['total_s']}s, "
+                f"{result['peak_rss_mb']} MB peak, {result['output_bytes']} bytes",
+                file=sys.stderr,
+            )
+            results.append(result)
+
+    return {
+        "commit": get_git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "export": results,
+        "image_utils": image_utils_benchmark.run(size=1024, repeat=3),
+    }
+
+
+def compare(old_path: str, new_path: str) -> List[dict]:
+    with open(old_path) as f:
+        old_results = {each["name"]: each for each in json.load(f)["export"]}
+    with open(new_path) as f:
+        new_results = {each["name"]: each for each in json.load(f)["export"]}
+
+    comparison = []
+    for name, new in new_results.items():
+        old = old_results.get(name)
+        if not old:
+            continue
+        comparison.append(
+            {
+                "name": name,
+                "total_s": [old["total_s"], new["total_s"]],
+                "total_change": round(new["total_s"] / old["total_s"] - 1, 3),
+                "peak_rss_mb": [old["peak_rss_mb"], new["peak_rss_mb"]],
+                "output_bytes": [old["output_bytes"], new["output_bytes"]],
+            }
+        )
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DECK_SIZES)
+    parser.add_argument("--kinds", nargs="+", choices=DECK_KINDS, default=DECK_KINDS)
+    parser.add_argument("--image-dpi", type=int, default=None)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        sys.exit(0)
+
+    results = run(args.sizes, args.kinds, args.image_dpi)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,144 @@
+"""
+Benchmark for services/html_to_text_runs_service.py on large paragraphs.
+
+Compares the current parser against the original one that rebuilt the font
+for every text fragment, and checks that both produce the same runs.
+
+Usage:
+    python -m benchmarks.html_to_text_runs_benchmark [--paragraphs 200] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+from html.parser import HTMLParser
+from typing import Callable, List, Optional
+
+from models.pptx_models import PptxFontModel, PptxTextRunModel
+from services.html_to_text_runs_service import (
+    _parse_html_text_to_text_runs,
+    parse_html_text_to_text_runs,
+)
+
+
+class LegacyInlineHTMLToRunsParser(HTMLParser):
+    def __init__(self, base_font: PptxFontModel):
+        super().__init__(convert_charrefs=True)
+        self.base_font = base_font
+        self.tag_stack: List[str] = []
+        self.text_runs: List[PptxTextRunModel] = []
+
+    def _current_font(self) -> PptxFontModel:
+        font_json = self.base_font.model_dump()
+        if any(tag in ("strong", "b") for tag in self.tag_stack):
+            font_json["font_weight"] = 700
+        if any(tag in ("em", "i") for tag in self.tag_stack):
+            font_json["italic"] = True
+        if any(tag == "u" for tag in self.tag_stack):
+            font_json["underline"] = True
+        if any(tag in ("s", "strike", "del") for tag in self.tag_stack):
+            font_json["strike"] = True
+        if any(tag == "code" for tag in self.tag_stack):
+            font_json["name"] = "Courier New"
+        return PptxFontModel(**font_json)
+
+    def handle_starttag(self, tag, attrs):
+        tag = tag.lower()
+        if tag == "br":
+            self.text_runs.append(PptxTextRunModel(text="\n"))
+            return
+        self.tag_stack.append(tag)
+
+    def handle_endtag(self, tag):
+        tag = tag.lower()
+        for i in range(len(self.tag_stack) - 1, -1, -1):
+            if self.tag_stack[i] == tag:
+                del self.tag_stack[i]
+                break
+
+    def handle_data(self, data):
+        if data == "":
+            return
+        self.text_runs.append(PptxTextRunModel(text=data, font=self._current_font()))
+
+
+def legacy_parse_html_text_to_text_runs(
+    text: str, base_font: Optional[PptxFontModel] = None
+) -> List[PptxTextRunModel]:
+    normalized_text = text.replace("\r\n", "\n").replace("\r", "\n")
+    normalized_text = normalized_text.replace("\n", "<br>")
+
+    parser = LegacyInlineHTMLToRunsParser(base_font if base_font else PptxFontModel())
+    parser.feed(normalized_text)
+    return parser.text_runs
+
+
+def make_paragraph(index: int, sentences: int = 40) -> str:
+    parts = []
+    for sentence in range(sentences):
+        parts.append(
+            f"Point {index}.{sentence} has <b>bold <i>nested italic</i></b>, "
+            f"<u>underlined</u>, <s>struck</s> and <code>code()</code> text &amp; more."
+        )
+        if sentence % 10 == 9:
+            parts.append("\n")
+    return " ".join(parts)
+
+
+def time_callable(func: Callable[[], object], repeat: int) -> float:
+    """Returns the best wall time of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(paragraphs: int = 200, repeat: int = 5) -> List[dict]:
+    font = PptxFontModel(name="Inter", size=18, color="1F2937")
+    unique_texts = [make_paragraph(index) for index in range(paragraphs)]
+    # Headers and footers repeated on every slide
+    repeated_texts = ["<b>Quarterly review</b> | <i>Confidential</i>"] * paragraphs
+
+    def parse_uncached(texts: List[str]):
+        _parse_html_text_to_text_runs.cache_clear()
+        for text in texts:
+            parse_html_text_to_text_runs(text, font)
+
+    def parse_legacy(texts: List[str]):
+        for text in texts:
+            legacy_parse_html_text_to_text_runs(text, font)
+
+    results = []
+    for name, texts in [("large_paragraphs", unique_texts), ("repeated", repeated_texts)]:
+        identical = all(
+            [run.model_dump() for run in parse_html_text_to_text_runs(text, font)]
+            == [
+                run.model_dump()
+                for run in legacy_parse_html_text_to_text_runs(text, font)
+            ]
+            for text in texts[:20]
+        )
+        current_ms = time_callable(lambda: parse_uncached(texts), repeat)
+        legacy_ms = time_callable(lambda: parse_legacy(texts), repeat)
+        results.append(
+            {
+                "name": name,
+                "texts": len(texts),
+                "identical": identical,
+                "legacy_ms": round(legacy_ms, 3),
+                "current_ms": round(current_ms, 3),
+                "speedup": round(legacy_ms / current_ms, 2) if current_ms else None,
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.paragraphs, args.repeat), indent=2))
@@ -0,0 +1,199 @@
+"""
+Benchmark for the in-memory icon index in services/icon_index.py.
+
+Compares it against the previous Chroma collection, which embedded each query
+and searched an HNSW index in a persistent client, and reports latencies and
+the recall of both against an exact search.
+
+Uses assets/icons.json when present and a synthetic catalog otherwise. The
+--fake-embedder option replaces the ONNX model with hashed bag-of-words vectors,
+for machines where the model is not available.
+
+Usage:
+    python -m benchmarks.icon_search_benchmark [--queries 200] [--k 5] [--fake-embedder]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, List
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from constants.assets import ICONS_FILE_PATH
+from services.icon_index import IconIndex, load_icon_documents
+
+WORDS = [
+    "chart", "users", "rocket", "arrow", "cloud", "lock", "mail", "phone", "camera",
+    "heart", "star", "globe", "calendar", "clock", "folder", "file", "gear", "home",
+    "search", "shield", "trophy", "wallet", "bank", "book", "brain", "bulb", "car",
+    "cart", "chat", "code", "database", "flag", "gift", "key", "leaf", "map", "music",
+    "pen", "pie", "plane", "robot", "school", "server", "tag", "target", "truck",
+]  # fmt: skip
+
+
+def make_catalog(n_icons: int, seed: int = 0):
+    rng = random.Random(seed)
+    ids = []
+    documents = []
+    for index in range(n_icons):
+        name_words = rng.sample(WORDS, 2)
+        name = f"{'-'.join(name_words)}-{index}-bold"
+        ids.append(name)
+        documents.append(f"{name} {rng.sample(WORDS, 4)}")
+    return ids, documents
+
+
+def fake_embed(texts: List[str], dimensions: int = 384) -> np.ndarray:
+    embeddings = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().replace("-", " ").split():
+            word = word.strip("[],'\"")
+            embeddings[row, hash(word) % dimensions] += 1
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return embeddings / norms
+
+
+class ChromaEmbeddingFunction:
+    def __init__(self, embed: Callable[[List[str]], np.ndarray]):
+        self.embed = embed
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        return list(self.embed(list(input)))
+
+    def embed_query(self, input: List[str]) -> List[np.ndarray]:
+        return self(input)
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark"
+
+    def is_legacy(self) -> bool:
+        return True
+
+
+def make_queries(documents: List[str], n_queries: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n_queries):
+        words = documents[rng.randrange(len(documents))].replace("-", " ").split()
+        words = [word.strip("[],'\"") for word in words if word.isalpha() or "'" in word]
+        queries.append(" ".join(rng.sample(words, min(2, len(words)))))
+    return queries
+
+
+def get_latency_stats(latencies: List[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def get_recall(
+    results: List[List[str]], scores: np.ndarray, ids: List[str], k: int
+) -> float:
+    """
+    Share of results scoring at least the k-th best exact score of their query,
+    so that icons tied with the exact top k also count as hits.
+    """
+    columns = {icon_id: column for column, icon_id in enumerate(ids)}
+    thresholds = -np.sort(-scores, axis=1)[:, k - 1] - 1e-6
+    hits = sum(
+        scores[row, columns[icon_id]] >= thresholds[row]
+        for row, result in enumerate(results)
+        for icon_id in result
+    )
+    return round(hits / (len(results) * k), 4)
+
+
+def run(n_queries: int = 200, k: int = 5, fake_embedder: bool = False) -> dict:
+    if fake_embedder:
+        embed = fake_embed
+    else:
+        from utils.embedding_utils import embed_texts as embed
+
+    if os.path.isfile(ICONS_FILE_PATH):
+        ids, documents = load_icon_documents(ICONS_FILE_PATH)
+    else:
+        ids, documents = make_catalog(3000)
+    queries = make_queries(documents, n_queries)
+
+    start = time.perf_counter()
+    index = IconIndex.build(ids, documents, embed)
+    build_s = time.perf_counter() - start
+
+    scores = embed(queries) @ np.asarray(index.embeddings).T
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index.save(os.path.join(temp_dir, "icons"), "benchmark")
+        start = time.perf_counter()
+        index = IconIndex.load(os.path.join(temp_dir, "icons"), "benchmark")
+        load_ms = (time.perf_counter() - start) * 1000
+
+        index_latencies = []
+        index_results = []
+        for query in queries:
+            start = time.perf_counter()
+            index_results.extend(index.search(embed([query]), k))
+            index_latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batched_results = index.search(embed(queries), k)
+        batched_ms = (time.perf_counter() - start) * 1000
+
+        client = chromadb.PersistentClient(
+            path=os.path.join(temp_dir, "chroma"),
+            settings=Settings(anonymized_telemetry=False),
+        )
+        collection = client.create_collection(
+            name="icons",
+            embedding_function=ChromaEmbeddingFunction(embed),
+            metadata={"hnsw:space": "cosine"},
+        )
+        collection.add(
+            ids=ids, documents=documents, embeddings=list(np.asarray(index.embeddings))
+        )
+
+        chroma_latencies = []
+        chroma_results = []
+        for query in queries:
+            start = time.perf_counter()
+            chroma_results.append(
+                collection.query(query_texts=[query], n_results=k)["ids"][0]
+            )
+            chroma_latencies.append(time.perf_counter() - start)
+
+    return {
+        "icons": len(ids),
+        "queries": n_queries,
+        "k": k,
+        "embedder": "fake" if fake_embedder else "onnx",
+        "index_build_s": round(build_s, 2),
+        "index_load_ms": round(load_ms, 3),
+        "index": get_latency_stats(index_latencies),
+        "index_batched_per_query_ms": round(batched_ms / n_queries, 3),
+        "chroma": get_latency_stats(chroma_latencies),
+        "index_recall": get_recall(index_results, scores, ids, k),
+        "index_batched_identical": batched_results == index_results,
+        "chroma_recall": get_recall(chroma_results, scores, ids, k),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument(
+        "--fake-embedder", action="store_true", help="Use hashed bag-of-words vectors"
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.queries, args.k, args.fake_embedder), indent=2))
@@ -0,0 +1,161 @@
+"""
+Microbenchmark for the pixel operations in utils/image_utils.py.
+
+Compares the current implementations against the original per-pixel
+versions, checks that both produce identical pixels and prints the timings.
+
+Usage:
+    python -m benchmarks.image_utils_benchmark [--size 1024] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, List
+
+from PIL import Image, ImageDraw
+
+from utils.image_utils import invert_image, round_image_corners, set_image_opacity
+
+
+def legacy_round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
+    w, h = image.size
+    max_radius = min(w // 2, h // 2)
+    clamped_radii = [min(radius, max_radius) for radius in radii]
+
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+
+    rounded_mask = Image.new("L", image.size, 0)
+    rectangular_mask = Image.new("L", image.size, 255)
+
+    for i, radius in enumerate(clamped_radii):
+        if radius > 0:
+            circle = Image.new("L", (radius * 2, radius * 2), 0)
+            draw = ImageDraw.Draw(circle)
+            draw.ellipse((0, 0, radius * 2 - 1, radius * 2 - 1), fill=255)
+
+            if i == 0:
+                rounded_mask.paste(circle.crop((0, 0, radius, radius)), (0, 0))
+                rectangular_mask.paste(0, (0, 0, radius, radius))
+            elif i == 1:
+                rounded_mask.paste(
+                    circle.crop((radius, 0, radius * 2, radius)), (w - radius, 0)
+                )
+                rectangular_mask.paste(0, (w - radius, 0, w, radius))
+            elif i == 2:
+                rounded_mask.paste(
+                    circle.crop((radius, radius, radius * 2, radius * 2)),
+                    (w - radius, h - radius),
+                )
+                rectangular_mask.paste(0, (w - radius, h - radius, w, h))
+            else:
+                rounded_mask.paste(
+                    circle.crop((0, radius, radius, radius * 2)), (0, h - radius)
+                )
+                rectangular_mask.paste(0, (0, h - radius, radius, h))
+
+    original_alpha = image.getchannel("A")
+    corner_mask = Image.composite(rounded_mask, rectangular_mask, rounded_mask)
+    final_alpha = Image.composite(
+        original_alpha, Image.new("L", image.size, 0), corner_mask
+    )
+
+    result = Image.new("RGBA", image.size)
+    result.paste(image.convert("RGB"), (0, 0))
+    result.putalpha(final_alpha)
+    return result
+
+
+def legacy_invert_image(img: Image.Image) -> Image.Image:
+    new_data = []
+    for r, g, b, a in img.getdata():
+        if a != 0:
+            new_data.append((255 - r, 255 - g, 255 - b, a))
+        else:
+            new_data.append((0, 0, 0, 0))
+
+    new_img = Image.new("RGBA", img.size)
+    new_img.putdata(new_data)
+    return new_img
+
+
+def legacy_set_image_opacity(image: Image.Image, opacity: float) -> Image.Image:
+    opacity = max(0.0, min(1.0, opacity))
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+
+    new_alpha = image.getchannel("A").point(lambda x: int(x * opacity))
+
+    result = Image.new("RGBA", image.size)
+    result.paste(image.convert("RGB"), (0, 0))
+    result.putalpha(new_alpha)
+    return result
+
+
+def make_test_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    """Random RGBA noise with a band of fully transparent pixels."""
+    rng = random.Random(seed)
+    image = Image.frombytes("RGBA", (width, height), rng.randbytes(width * height * 4))
+    image.paste((12, 34, 56, 0), (0, 0, width, max(1, height // 10)))
+    return image
+
+
+def time_callable(func: Callable[[], object], repeat: int) -> float:
+    """Returns the best wall time of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(size: int = 1024, repeat: int = 5) -> List[dict]:
+    image = make_test_image(size, size)
+    radii = [size // 8, size // 4, 0, size]
+
+    cases = [
+        (
+            "invert_image",
+            lambda: invert_image(image),
+            lambda: legacy_invert_image(image),
+        ),
+        (
+            "set_image_opacity",
+            lambda: set_image_opacity(image, 0.37),
+            lambda: legacy_set_image_opacity(image, 0.37),
+        ),
+        (
+            "round_image_corners",
+            lambda: round_image_corners(image, radii),
+            lambda: legacy_round_image_corners(image, radii),
+        ),
+    ]
+
+    results = []
+    for name, current, legacy in cases:
+        identical = current().tobytes() == legacy().tobytes()
+        current_ms = time_callable(current, repeat)
+        legacy_ms = time_callable(legacy, repeat)
+        results.append(
+            {
+                "name": name,
+                "size": size,
+                "identical": identical,
+                "legacy_ms": round(legacy_ms, 3),
+                "current_ms": round(current_ms, 3),
+                "speedup": round(legacy_ms / current_ms, 2) if current_ms else None,
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.size, args.repeat), indent=2))
@@ -0,0 +1,279 @@
+"""
+Benchmark for services/score_based_chunker.py on a large markdown document.
+
+Compares the single pass chunker and its streaming variant against the
+previous implementation, which matched every heading line against the whole
+heading list, and checks that all of them return the same chunks.
+
+Usage:
+    python -m benchmarks.score_based_chunker_benchmark [--size-mb 10] [--top-k 10]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from models.document_chunk import DocumentChunk
+from services.score_based_chunker import ScoreBasedChunker
+
+
+class LegacyScoreBasedChunker:
+    """Chunker before the single pass rewrite, kept as reference."""
+
+
+    def extract_headings(self, text: str) -> List[str]:
+        lines = text.split("\n")
+        headings = []
+        
+        for line in lines:
+            line = line.strip()
+            if line.startswith("#"):
+                headings.append(line)
+        
+        return headings
+
+    def score_headings(self, headings: List[str]) -> List[float]:
+        heading_scores = []
+        last_heading_index = -1
+        first_heading_found = False
+
+        for i, heading in enumerate(headings):
+            score = 0.0
+            
+            heading_level = len(heading) - len(heading.lstrip("#"))
+            
+            if heading_level <= 3:
+                score += 10.0 - (heading_level - 1) * 2.0
+            else:
+                score += 4.0 - (heading_level - 4) * 0.5
+
+            if not first_heading_found:
+                score += 5.0
+                first_heading_found = True
+
+            if last_heading_index != -1:
+                distance = i - last_heading_index
+                distance_bonus = min(5.0, distance * 0.5)
+                score += distance_bonus
+
+            last_heading_index = i
+            heading_scores.append(score)
+
+        return heading_scores
+
+    def get_chunks_from_headings(
+        self,
+        text: str,
+        headings: List[str],
+        heading_scores: List[float],
+        top_k: int = 10,
+    ) -> List[DocumentChunk]:
+        if not heading_scores:
+            heading_scores = self.score_headings(headings)
+
+        chunks = []
+        heading_indices = []
+
+        for i, score in enumerate(heading_scores):
+            if score > 0:
+                heading_indices.append((i, score))
+
+        if len(heading_indices) == 0:
+            return chunks
+
+        heading_indices.sort(key=lambda x: (-x[1], x[0]))
+
+        if len(heading_indices) <= top_k:
+            selected_indices = [idx for idx, _ in heading_indices]
+            selected_indices.sort()
+        else:
+            score_groups = {}
+            for idx, score in heading_indices:
+                rounded_score = round(score)
+                if rounded_score not in score_groups:
+                    score_groups[rounded_score] = []
+                score_groups[rounded_score].append(idx)
+
+            sorted_groups = sorted(
+                score_groups.items(), key=lambda x: x[0], reverse=True
+            )
+
+            selected_indices = []
+
+            for score, indices in sorted_groups:
+                indices.sort()
+                remaining_needed = top_k - len(selected_indices)
+
+                if remaining_needed <= 0:
+                    break
+
+                if len(indices) <= remaining_needed:
+                    selected_indices.extend(indices)
+                else:
+                    if remaining_needed == 1:
+                        mid_idx = len(indices) // 2
+                        selected_indices.append(indices[mid_idx])
+                    elif remaining_needed == 2:
+                        selected_indices.append(indices[0])
+                        selected_indices.append(indices[-1])
+                    else:
+                        step = (len(indices) - 1) / (remaining_needed - 1)
+
+                        for i in range(remaining_needed):
+                            index = int(round(i * step))
+                            if index < len(indices):
+                                selected_indices.append(indices[index])
+
+            selected_indices.sort()
+
+        lines = text.split("\n")
+        heading_positions = {}
+        
+        for i, line in enumerate(lines):
+            line_stripped = line.strip()
+            if line_stripped.startswith("#"):
+                for heading_idx, heading in enumerate(headings):
+                    if heading == line_stripped and heading_idx not in heading_positions:
+                        heading_positions[heading_idx] = i
+                        break
+        
+        for i, heading_idx in enumerate(selected_indices):
+            if heading_idx not in heading_positions:
+                continue
+                
+            heading = headings[heading_idx]
+            heading_line_idx = heading_positions[heading_idx]
+            
+            if i + 1 < len(selected_indices):
+                next_heading_idx = selected_indices[i + 1]
+                if next_heading_idx in heading_positions:
+                    next_heading_line_idx = heading_positions[next_heading_idx]
+                    content_end = next_heading_line_idx
+                else:
+                    content_end = len(lines)
+            else:
+                content_end = len(lines)
+
+            content_lines = lines[heading_line_idx + 1 : content_end]
+            content = "\n".join(content_lines).strip()
+
+            chunk = DocumentChunk(
+                heading=heading,
+                content=content,
+                heading_index=heading_idx,
+                score=heading_scores[heading_idx],
+            )
+            chunks.append(chunk)
+            
+        return chunks
+
+
+def make_markdown(size_mb: float, seed: int = 0) -> str:
+    """
+    Docling-like markdown with headings of mixed levels, paragraphs, lists
+    and repeated headings.
+    """
+    rng = random.Random(seed)
+    words = (
+        "energy solar grid storage policy market demand capacity price battery "
+        "wind transmission carbon emissions investment efficiency"
+    ).split()
+    target_size = int(size_mb * 1024 * 1024)
+
+    parts = []
+    size = 0
+    section = 0
+    while size < target_size:
+        level = rng.choice([1, 2, 2, 3, 3, 3, 4, 5])
+        title = "Summary" if section % 50 == 0 else f"Section {section}"
+        lines = [f"{'#' * level} {title}", ""]
+        for _ in range(rng.randint(1, 4)):
+            lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(20, 80))))
+            lines.append("")
+        if rng.random() < 0.3:
+            lines.extend(f"- {rng.choice(words)} {rng.randint(1, 100)}%" for _ in range(4))
+            lines.append("")
+        part = "\n".join(lines)
+        parts.append(part)
+        size += len(part) + 1
+        section += 1
+    return "\n".join(parts)
+
+
+def measure(func: Callable[[], List[DocumentChunk]]) -> Tuple[List[DocumentChunk], float, float]:
+    """Returns the result, wall time in ms and peak traced memory in MB."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed * 1000, peak / (1024 * 1024)
+
+
+def run(size_mb: float = 10, top_k: int = 10, skip_legacy: bool = False) -> dict:
+    text = make_markdown(size_mb)
+    chunker = ScoreBasedChunker()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "fixture.md")
+        with open(file_path, "w") as f:
+            f.write(text)
+
+        chunks, current_ms, current_mb = measure(lambda: chunker.get_chunks(text, top_k))
+        streamed_chunks, streaming_ms, streaming_mb = measure(
+            lambda: list(chunker.iter_chunks_from_file(file_path, top_k))
+        )
+
+    expected = [chunk.model_dump() for chunk in chunks]
+    result = {
+        "size_mb": round(len(text) / (1024 * 1024), 2),
+        "headings": len(chunker.extract_headings(text)),
+        "top_k": top_k,
+        "current_ms": round(current_ms, 2),
+        "current_peak_mb": round(current_mb, 2),
+        "streaming_ms": round(streaming_ms, 2),
+        "streaming_peak_mb": round(streaming_mb, 2),
+        "streaming_identical": [chunk.model_dump() for chunk in streamed_chunks]
+        == expected,
+    }
+
+    if not skip_legacy:
+        legacy_chunker = LegacyScoreBasedChunker()
+
+        def legacy_get_chunks():
+            headings = legacy_chunker.extract_headings(text)
+            heading_scores = legacy_chunker.score_headings(headings)
+            return legacy_chunker.get_chunks_from_headings(
+                text, headings, heading_scores, top_k
+            )
+
+        legacy_chunks, legacy_ms, legacy_mb = measure(legacy_get_chunks)
+        result.update(
+            {
+                "legacy_ms": round(legacy_ms, 2),
+                "legacy_peak_mb": round(legacy_mb, 2),
+                "legacy_identical": [chunk.model_dump() for chunk in legacy_chunks]
+                == expected,
+                "speedup": round(legacy_ms / current_ms, 2),
+            }
+        )
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="Skip the slow previous implementation"
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.size_mb, args.top_k, args.skip_legacy), indent=2))
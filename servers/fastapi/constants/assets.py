@@ -0,0 +1,54 @@
+# Network asset downloads
+DEFAULT_ASSET_DOWNLOAD_MAX_SIZE_MB = 50
+DEFAULT_ASSET_DOWNLOAD_TIMEOUT = 30
+DEFAULT_ASSET_DOWNLOAD_PER_HOST_LIMIT = 6
+DEFAULT_ASSET_DOWNLOAD_TOTAL_LIMIT = 64
+# Seconds a cached download is used without asking the server again
+DEFAULT_ASSET_DOWNLOAD_REVALIDATE_AFTER = 3600
+# Least recently used downloads are evicted beyond this size
+DEFAULT_ASSET_DOWNLOAD_CACHE_MAX_SIZE_MB = 1024
+
+# Stock image search results, reused across decks until they expire
+DEFAULT_STOCK_IMAGE_CACHE_TTL = 7 * 24 * 3600
+# Seconds a search without results is remembered
+STOCK_IMAGE_NEGATIVE_CACHE_TTL = 3600
+STOCK_IMAGE_CACHE_SIZE = 2048
+# Stock image provider requests
+DEFAULT_STOCK_IMAGE_TIMEOUT = 10
+STOCK_IMAGE_CONNECT_TIMEOUT = 5
+STOCK_IMAGE_PER_PROVIDER_LIMIT = 16
+
+# AI image generations running at once per provider, queued beyond that
+DEFAULT_IMAGE_GENERATION_CONCURRENCY = {"dall-e-3": 4, "gemini_flash": 4}
+DEFAULT_IMAGE_GENERATION_PROVIDER_CONCURRENCY = 4
+# Generated images reused for the same prompt while their files exist
+IMAGE_GENERATION_RESULT_CACHE_SIZE = 1024
+
+# Content-addressed image files, collected once no slide or asset uses them
+DEFAULT_IMAGE_ASSET_GC_INTERVAL = 6 * 3600
+# Seconds an unreferenced image is kept, as decks being generated are not saved yet
+DEFAULT_IMAGE_ASSET_GC_GRACE_PERIOD = 24 * 3600
+IMAGE_ASSET_HASH_CHUNK_SIZE = 1024 * 1024
+
+# WebP renditions of images, by the longest side of each variant in pixels
+IMAGE_RENDITIONS = {"thumbnail": 320, "medium": 1280}
+IMAGE_RENDITIONS_DIRECTORY_NAME = "renditions"
+IMAGE_RENDITION_WEBP_QUALITY = 80
+IMAGE_RENDITION_SOURCE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"]
+DEFAULT_IMAGE_RENDITION_WORKERS = 2
+IMAGE_RENDITION_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Images embedded into exported PPTX
+EXPORT_IMAGE_JPEG_QUALITY = 85
+
+# Icon search, over the static icon catalog shipped with the server
+ICONS_FILE_PATH = "assets/icons.json"
+ICON_INDEX_DIRECTORY = "chroma/icons"
+# Bump when the index layout or the embedding model changes, to rebuild old indexes
+ICON_INDEX_VERSION = 2
+# Icon queries whose results are remembered across requests
+ICON_QUERY_CACHE_SIZE = 4096
+# Keyword score from which icons are found without embedding the query
+DEFAULT_ICON_SEARCH_MIN_KEYWORD_SCORE = 0.8
+# Weight of keyword scores added to embedding similarities otherwise
+DEFAULT_ICON_SEARCH_KEYWORD_WEIGHT = 0.3
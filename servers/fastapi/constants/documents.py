@@ -18,3 +18,44 @@ WEBP_MIME_TYPES = ["image/webp"]
 UPLOAD_ACCEPTED_FILE_TYPES = (
     PDF_MIME_TYPES + TEXT_MIME_TYPES + POWERPOINT_TYPES + WORD_TYPES
 )
+
+
+# Docling conversion worker pool
+DEFAULT_DOCLING_WORKERS = 1
+# A worker is replaced after converting this many documents
+DEFAULT_DOCLING_MAX_TASKS_PER_WORKER = 50
+# The pool is recycled once a worker's peak RSS grows past this
+DEFAULT_DOCLING_MAX_WORKER_RSS_MB = 4096
+
+# Page images rendered from PDFs
+PDF_PAGE_IMAGE_RESOLUTION = 150
+PDF_PAGE_IMAGE_FORMATS = ["png", "jpeg", "webp"]
+DEFAULT_PDF_PAGE_IMAGE_FORMAT = "png"
+DEFAULT_PDF_PAGE_IMAGE_WORKERS = 4
+# Rendered first in lazy mode, full pages are rendered on request
+PDF_PAGE_THUMBNAIL_RESOLUTION = 36
+
+# Parsed documents cache
+DEFAULT_DOCUMENT_CACHE_MAX_SIZE_MB = 1024
+
+# Files loaded at the same time by DocumentsLoader
+DEFAULT_DOCUMENTS_LOADER_CONCURRENCY = 4
+
+# Uploads are written to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+DEFAULT_UPLOAD_MAX_SIZE_MB = 100
+# Bytes at fixed offsets of a file of each type, as (offset, bytes) pairs
+# that must all match, checked while uploading
+UPLOAD_FILE_SIGNATURES = {
+    "application/pdf": [(0, b"%PDF-")],
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": [
+        (0, b"PK\x03\x04")
+    ],
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": [
+        (0, b"PK\x03\x04")
+    ],
+    "application/msword": [(0, b"\xd0\xcf\x11\xe0")],
+    "image/png": [(0, b"\x89PNG\r\n\x1a\n")],
+    "image/jpeg": [(0, b"\xff\xd8\xff")],
+    "image/webp": [(0, b"RIFF"), (8, b"WEBP")],
+}
@@ -4,3 +4,32 @@ OPENAI_URL = "https://api.openai.com/v1"
 DEFAULT_OPENAI_MODEL = "gpt-4.1"
 DEFAULT_GOOGLE_MODEL = "models/gemini-2.5-flash"
 DEFAULT_ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+
+# Context windows in tokens, matched by model name prefix
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4.1": 1_000_000,
+    "gpt-4o": 128_000,
+    "gpt-5": 400_000,
+    "o3": 200_000,
+    "o4": 200_000,
+    "models/gemini": 1_000_000,
+    "gemini": 1_000_000,
+    "claude": 200_000,
+}
+# Used for Ollama and custom models, whose context window is not known
+DEFAULT_MODEL_CONTEXT_WINDOW = 8_192
+# Rough estimate used to budget prompts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Uploaded documents in the outline prompt, condensed when larger than this
+# share of the context window or this many tokens
+ADDITIONAL_CONTEXT_WINDOW_RATIO = 0.25
+DEFAULT_ADDITIONAL_CONTEXT_MAX_TOKENS = 32_000
+DEFAULT_CONTEXT_CONDENSE_CONCURRENCY = 4
+
+# Retrieval of uploaded document chunks for slide content
+RETRIEVAL_CHUNK_CHARS = 1500
+RETRIEVAL_TOP_K = 4
+RETRIEVAL_CONTEXT_MAX_TOKENS = 1000
+# Indexes of recently generated presentations kept in memory
+RETRIEVAL_INDEX_CACHE_SIZE = 16
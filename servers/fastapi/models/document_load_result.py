@@ -0,0 +1,10 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class DocumentLoadResult(BaseModel):
+    file_path: str
+    document: str = ""
+    images: List[str] = []
+    error: Optional[str] = None
+    duration: float = 0
@@ -1,5 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+import hashlib
+import json
+from typing import Iterable, List, Optional
 import uuid
 from sqlalchemy import JSON, Column, DateTime, String
 from sqlmodel import Boolean, Field, SQLModel
@@ -7,6 +9,7 @@ from sqlmodel import Boolean, Field, SQLModel
 from models.presentation_layout import PresentationLayoutModel
 from models.presentation_outline_model import PresentationOutlineModel
 from models.presentation_structure_model import PresentationStructureModel
+from models.sql.slide import SlideModel
 from utils.datetime_utils import get_current_utc_datetime
 
 
@@ -78,3 +81,27 @@ class PresentationModel(SQLModel, table=True):
 
     def set_structure(self, structure: PresentationStructureModel):
         self.structure = structure.model_dump()
+
+    def get_content_revision(self, slides: Iterable[SlideModel]) -> str:
+        """
+        Hash of everything that changes the exported file.
+        Theme lives inside the layout, so it is covered by the layout.
+        """
+        revision_data = {
+            "title": self.title,
+            "layout": self.layout,
+            "slides": [
+                {
+                    "layout_group": slide.layout_group,
+                    "layout": slide.layout,
+                    "index": slide.index,
+                    "content": slide.content,
+                    "html_content": slide.html_content,
+                    "speaker_note": slide.speaker_note,
+                    "properties": slide.properties,
+                }
+                for slide in sorted(slides, key=lambda slide: slide.index)
+            ],
+        }
+        revision_json = json.dumps(revision_data, sort_keys=True, default=str)
+        return hashlib.sha256(revision_json.encode("utf-8")).hexdigest()
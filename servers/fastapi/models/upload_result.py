@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class UploadResult(BaseModel):
+    path: str
+    size: int
+    sha256: str
+    duration: float
@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from constants.assets import (
+    DEFAULT_ASSET_DOWNLOAD_CACHE_MAX_SIZE_MB,
+    DEFAULT_ASSET_DOWNLOAD_MAX_SIZE_MB,
+    DEFAULT_ASSET_DOWNLOAD_PER_HOST_LIMIT,
+    DEFAULT_ASSET_DOWNLOAD_REVALIDATE_AFTER,
+    DEFAULT_ASSET_DOWNLOAD_TIMEOUT,
+    DEFAULT_ASSET_DOWNLOAD_TOTAL_LIMIT,
+)
+from utils.asset_directory_utils import get_download_cache_directory
+from utils.file_utils import write_file
+from utils.get_env import (
+    get_asset_download_cache_max_size_mb_env,
+    get_asset_download_max_size_mb_env,
+    get_asset_download_per_host_limit_env,
+    get_asset_download_revalidate_after_env,
+    get_asset_download_timeout_env,
+)
+from utils.parsers import parse_int_or_default
+import uuid
+
+
+class AssetDownloaderService:
+    """
+    Downloads network assets through one pooled session.
+
+    - Connections are capped per host by the session connector.
+    - The same URL is downloaded once per batch and once while in flight.
+    - Files are stored by content hash and revalidated with ETag/Last-Modified.
+    - Least recently used files are evicted beyond the cache size limit.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    @property
+    def max_size(self) -> int:
+        max_size_mb = parse_int_or_default(
+            get_asset_download_max_size_mb_env(), DEFAULT_ASSET_DOWNLOAD_MAX_SIZE_MB
+        )
+        return max_size_mb * 1024 * 1024
+
+    @property
+    def cache_max_size(self) -> int:
+        max_size_mb = parse_int_or_default(
+            get_asset_download_cache_max_size_mb_env(),
+            DEFAULT_ASSET_DOWNLOAD_CACHE_MAX_SIZE_MB,
+        )
+        return max_size_mb * 1024 * 1024
+
+    @property
+    def revalidate_after(self) -> int:
+        return parse_int_or_default(
+            get_asset_download_revalidate_after_env(),
+            DEFAULT_ASSET_DOWNLOAD_REVALIDATE_AFTER,
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # A session can only be used on the event loop it was created in
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            self._session = aiohttp.ClientSession(
+                trust_env=True,
+                connector=aiohttp.TCPConnector(
+                    limit=DEFAULT_ASSET_DOWNLOAD_TOTAL_LIMIT,
+                    limit_per_host=parse_int_or_default(
+                        get_asset_download_per_host_limit_env(),
+                        DEFAULT_ASSET_DOWNLOAD_PER_HOST_LIMIT,
+                    ),
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=parse_int_or_default(
+                        get_asset_download_timeout_env(),
+                        DEFAULT_ASSET_DOWNLOAD_TIMEOUT,
+                    )
+                ),
+            )
+            self._session_loop = loop
+            self._in_flight = {}
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def download_files(self, urls: List[str]) -> List[Optional[str]]:
+        unique_urls = list(dict.fromkeys(urls))
+        print(f"Downloading {len(unique_urls)} unique assets for {len(urls)} urls")
+
+        results = await asyncio.gather(
+            *[self.download_file(url) for url in unique_urls]
+        )
+        downloaded_paths = dict(zip(unique_urls, results))
+
+        successful_downloads = sum(1 for result in results if result is not None)
+        print(
+            f"Download completed: {successful_downloads}/{len(unique_urls)} assets available"
+        )
+
+        return [downloaded_paths[url] for url in urls]
+
+    async def download_file(self, url: str) -> Optional[str]:
+        session = self.get_session()
+
+        task = self._in_flight.get(url)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._download_file(session, url))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+
+        # Shielded so one cancelled caller doesn't cancel the download for others
+        return await asyncio.shield(task)
+
+    def _get_entry_path(self, url: str) -> str:
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self._get_index_directory(), f"{url_hash}.json")
+
+    def _get_blobs_directory(self) -> str:
+        return os.path.join(get_download_cache_directory(), "blobs")
+
+    def _get_blob_path(self, file_name: str) -> str:
+        return os.path.join(self._get_blobs_directory(), file_name)
+
+    def _get_index_directory(self) -> str:
+        return os.path.join(get_download_cache_directory(), "index")
+
+    def _read_entry(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._get_entry_path(url), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            # Marks the file as recently used for eviction
+            os.utime(self._get_blob_path(entry["file_name"]))
+        except OSError:
+            return None
+        return entry
+
+    def _write_entry(self, url: str, entry: dict):
+        entry_path = self._get_entry_path(url)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        write_file(entry_path, json.dumps(entry).encode("utf-8"))
+
+    def _replace_blob(self, old_file_name: Optional[str], file_name: str):
+        """
+        Removes the file an entry pointed to before it was downloaded again,
+        then evicts. Other urls with the same content download it again.
+        """
+        if old_file_name and old_file_name != file_name:
+            try:
+                os.remove(self._get_blob_path(old_file_name))
+            except OSError:
+                pass
+        self.evict(keep=file_name)
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Removes the least recently used files until the cache fits its size
+        limit, and the index entries of removed files. keep is never removed.
+        """
+        try:
+            blobs = [
+                (each.stat().st_mtime, each.path, each.stat().st_size)
+                for each in os.scandir(self._get_blobs_directory())
+                if each.is_file()
+                and not each.name.endswith(".tmp")
+                and each.name != keep
+            ]
+        except OSError:
+            return
+
+        total_size = sum(size for _, _, size in blobs)
+        if keep and os.path.isfile(self._get_blob_path(keep)):
+            total_size += os.path.getsize(self._get_blob_path(keep))
+        max_size = self.cache_max_size
+        removed = 0
+        for _, blob_path, size in sorted(blobs):
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(blob_path)
+            except OSError:
+                continue
+            total_size -= size
+            removed += 1
+
+        if removed:
+            for each in os.scandir(self._get_index_directory()):
+                try:
+                    with open(each.path, "r") as f:
+                        file_name = json.load(f)["file_name"]
+                    if not os.path.isfile(self._get_blob_path(file_name)):
+                        os.remove(each.path)
+                except (OSError, ValueError, KeyError):
+                    pass
+
+    def _get_extension(self, url: str, content_type: Optional[str]) -> str:
+        extension = os.path.splitext(urlparse(url).path)[1]
+        if extension:
+            return extension.lower()
+        if content_type:
+            return mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+        return ""
+
+    async def _download_file(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> Optional[str]:
+        entry = await asyncio.to_thread(self._read_entry, url)
+        cached_path = self._get_blob_path(entry["file_name"]) if entry else None
+
+        if entry and time.time() - entry["checked_at"] < self.revalidate_after:
+            return cached_path
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        temp_path = None
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry:
+                    entry["checked_at"] = time.time()
+                    await asyncio.to_thread(self._write_entry, url, entry)
+                    return cached_path
+
+                if response.status != 200:
+                    print(f"Failed to download {url}. HTTP status: {response.status}")
+                    return cached_path
+
+                max_size = self.max_size
+                if response.content_length and response.content_length > max_size:
+                    print(f"Skipping {url}: {response.content_length} bytes is too large")
+                    return cached_path
+
+                os.makedirs(self._get_blobs_directory(), exist_ok=True)
+                temp_path = self._get_blob_path(f"{uuid.uuid4()}.tmp")
+
+                hasher = hashlib.sha256()
+                downloaded_size = 0
+                with open(temp_path, "wb") as file:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        downloaded_size += len(chunk)
+                        if downloaded_size > max_size:
+                            raise ValueError(f"File exceeded {max_size} bytes")
+                        hasher.update(chunk)
+                        await asyncio.to_thread(file.write, chunk)
+
+                extension = self._get_extension(
+                    url, response.headers.get("Content-Type")
+                )
+                file_name = f"{hasher.hexdigest()}{extension}"
+                await asyncio.to_thread(
+                    os.replace, temp_path, self._get_blob_path(file_name)
+                )
+                temp_path = None
+
+                await asyncio.to_thread(
+                    self._write_entry,
+                    url,
+                    {
+                        "url": url,
+                        "file_name": file_name,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "checked_at": time.time(),
+                    },
+                )
+                await asyncio.to_thread(
+                    self._replace_blob, entry and entry["file_name"], file_name
+                )
+                return self._get_blob_path(file_name)
+
+        except Exception as e:
+            print(f"Error downloading file from {url}: {e}")
+            # Stale copy is better than no image
+            return cached_path
+
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+ASSET_DOWNLOADER_SERVICE = AssetDownloaderService()
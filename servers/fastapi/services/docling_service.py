@@ -1,33 +1,180 @@
-from docling.document_converter import (
-    DocumentConverter,
-    PdfFormatOption,
-    PowerpointFormatOption,
-    WordFormatOption,
+import asyncio
+import multiprocessing
+import resource
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+from constants.documents import (
+    DEFAULT_DOCLING_MAX_TASKS_PER_WORKER,
+    DEFAULT_DOCLING_MAX_WORKER_RSS_MB,
+    DEFAULT_DOCLING_WORKERS,
+)
+from utils.get_env import (
+    get_docling_max_tasks_per_worker_env,
+    get_docling_max_worker_rss_mb_env,
+    get_docling_workers_env,
 )
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.datamodel.base_models import InputFormat
+from utils.parsers import parse_int_or_default
+
+
+# Options that change the parsed output, part of the parsed documents cache key
+DOCLING_PARSER_OPTIONS = {"parser": "docling", "do_ocr": False}
+
+# Converter of the current worker process, created once by the pool initializer
+_converter = None
+
+
+def create_converter():
+    # Imported in the workers only, the server process never loads docling
+    from docling.document_converter import (
+        DocumentConverter,
+        PdfFormatOption,
+        PowerpointFormatOption,
+        WordFormatOption,
+    )
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.datamodel.base_models import InputFormat
+
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = DOCLING_PARSER_OPTIONS["do_ocr"]
+
+    return DocumentConverter(
+        allowed_formats=[InputFormat.PPTX, InputFormat.PDF, InputFormat.DOCX],
+        format_options={
+            InputFormat.DOCX: WordFormatOption(
+                pipeline_options=pipeline_options,
+            ),
+            InputFormat.PPTX: PowerpointFormatOption(
+                pipeline_options=pipeline_options,
+            ),
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=pipeline_options,
+            ),
+        },
+    )
+
+
+def _init_worker():
+    global _converter
+    _converter = create_converter()
+
+
+def _get_peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss /= 1024
+    return peak_rss / 1024
+
+
+def _parse_to_markdown(file_path: str) -> Tuple[str, float]:
+    result = _converter.convert(file_path)
+    return result.document.export_to_markdown(), _get_peak_rss_mb()
 
 
 class DoclingService:
-    def __init__(self):
-        self.pipeline_options = PdfPipelineOptions()
-        self.pipeline_options.do_ocr = False
-
-        self.converter = DocumentConverter(
-            allowed_formats=[InputFormat.PPTX, InputFormat.PDF, InputFormat.DOCX],
-            format_options={
-                InputFormat.DOCX: WordFormatOption(
-                    pipeline_options=self.pipeline_options,
-                ),
-                InputFormat.PPTX: PowerpointFormatOption(
-                    pipeline_options=self.pipeline_options,
-                ),
-                InputFormat.PDF: PdfFormatOption(
-                    pipeline_options=self.pipeline_options,
-                ),
-            },
+    """
+    Converts documents in a pool of worker processes, each holding one warm
+    DocumentConverter, so conversions don't block the event loop.
+
+    Workers are replaced after a number of documents, and the whole pool is
+    recycled once a worker grows past the RSS limit, to contain memory growth.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        max_worker_rss_mb: Optional[int] = None,
+        initialize_worker: Callable[[], None] = _init_worker,
+        parse: Callable[[str], Tuple[str, float]] = _parse_to_markdown,
+    ):
+        self.max_workers = max_workers or parse_int_or_default(
+            get_docling_workers_env(), DEFAULT_DOCLING_WORKERS
+        )
+        self.max_tasks_per_worker = max_tasks_per_worker or parse_int_or_default(
+            get_docling_max_tasks_per_worker_env(),
+            DEFAULT_DOCLING_MAX_TASKS_PER_WORKER,
+        )
+        self.max_worker_rss_mb = max_worker_rss_mb or parse_int_or_default(
+            get_docling_max_worker_rss_mb_env(), DEFAULT_DOCLING_MAX_WORKER_RSS_MB
         )
 
-    def parse_to_markdown(self, file_path: str) -> str:
-        result = self.converter.convert(file_path)
-        return result.document.export_to_markdown()
+        # Run in the workers, so they must be importable module functions
+        self._initialize_worker = initialize_worker
+        self._parse = parse
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned, as forking the server process would copy its threads and event loop
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self._initialize_worker,
+                    max_tasks_per_child=self.max_tasks_per_worker,
+                )
+            return self._pool
+
+    def recycle_pool(self, pool: ProcessPoolExecutor):
+        """
+        Replaces the pool for new conversions. Conversions already submitted
+        to the old pool still finish before its workers exit.
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def shutdown(self):
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def prewarm(self):
+        """
+        Starts the workers and their converters, so the first upload doesn't
+        wait for them. Failures are logged, as conversions start workers anyway.
+        """
+        pool = self.get_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(
+                *[
+                    loop.run_in_executor(pool, _get_peak_rss_mb)
+                    for _ in range(self.max_workers)
+                ]
+            )
+        except Exception as e:
+            print(f"Failed to start docling workers: {e}")
+            self.recycle_pool(pool)
+
+    async def parse_to_markdown(self, file_path: str) -> str:
+        pool = self.get_pool()
+        try:
+            markdown, worker_rss_mb = await asyncio.get_running_loop().run_in_executor(
+                pool, self._parse, file_path
+            )
+        except BrokenProcessPool:
+            # A worker died, e.g. killed for running out of memory
+            self.recycle_pool(pool)
+            raise
+
+        if worker_rss_mb > self.max_worker_rss_mb:
+            print(
+                f"Docling worker reached {worker_rss_mb:.0f} MB, recycling worker pool"
+            )
+            self.recycle_pool(pool)
+
+        return markdown
+
+
+DOCLING_SERVICE = DoclingService()
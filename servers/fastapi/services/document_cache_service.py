@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import List, Optional
+
+from constants.documents import DEFAULT_DOCUMENT_CACHE_MAX_SIZE_MB
+from utils.asset_directory_utils import get_document_cache_directory
+from utils.get_env import get_document_cache_max_size_mb_env
+from utils.parsers import parse_int_or_default
+import uuid
+
+
+class DocumentCacheService:
+    """
+    Keeps parsed markdown and rendered page images of uploaded documents.
+
+    Entries are stored as cache/documents/<key>/ where the key is derived from
+    the file content and the options used to parse it, so re-uploads of the
+    same file are not parsed again. Least recently used entries are evicted
+    once the cache grows past its size limit.
+    """
+
+    MARKDOWN_FILE_NAME = "document.md"
+    PAGES_DIRECTORY_NAME = "pages"
+
+    @property
+    def max_size(self) -> int:
+        max_size_mb = parse_int_or_default(
+            get_document_cache_max_size_mb_env(), DEFAULT_DOCUMENT_CACHE_MAX_SIZE_MB
+        )
+        return max_size_mb * 1024 * 1024
+
+    def get_file_hash(self, file_path: str) -> str:
+        with open(file_path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+    def get_cache_key(self, file_hash: str, options: dict) -> str:
+        key_data = json.dumps({"file": file_hash, **options}, sort_keys=True)
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def get_entry_dir(self, key: str) -> str:
+        return os.path.join(get_document_cache_directory(), key)
+
+    def get_markdown(self, key: str) -> Optional[str]:
+        entry_dir = self.get_entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, self.MARKDOWN_FILE_NAME), "r") as f:
+                markdown = f.read()
+        except OSError:
+            return None
+
+        self._touch(entry_dir)
+        return markdown
+
+    def cache_markdown(self, key: str, markdown: str):
+        def write_entry(temp_dir: str):
+            with open(os.path.join(temp_dir, self.MARKDOWN_FILE_NAME), "w") as f:
+                f.write(markdown)
+
+        self._add_entry(key, write_entry)
+
+    def get_page_images(self, key: str, temp_dir: str) -> Optional[List[str]]:
+        """
+        Copies cached page images into temp_dir, as callers own and may remove them.
+        """
+        entry_dir = self.get_entry_dir(key)
+        pages_dir = os.path.join(entry_dir, self.PAGES_DIRECTORY_NAME)
+        if not os.path.isdir(pages_dir):
+            return None
+
+        image_paths = []
+        try:
+            with open(os.path.join(pages_dir, "index.json"), "r") as f:
+                file_names = json.load(f)
+            for file_name in file_names:
+                image_path = os.path.join(temp_dir, file_name)
+                shutil.copyfile(os.path.join(pages_dir, file_name), image_path)
+                image_paths.append(image_path)
+        except (OSError, ValueError):
+            return None
+
+        self._touch(entry_dir)
+        return image_paths
+
+    def cache_page_images(self, key: str, image_paths: List[str]):
+        def write_entry(temp_dir: str):
+            pages_dir = os.path.join(temp_dir, self.PAGES_DIRECTORY_NAME)
+            os.makedirs(pages_dir)
+            file_names = [os.path.basename(each) for each in image_paths]
+            for image_path, file_name in zip(image_paths, file_names):
+                shutil.copyfile(image_path, os.path.join(pages_dir, file_name))
+            with open(os.path.join(pages_dir, "index.json"), "w") as f:
+                json.dump(file_names, f)
+
+        self._add_entry(key, write_entry)
+
+    def _add_entry(self, key: str, write_entry):
+        entry_dir = self.get_entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return
+
+        # Written aside and renamed, so readers never see a partial entry
+        temp_dir = f"{entry_dir}.{uuid.uuid4()}.tmp"
+        os.makedirs(temp_dir)
+        try:
+            write_entry(temp_dir)
+            os.rename(temp_dir, entry_dir)
+        except OSError as e:
+            print(f"Failed to cache parsed document: {e}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        self.evict()
+
+    def _touch(self, entry_dir: str):
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+
+    def _get_dir_size(self, directory: str) -> int:
+        size = 0
+        for root, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                try:
+                    size += os.path.getsize(os.path.join(root, file_name))
+                except OSError:
+                    pass
+        return size
+
+    def evict(self):
+        cache_dir = get_document_cache_directory()
+        entries = []
+        for each in os.scandir(cache_dir):
+            if each.is_dir() and not each.name.endswith(".tmp"):
+                entries.append(
+                    (each.stat().st_mtime, each.path, self._get_dir_size(each.path))
+                )
+
+        total_size = sum(size for _, _, size in entries)
+        max_size = self.max_size
+        for _, entry_dir, size in sorted(entries):
+            if total_size <= max_size:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+
+
+DOCUMENT_CACHE_SERVICE = DocumentCacheService()
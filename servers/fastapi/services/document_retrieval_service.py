@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import shutil
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from constants.llm import (
+    CHARS_PER_TOKEN,
+    RETRIEVAL_CHUNK_CHARS,
+    RETRIEVAL_CONTEXT_MAX_TOKENS,
+    RETRIEVAL_INDEX_CACHE_SIZE,
+    RETRIEVAL_TOP_K,
+)
+from services.score_based_chunker import ScoreBasedChunker
+from utils.asset_directory_utils import get_retrieval_index_directory
+from utils.embedding_utils import embed_texts
+import uuid
+
+
+class DocumentRetrievalService:
+    """
+    Embedding index of uploaded document chunks, one per presentation.
+
+    Indexes are stored as retrieval/<presentation_id>/ with the chunks and
+    their embeddings, and the most recently used ones are kept in memory.
+    """
+
+    CHUNKS_FILE_NAME = "chunks.json"
+    EMBEDDINGS_FILE_NAME = "embeddings.npy"
+
+    def __init__(self, embed: Callable[[List[str]], np.ndarray] = embed_texts):
+        self._embed = embed
+        self._indexes: OrderedDict[str, Tuple[List[str], np.ndarray]] = OrderedDict()
+
+    def get_index_dir(self, presentation_id: uuid.UUID) -> str:
+        return os.path.join(get_retrieval_index_directory(), str(presentation_id))
+
+    def _remember(
+        self, presentation_id: uuid.UUID, index: Tuple[List[str], np.ndarray]
+    ):
+        self._indexes[str(presentation_id)] = index
+        self._indexes.move_to_end(str(presentation_id))
+        while len(self._indexes) > RETRIEVAL_INDEX_CACHE_SIZE:
+            self._indexes.popitem(last=False)
+
+    def _build_index(
+        self, presentation_id: uuid.UUID, documents: List[str]
+    ) -> Tuple[List[str], np.ndarray]:
+        chunker = ScoreBasedChunker()
+        chunks = []
+        for document in documents:
+            chunks.extend(
+                chunk
+                for chunk in chunker.get_sized_chunks(document, RETRIEVAL_CHUNK_CHARS)
+                if chunk.strip()
+            )
+        embeddings = self._embed(chunks)
+
+        index_dir = self.get_index_dir(presentation_id)
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, self.CHUNKS_FILE_NAME), "w") as f:
+            json.dump(chunks, f)
+        np.save(os.path.join(index_dir, self.EMBEDDINGS_FILE_NAME), embeddings)
+
+        return chunks, embeddings
+
+    def _load_index(
+        self, presentation_id: uuid.UUID
+    ) -> Optional[Tuple[List[str], np.ndarray]]:
+        index_dir = self.get_index_dir(presentation_id)
+        try:
+            with open(os.path.join(index_dir, self.CHUNKS_FILE_NAME), "r") as f:
+                chunks = json.load(f)
+            embeddings = np.load(os.path.join(index_dir, self.EMBEDDINGS_FILE_NAME))
+        except (OSError, ValueError):
+            return None
+        return chunks, embeddings
+
+    async def build_index(self, presentation_id: uuid.UUID, documents: List[str]):
+        """
+        Retrieval only adds context to slides, so a failure is logged, not raised.
+        """
+        try:
+            index = await asyncio.to_thread(
+                self._build_index, presentation_id, documents
+            )
+        except Exception as e:
+            print(f"Failed to index documents of presentation {presentation_id}: {e}")
+            return
+
+        self._remember(presentation_id, index)
+        print(
+            f"Indexed {len(index[0])} document chunks for presentation {presentation_id}"
+        )
+
+    async def get_index(
+        self, presentation_id: uuid.UUID
+    ) -> Optional[Tuple[List[str], np.ndarray]]:
+        index = self._indexes.get(str(presentation_id))
+        if index is None:
+            index = await asyncio.to_thread(self._load_index, presentation_id)
+            if index is None:
+                return None
+        self._remember(presentation_id, index)
+        return index
+
+    async def search(
+        self,
+        presentation_id: uuid.UUID,
+        query: str,
+        k: int = RETRIEVAL_TOP_K,
+        max_tokens: int = RETRIEVAL_CONTEXT_MAX_TOKENS,
+    ) -> List[str]:
+        """
+        Returns the chunks most similar to query, best first, within max_tokens.
+        """
+        index = await self.get_index(presentation_id)
+        if not index or not index[0]:
+            return []
+        chunks, embeddings = index
+
+        try:
+            query_embedding = (await asyncio.to_thread(self._embed, [query]))[0]
+        except Exception as e:
+            print(f"Failed to search documents of presentation {presentation_id}: {e}")
+            return []
+        scores = embeddings @ query_embedding
+        top_indices = np.argsort(-scores)[:k]
+
+        results = []
+        remaining_chars = max_tokens * CHARS_PER_TOKEN
+        for chunk_index in top_indices:
+            chunk = chunks[chunk_index]
+            if len(chunk) > remaining_chars:
+                if not results:
+                    results.append(chunk[:remaining_chars])
+                break
+            results.append(chunk)
+            remaining_chars -= len(chunk)
+        return results
+
+    def remove_index(self, presentation_id: uuid.UUID):
+        self._indexes.pop(str(presentation_id), None)
+        shutil.rmtree(self.get_index_dir(presentation_id), ignore_errors=True)
+
+
+DOCUMENT_RETRIEVAL_SERVICE = DocumentRetrievalService()
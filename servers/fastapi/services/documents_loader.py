@@ -1,27 +1,42 @@
 import mimetypes
 from fastapi import HTTPException
 import os, asyncio
-from typing import List, Tuple
-import pdfplumber
+import time
+from typing import List, Optional, Tuple
 
 from constants.documents import (
+    DEFAULT_DOCUMENTS_LOADER_CONCURRENCY,
     PDF_MIME_TYPES,
     POWERPOINT_TYPES,
     TEXT_MIME_TYPES,
     WORD_TYPES,
 )
-from services.docling_service import DoclingService
+from models.document_load_result import DocumentLoadResult
+from services.docling_service import DOCLING_PARSER_OPTIONS, DOCLING_SERVICE
+from services.document_cache_service import DOCUMENT_CACHE_SERVICE
+from services.pdf_page_image_service import (
+    PDF_PAGE_IMAGE_SERVICE,
+    get_pdf_page_count,
+    render_pdf_pages,
+)
+from utils.get_env import get_documents_loader_concurrency_env
+from utils.parsers import parse_int_or_default
 
 
 class DocumentsLoader:
 
-    def __init__(self, file_paths: List[str]):
+    def __init__(self, file_paths: List[str], concurrency: Optional[int] = None):
         self._file_paths = file_paths
+        self._concurrency = concurrency or parse_int_or_default(
+            get_documents_loader_concurrency_env(),
+            DEFAULT_DOCUMENTS_LOADER_CONCURRENCY,
+        )
 
-        self.docling_service = DoclingService()
+        self.docling_service = DOCLING_SERVICE
 
         self._documents: List[str] = []
         self._images: List[List[str]] = []
+        self._results: List[DocumentLoadResult] = []
 
     @property
     def documents(self):
@@ -31,41 +46,97 @@ class DocumentsLoader:
     def images(self):
         return self._images
 
+    @property
+    def results(self):
+        """
+        Per file results in input order, with errors and load duration in seconds.
+        """
+        return self._results
+
     async def load_documents(
         self,
-        temp_dir: str,
+        temp_dir: Optional[str] = None,
         load_text: bool = True,
         load_images: bool = False,
     ):
-        documents: List[str] = []
-        images: List[str] = []
-
+        """
+        Loads files concurrently. A file that fails to load gets an empty
+        document and its error in results, without failing the other files.
+        Raises when every file fails, as there is nothing to continue with.
+        """
         for file_path in self._file_paths:
             if not os.path.exists(file_path):
                 raise HTTPException(
                     status_code=404, detail=f"File {file_path} not found"
                 )
 
-            document = ""
-            imgs = []
+        semaphore = asyncio.Semaphore(self._concurrency)
 
+        async def load_with_limit(index: int, file_path: str) -> DocumentLoadResult:
+            async with semaphore:
+                return await self.load_document(
+                    index, file_path, temp_dir, load_text, load_images
+                )
+
+        results = await asyncio.gather(
+            *[
+                load_with_limit(index, file_path)
+                for index, file_path in enumerate(self._file_paths)
+            ]
+        )
+
+        errors = [result for result in results if result.error is not None]
+        if errors and len(errors) == len(results):
+            raise HTTPException(
+                status_code=400,
+                detail="Failed to load documents: "
+                + "; ".join(
+                    f"{os.path.basename(result.file_path)}: {result.error}"
+                    for result in errors
+                ),
+            )
+
+        self._results = results
+        self._documents = [result.document for result in results]
+        self._images = [result.images for result in results]
+
+    async def load_document(
+        self,
+        index: int,
+        file_path: str,
+        temp_dir: Optional[str],
+        load_text: bool,
+        load_images: bool,
+    ) -> DocumentLoadResult:
+        result = DocumentLoadResult(file_path=file_path)
+        start = time.perf_counter()
+
+        try:
             mime_type = mimetypes.guess_type(file_path)[0]
             if mime_type in PDF_MIME_TYPES:
-                document, imgs = await self.load_pdf(
-                    file_path, load_text, load_images, temp_dir
+                # Page images are named by page number, keep each file's apart
+                images_dir = None
+                if load_images:
+                    images_dir = os.path.join(temp_dir, f"document_{index}")
+                    os.makedirs(images_dir, exist_ok=True)
+                result.document, result.images = await self.load_pdf(
+                    file_path, load_text, load_images, images_dir
                 )
             elif mime_type in TEXT_MIME_TYPES:
-                document = await self.load_text(file_path)
+                result.document = await self.load_text(file_path)
             elif mime_type in POWERPOINT_TYPES:
-                document = self.load_powerpoint(file_path)
+                result.document = await self.load_powerpoint(file_path)
             elif mime_type in WORD_TYPES:
-                document = self.load_msword(file_path)
-
-            documents.append(document)
-            images.append(imgs)
+                result.document = await self.load_msword(file_path)
+        except Exception as e:
+            print(f"Failed to load document {file_path}: {e}")
+            result.document = ""
+            result.images = []
+            result.error = str(e)
 
-        self._documents = documents
-        self._images = images
+        result.duration = time.perf_counter() - start
+        print(f"Loaded document {file_path} in {result.duration:.2f}s")
+        return result
 
     async def load_pdf(
         self,
@@ -78,7 +149,7 @@ class DocumentsLoader:
         document: str = ""
 
         if load_text:
-            document = self.docling_service.parse_to_markdown(file_path)
+            document = await self.parse_to_markdown(file_path)
 
         if load_images:
             image_paths = await self.get_page_images_from_pdf_async(file_path, temp_dir)
@@ -89,25 +160,68 @@ class DocumentsLoader:
         with open(file_path, "r") as file:
             return await asyncio.to_thread(file.read)
 
-    def load_msword(self, file_path: str) -> str:
-        return self.docling_service.parse_to_markdown(file_path)
+    async def load_msword(self, file_path: str) -> str:
+        return await self.parse_to_markdown(file_path)
+
+    async def load_powerpoint(self, file_path: str) -> str:
+        return await self.parse_to_markdown(file_path)
+
+    async def parse_to_markdown(self, file_path: str) -> str:
+        file_hash = await asyncio.to_thread(
+            DOCUMENT_CACHE_SERVICE.get_file_hash, file_path
+        )
+        cache_key = DOCUMENT_CACHE_SERVICE.get_cache_key(
+            file_hash, DOCLING_PARSER_OPTIONS
+        )
 
-    def load_powerpoint(self, file_path: str) -> str:
-        return self.docling_service.parse_to_markdown(file_path)
+        document = await asyncio.to_thread(
+            DOCUMENT_CACHE_SERVICE.get_markdown, cache_key
+        )
+        if document is None:
+            document = await self.docling_service.parse_to_markdown(file_path)
+            await asyncio.to_thread(
+                DOCUMENT_CACHE_SERVICE.cache_markdown, cache_key, document
+            )
+        return document
 
     @classmethod
     def get_page_images_from_pdf(cls, file_path: str, temp_dir: str) -> List[str]:
-        with pdfplumber.open(file_path) as pdf:
-            images = []
-            for page in pdf.pages:
-                img = page.to_image(resolution=150)
-                image_path = os.path.join(temp_dir, f"page_{page.page_number}.png")
-                img.save(image_path)
-                images.append(image_path)
-            return images
+        return render_pdf_pages(
+            file_path,
+            list(range(1, get_pdf_page_count(file_path) + 1)),
+            temp_dir,
+            PDF_PAGE_IMAGE_SERVICE.resolution,
+            PDF_PAGE_IMAGE_SERVICE.image_format,
+            "page",
+        )
 
     @classmethod
-    async def get_page_images_from_pdf_async(cls, file_path: str, temp_dir: str):
-        return await asyncio.to_thread(
-            cls.get_page_images_from_pdf, file_path, temp_dir
+    async def get_page_images_from_pdf_async(
+        cls, file_path: str, temp_dir: str
+    ) -> List[str]:
+        resolution = PDF_PAGE_IMAGE_SERVICE.resolution
+        image_format = PDF_PAGE_IMAGE_SERVICE.image_format
+
+        file_hash = await asyncio.to_thread(
+            DOCUMENT_CACHE_SERVICE.get_file_hash, file_path
+        )
+        cache_key = DOCUMENT_CACHE_SERVICE.get_cache_key(
+            file_hash,
+            {
+                "renderer": "pdfplumber",
+                "resolution": resolution,
+                "format": image_format,
+            },
+        )
+
+        images = await asyncio.to_thread(
+            DOCUMENT_CACHE_SERVICE.get_page_images, cache_key, temp_dir
         )
+        if images is None:
+            images = await PDF_PAGE_IMAGE_SERVICE.render_pages(
+                file_path, temp_dir, resolution, image_format
+            )
+            await asyncio.to_thread(
+                DOCUMENT_CACHE_SERVICE.cache_page_images, cache_key, images
+            )
+        return images
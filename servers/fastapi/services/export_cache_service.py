@@ -0,0 +1,75 @@
+import os
+import shutil
+from typing import Optional
+
+from utils.asset_directory_utils import get_export_cache_directory
+from utils.file_utils import write_file
+import uuid
+
+
+class ExportCacheService:
+    """
+    Keeps the last exported file of each presentation per format.
+
+    Files are stored as cache/<presentation_id>/<revision>/<file_name> so the
+    download keeps its title based name while the path is addressed by the
+    presentation content revision.
+    """
+
+    def get_presentation_cache_dir(self, presentation_id: uuid.UUID) -> str:
+        return os.path.join(get_export_cache_directory(), str(presentation_id))
+
+    def get_export_path(
+        self, presentation_id: uuid.UUID, revision: str, file_name: str
+    ) -> str:
+        return os.path.join(
+            self.get_presentation_cache_dir(presentation_id), revision, file_name
+        )
+
+    def get_cached_export(
+        self, presentation_id: uuid.UUID, revision: str, file_name: str
+    ) -> Optional[str]:
+        export_path = self.get_export_path(presentation_id, revision, file_name)
+        if os.path.isfile(export_path):
+            return export_path
+        return None
+
+    def cache_export(
+        self,
+        presentation_id: uuid.UUID,
+        revision: str,
+        file_name: str,
+        file_path: Optional[str] = None,
+        content: Optional[bytes] = None,
+    ) -> str:
+        """
+        Moves the exported file (or writes its content) into the cache and
+        drops files of older revisions of the presentation.
+        """
+        self.remove_stale_revisions(presentation_id, revision)
+
+        export_path = self.get_export_path(presentation_id, revision, file_name)
+        os.makedirs(os.path.dirname(export_path), exist_ok=True)
+
+        if file_path:
+            shutil.move(file_path, export_path)
+        else:
+            write_file(export_path, content or b"")
+
+        return export_path
+
+    def remove_stale_revisions(self, presentation_id: uuid.UUID, revision: str):
+        cache_dir = self.get_presentation_cache_dir(presentation_id)
+        if not os.path.isdir(cache_dir):
+            return
+        for each_revision in os.listdir(cache_dir):
+            if each_revision != revision:
+                shutil.rmtree(os.path.join(cache_dir, each_revision), ignore_errors=True)
+
+    def invalidate(self, presentation_id: uuid.UUID):
+        shutil.rmtree(
+            self.get_presentation_cache_dir(presentation_id), ignore_errors=True
+        )
+
+
+EXPORT_CACHE_SERVICE = ExportCacheService()
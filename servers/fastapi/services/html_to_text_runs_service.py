@@ -1,9 +1,25 @@
+from functools import lru_cache
 from html.parser import HTMLParser
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from models.pptx_models import PptxFontModel, PptxTextRunModel
 
 
+# Style applied by each inline tag, as an index into the style state
+BOLD, ITALIC, UNDERLINE, STRIKE, CODE = range(5)
+STYLE_TAGS = {
+    "strong": BOLD,
+    "b": BOLD,
+    "em": ITALIC,
+    "i": ITALIC,
+    "u": UNDERLINE,
+    "s": STRIKE,
+    "strike": STRIKE,
+    "del": STRIKE,
+    "code": CODE,
+}
+
+
 class InlineHTMLToRunsParser(HTMLParser):
     def __init__(self, base_font: PptxFontModel):
         super().__init__(convert_charrefs=True)
@@ -11,26 +27,32 @@ class InlineHTMLToRunsParser(HTMLParser):
         self.tag_stack: List[str] = []
         self.text_runs: List[PptxTextRunModel] = []
 
+        # Number of open tags for each style, updated as tags open and close
+        self._style_depths = [0] * len(set(STYLE_TAGS.values()))
+        self._fonts: Dict[Tuple[bool, ...], PptxFontModel] = {}
+
     def _current_font(self) -> PptxFontModel:
-        font_json = self.base_font.model_dump()
-        is_bold = any(tag in ("strong", "b") for tag in self.tag_stack)
-        is_italic = any(tag in ("em", "i") for tag in self.tag_stack)
-        is_underline = any(tag == "u" for tag in self.tag_stack)
-        is_strike = any(tag in ("s", "strike", "del") for tag in self.tag_stack)
-        is_code = any(tag == "code" for tag in self.tag_stack)
-
-        if is_bold:
-            font_json["font_weight"] = 700
-        if is_italic:
-            font_json["italic"] = True
-        if is_underline:
-            font_json["underline"] = True
-        if is_strike:
-            font_json["strike"] = True
-        if is_code:
-            font_json["name"] = "Courier New"
-
-        return PptxFontModel(**font_json)
+        style = tuple(depth > 0 for depth in self._style_depths)
+        font = self._fonts.get(style)
+        if font is None:
+            font = self._create_font(style)
+            self._fonts[style] = font
+        return font
+
+    def _create_font(self, style: Tuple[bool, ...]) -> PptxFontModel:
+        font_update = {}
+        if style[BOLD]:
+            font_update["font_weight"] = 700
+        if style[ITALIC]:
+            font_update["italic"] = True
+        if style[UNDERLINE]:
+            font_update["underline"] = True
+        if style[STRIKE]:
+            font_update["strike"] = True
+        if style[CODE]:
+            font_update["name"] = "Courier New"
+
+        return self.base_font.model_copy(update=font_update)
 
     def handle_starttag(self, tag, attrs):
         tag = tag.lower()
@@ -38,12 +60,16 @@ class InlineHTMLToRunsParser(HTMLParser):
             self.text_runs.append(PptxTextRunModel(text="\n"))
             return
         self.tag_stack.append(tag)
+        if tag in STYLE_TAGS:
+            self._style_depths[STYLE_TAGS[tag]] += 1
 
     def handle_endtag(self, tag):
         tag = tag.lower()
         for i in range(len(self.tag_stack) - 1, -1, -1):
             if self.tag_stack[i] == tag:
                 del self.tag_stack[i]
+                if tag in STYLE_TAGS:
+                    self._style_depths[STYLE_TAGS[tag]] -= 1
                 break
 
     def handle_data(self, data):
@@ -52,14 +78,28 @@ class InlineHTMLToRunsParser(HTMLParser):
         self.text_runs.append(PptxTextRunModel(text=data, font=self._current_font()))
 
 
-def parse_html_text_to_text_runs(
-    text: str, base_font: Optional[PptxFontModel] = None
-) -> List[PptxTextRunModel]:
+@lru_cache(maxsize=1024)
+def _parse_html_text_to_text_runs(
+    text: str, base_font_fields: Tuple[Tuple[str, object], ...]
+) -> Tuple[PptxTextRunModel, ...]:
     normalized_text = text.replace("\r\n", "\n").replace("\r", "\n")
     normalized_text = normalized_text.replace("\n", "<br>")
 
-    parser = InlineHTMLToRunsParser(base_font if base_font else PptxFontModel())
+    parser = InlineHTMLToRunsParser(
+        PptxFontModel.model_construct(**dict(base_font_fields))
+    )
     parser.feed(normalized_text)
-    return parser.text_runs
+    return tuple(parser.text_runs)
 
 
+def parse_html_text_to_text_runs(
+    text: str, base_font: Optional[PptxFontModel] = None
+) -> List[PptxTextRunModel]:
+    """
+    Repeated texts such as headers and footers are parsed once.
+    Returned runs are shared between calls and must not be modified.
+    """
+    base_font = base_font if base_font else PptxFontModel()
+    return list(
+        _parse_html_text_to_text_runs(text, tuple(base_font.__dict__.items()))
+    )
@@ -1,56 +1,200 @@
 import asyncio
-import json
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from constants.assets import (
+    DEFAULT_ICON_SEARCH_KEYWORD_WEIGHT,
+    DEFAULT_ICON_SEARCH_MIN_KEYWORD_SCORE,
+    ICON_INDEX_DIRECTORY,
+    ICON_QUERY_CACHE_SIZE,
+    ICONS_FILE_PATH,
+)
+from services.icon_index import IconIndex, load_or_build_icon_index
+from utils.embedding_utils import embed_texts
+from utils.get_env import (
+    get_icon_search_keyword_weight_env,
+    get_icon_search_min_keyword_score_env,
+)
+from utils.parsers import parse_float_or_default
 
 
 class IconFinderService:
-    def __init__(self):
-        self.collection_name = "icons"
-        self.client = chromadb.PersistentClient(
-            path="chroma", settings=Settings(anonymized_telemetry=False)
+    """
+    Finds icons of the catalog for text queries.
+
+    Queries matching icon names or tags well enough are answered from the
+    keyword index alone. Others are embedded and ranked by similarity, with
+    keyword scores added as a boost.
+
+    The index and the embedding model are loaded on first use, or ahead of it
+    by warm_up which the app lifespan runs in the background, so importing this
+    module stays cheap.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], np.ndarray] = embed_texts,
+        icons_path: str = ICONS_FILE_PATH,
+        index_dir: str = ICON_INDEX_DIRECTORY,
+    ):
+        self._embed = embed
+        self.icons_path = icons_path
+        self.index_dir = index_dir
+        self._index: Optional[IconIndex] = None
+        self._index_lock = threading.Lock()
+        self._error: Optional[str] = None
+        self._query_cache: OrderedDict[Tuple[str, int], List[str]] = OrderedDict()
+        self._metrics = Counter()
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def min_keyword_score(self) -> float:
+        return parse_float_or_default(
+            get_icon_search_min_keyword_score_env(),
+            DEFAULT_ICON_SEARCH_MIN_KEYWORD_SCORE,
         )
-        print("Initializing icons collection...")
-        self._initialize_icons_collection()
-        print("Icons collection initialized.")
-
-    def _initialize_icons_collection(self):
-        self.embedding_function = ONNXMiniLM_L6_V2()
-        self.embedding_function.DOWNLOAD_PATH = "chroma/models"
-        self.embedding_function._download_model_if_not_exists()
+
+    @property
+    def keyword_weight(self) -> float:
+        return parse_float_or_default(
+            get_icon_search_keyword_weight_env(), DEFAULT_ICON_SEARCH_KEYWORD_WEIGHT
+        )
+
+    def _count(self, **counts: int):
+        with self._metrics_lock:
+            self._metrics.update(counts)
+
+    def get_metrics(self) -> dict:
+        with self._metrics_lock:
+            metrics = {
+                each: self._metrics[each]
+                for each in ["queries", "cache_hits", "keyword_hits", "embedding_searches"]
+            }
+        for each in ["cache_hits", "keyword_hits"]:
+            metrics[each.replace("hits", "hit_rate")] = round(
+                metrics[each] / max(metrics["queries"], 1), 4
+            )
+        return metrics
+
+    @property
+    def is_ready(self) -> bool:
+        return self._index is not None
+
+    def get_status(self) -> dict:
+        if self.is_ready:
+            status = "ready"
+        elif self._index_lock.locked():
+            status = "loading"
+        elif self._error:
+            status = "error"
+        else:
+            status = "not_loaded"
+        return {
+            "status": status,
+            "icons": len(self._index) if self._index else 0,
+            "error": self._error,
+            "metrics": self.get_metrics(),
+        }
+
+    def get_index(self) -> IconIndex:
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    print("Initializing icons index...")
+                    try:
+                        self._index = load_or_build_icon_index(
+                            self._embed, self.icons_path, self.index_dir
+                        )
+                    except Exception as e:
+                        self._error = str(e)
+                        raise
+                    self._error = None
+                    print("Icons index initialized.")
+        return self._index
+
+    def _warm_up(self):
+        self.get_index()
+        # Loads the embedding model, which a prebuilt index does not need
+        self._embed(["icon"])
+
+    async def warm_up(self):
+        """
+        Failures are logged, as searches try to load the index again.
+        """
         try:
-            self.collection = self.client.get_collection(
-                self.collection_name, embedding_function=self.embedding_function
+            await asyncio.to_thread(self._warm_up)
+        except Exception as e:
+            print(f"Failed to initialize icons index: {e}")
+
+    def search_icon_ids(self, queries: List[str], k: int = 1) -> List[List[str]]:
+        index = self.get_index()
+        min_keyword_score = self.min_keyword_score
+        results: List[Optional[List[str]]] = []
+        keyword_scores = []
+        for query in queries:
+            scores = index.keywords.score(query)
+            matches = index.keywords.get_strong_matches(scores, k, min_keyword_score)
+            results.append(matches and [index.ids[each] for each in matches])
+            keyword_scores.append(scores)
+
+        missing = [position for position, result in enumerate(results) if not result]
+        if missing:
+            embedded_results = index.search(
+                self._embed([queries[position] for position in missing]),
+                k,
+                [keyword_scores[position] for position in missing],
+                self.keyword_weight,
             )
-        except Exception:
-            with open("assets/icons.json", "r") as f:
-                icons = json.load(f)
-
-            documents = []
-            ids = []
-
-            for i, each in enumerate(icons["icons"]):
-                if each["name"].split("-")[-1] == "bold":
-                    doc_text = f"{each['name']} {each['tags']}"
-                    documents.append(doc_text)
-                    ids.append(each["name"])
-
-            if documents:
-                self.collection = self.client.create_collection(
-                    name=self.collection_name,
-                    embedding_function=self.embedding_function,
-                    metadata={"hnsw:space": "cosine"},
-                )
-                self.collection.add(documents=documents, ids=ids)
+            for position, result in zip(missing, embedded_results):
+                results[position] = result
 
-    async def search_icons(self, query: str, k: int = 1):
-        result = await asyncio.to_thread(
-            self.collection.query,
-            query_texts=[query],
-            n_results=k,
+        self._count(
+            keyword_hits=len(queries) - len(missing), embedding_searches=len(missing)
         )
-        return [f"/static/icons/bold/{each}.svg" for each in result["ids"][0]]
+        return results
+
+    def _remember(self, key: Tuple[str, int], icon_ids: List[str]):
+        self._query_cache[key] = icon_ids
+        self._query_cache.move_to_end(key)
+        while len(self._query_cache) > ICON_QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+    async def search_icons_batch(self, queries: List[str], k: int = 1) -> List[List[str]]:
+        """
+        Returns icon urls for each query. Queries are deduplicated and the ones
+        not searched before are embedded and searched together in one pass.
+        """
+        keys = [(query.strip().lower(), k) for query in queries]
+        self._count(queries=len(keys))
+        icon_ids_by_key = {}
+        missing_keys = []
+        for key in dict.fromkeys(keys):
+            icon_ids = self._query_cache.get(key)
+            if icon_ids is None:
+                missing_keys.append(key)
+            else:
+                self._query_cache.move_to_end(key)
+                icon_ids_by_key[key] = icon_ids
+        self._count(cache_hits=len(keys) - len(missing_keys))
+
+        if missing_keys:
+            results = await asyncio.to_thread(
+                self.search_icon_ids, [query for query, _ in missing_keys], k
+            )
+            for key, icon_ids in zip(missing_keys, results):
+                self._remember(key, icon_ids)
+                icon_ids_by_key[key] = icon_ids
+
+        return [
+            [f"/static/icons/bold/{each}.svg" for each in icon_ids_by_key[key]]
+            for key in keys
+        ]
+
+    async def search_icons(self, query: str, k: int = 1):
+        return (await self.search_icons_batch([query], k))[0]
 
 
 ICON_FINDER_SERVICE = IconFinderService()
@@ -0,0 +1,253 @@
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from constants.assets import ICON_INDEX_DIRECTORY, ICON_INDEX_VERSION, ICONS_FILE_PATH
+import uuid
+
+
+def get_file_hash(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def load_icon_documents(icons_path: str) -> Tuple[List[str], List[str]]:
+    """
+    Returns the ids and searchable text of the bold icons in the catalog.
+    """
+    with open(icons_path, "r") as f:
+        icons = json.load(f)
+
+    ids = []
+    documents = []
+    for each in icons["icons"]:
+        if each["name"].split("-")[-1] == "bold":
+            ids.append(each["name"])
+            documents.append(f"{each['name']} {each['tags']}")
+    return ids, documents
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return embeddings / norms
+
+
+def get_top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Returns the column indices of the k highest scores of each row, best first.
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class IconKeywordIndex:
+    """
+    Inverted index over icon name and tag tokens, for exact and prefix matches.
+
+    An icon scores, for each query token, the weight of its best matching
+    token, averaged over the query tokens. So 1.0 means every query token is
+    a word of the icon name.
+    """
+
+    NAME_WEIGHT = 1.0
+    TAG_WEIGHT = 0.8
+    PREFIX_FACTOR = 0.5
+    MIN_PREFIX_LENGTH = 3
+
+    def __init__(self, ids: List[str], documents: List[str]):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._name_lengths = []
+        for index, (icon_id, document) in enumerate(zip(ids, documents)):
+            name_tokens = [token for token in tokenize(icon_id) if token != "bold"]
+            self._name_lengths.append(len(name_tokens))
+            for token in name_tokens:
+                self._postings.setdefault(token, {})[index] = self.NAME_WEIGHT
+            # Documents start with the icon name, the rest are its tags
+            for token in tokenize(document[len(icon_id) :]):
+                self._postings.setdefault(token, {}).setdefault(index, self.TAG_WEIGHT)
+        self._tokens = sorted(self._postings)
+
+    def _match_token(self, token: str) -> Dict[int, float]:
+        matches = dict(self._postings.get(token, {}))
+        if len(token) < self.MIN_PREFIX_LENGTH:
+            return matches
+
+        start = bisect.bisect_right(self._tokens, token)
+        for other in self._tokens[start:]:
+            if not other.startswith(token):
+                break
+            for index, weight in self._postings[other].items():
+                prefix_weight = weight * self.PREFIX_FACTOR
+                if matches.get(index, 0) < prefix_weight:
+                    matches[index] = prefix_weight
+        return matches
+
+    def score(self, query: str) -> Dict[int, float]:
+        tokens = tokenize(query)
+        scores: Dict[int, float] = {}
+        for token in tokens:
+            for index, weight in self._match_token(token).items():
+                scores[index] = scores.get(index, 0) + weight
+        return {index: score / len(tokens) for index, score in scores.items()}
+
+    def get_strong_matches(
+        self, scores: Dict[int, float], k: int, min_score: float
+    ) -> Optional[List[int]]:
+        """
+        Returns the k best icons when at least k score min_score, preferring
+        shorter names among equal scores, otherwise None.
+        """
+        matches = [index for index, score in scores.items() if score >= min_score]
+        if not matches or len(matches) < min(k, len(self._name_lengths)):
+            return None
+        matches.sort(key=lambda index: (-scores[index], self._name_lengths[index], index))
+        return matches[:k]
+
+
+class IconIndex:
+    """
+    Normalized float32 embeddings of the icon catalog, searched in memory.
+
+    Stored as a directory with the embedding matrix, memory mapped on load,
+    and the icon ids with the index version and the hash of the catalog they
+    were built from. It can be built ahead of time with
+    `python -m services.icon_index`.
+    """
+
+    EMBEDDINGS_FILE_NAME = "embeddings.npy"
+    IDS_FILE_NAME = "ids.json"
+
+    def __init__(self, ids: List[str], documents: List[str], embeddings: np.ndarray):
+        self.ids = ids
+        self.documents = documents
+        self.embeddings = embeddings
+        self.keywords = IconKeywordIndex(ids, documents)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        ids: List[str],
+        documents: List[str],
+        embed: Callable[[List[str]], np.ndarray],
+    ) -> "IconIndex":
+        return cls(ids, documents, normalize_rows(embed(documents)))
+
+    def save(self, index_dir: str, source_hash: str):
+        # Written aside and renamed, so a crash never leaves a partial index
+        temp_dir = f"{index_dir}.{uuid.uuid4()}.tmp"
+        os.makedirs(temp_dir)
+        try:
+            np.save(os.path.join(temp_dir, self.EMBEDDINGS_FILE_NAME), self.embeddings)
+            with open(os.path.join(temp_dir, self.IDS_FILE_NAME), "w") as f:
+                json.dump(
+                    {
+                        "version": ICON_INDEX_VERSION,
+                        "source_hash": source_hash,
+                        "ids": self.ids,
+                        "documents": self.documents,
+                    },
+                    f,
+                )
+            shutil.rmtree(index_dir, ignore_errors=True)
+            os.rename(temp_dir, index_dir)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, index_dir: str, source_hash: str) -> Optional["IconIndex"]:
+        """
+        Returns None when there is no index, or it was built from another
+        catalog or by another version.
+        """
+        try:
+            with open(os.path.join(index_dir, cls.IDS_FILE_NAME), "r") as f:
+                data = json.load(f)
+            if (
+                data["version"] != ICON_INDEX_VERSION
+                or data["source_hash"] != source_hash
+            ):
+                return None
+            embeddings = np.load(
+                os.path.join(index_dir, cls.EMBEDDINGS_FILE_NAME), mmap_mode="r"
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if embeddings.shape[0] != len(data["ids"]):
+            return None
+        return cls(data["ids"], data["documents"], embeddings)
+
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        keyword_scores: Optional[List[Dict[int, float]]] = None,
+        keyword_weight: float = 0,
+    ) -> List[List[str]]:
+        """
+        Returns the ids of the k most similar icons for each query embedding.
+        Keyword scores of the queries, if given, are added with keyword_weight.
+        """
+        if not len(self) or not len(query_embeddings):
+            return [[] for _ in range(len(query_embeddings))]
+        scores = normalize_rows(query_embeddings) @ self.embeddings.T
+        if keyword_scores and keyword_weight:
+            for row, row_scores in enumerate(keyword_scores):
+                if row_scores:
+                    columns = list(row_scores)
+                    scores[row, columns] += keyword_weight * np.fromiter(
+                        row_scores.values(), dtype=np.float32, count=len(columns)
+                    )
+        return [
+            [self.ids[index] for index in row]
+            for row in get_top_k_indices(scores, k)
+        ]
+
+
+def load_or_build_icon_index(
+    embed: Callable[[List[str]], np.ndarray],
+    icons_path: str = ICONS_FILE_PATH,
+    index_dir: str = ICON_INDEX_DIRECTORY,
+    rebuild: bool = False,
+) -> IconIndex:
+    source_hash = get_file_hash(icons_path)
+    index = None if rebuild else IconIndex.load(index_dir, source_hash)
+    if index is None:
+        print(f"Building icons index from {icons_path}...")
+        ids, documents = load_icon_documents(icons_path)
+        index = IconIndex.build(ids, documents, embed)
+        index.save(index_dir, source_hash)
+    return index
+
+
+if __name__ == "__main__":
+    from utils.embedding_utils import embed_texts
+
+    parser = argparse.ArgumentParser(description="Builds the icon search index.")
+    parser.add_argument("--icons", default=ICONS_FILE_PATH)
+    parser.add_argument("--output", default=ICON_INDEX_DIRECTORY)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    index = load_or_build_icon_index(embed_texts, args.icons, args.output, args.rebuild)
+    print(f"Icons index with {len(index)} icons is in {args.output}")
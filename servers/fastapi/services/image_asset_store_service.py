@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from datetime import timezone
+from typing import Callable, Optional, Set, Tuple
+
+from sqlalchemy import String, cast, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from constants.assets import (
+    DEFAULT_IMAGE_ASSET_GC_GRACE_PERIOD,
+    DEFAULT_IMAGE_ASSET_GC_INTERVAL,
+    IMAGE_ASSET_HASH_CHUNK_SIZE,
+)
+from models.sql.image_asset import ImageAsset
+from models.sql.slide import SlideModel
+from services.image_rendition_service import IMAGE_RENDITION_SERVICE
+from utils.asset_directory_utils import get_images_directory
+from utils.file_utils import write_file
+from utils.get_env import (
+    get_image_asset_gc_grace_period_env,
+    get_image_asset_gc_interval_env,
+)
+from utils.parsers import parse_int_or_default
+
+# File names as they appear in paths and /app_data/images/ urls of slides
+FILE_NAME_PATTERN = re.compile(r"[^\s\"'()<>/\\]+\.[A-Za-z0-9]+")
+
+
+def get_file_sha256(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(IMAGE_ASSET_HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ImageAssetStoreService:
+    """
+    Stores images in the images directory named by the sha256 of their bytes,
+    so identical images are written once and shared by all slides and assets.
+
+    Images are reference counted from the slides using them. The garbage
+    collector removes generated ImageAsset rows no slide uses, rows whose file
+    is gone, and files neither a slide nor a remaining row uses. Uploaded
+    images stay until they are deleted.
+    """
+
+    def __init__(self):
+        self._stats = Counter()
+        self._last_collection: Optional[dict] = None
+
+    @property
+    def grace_period(self) -> int:
+        return parse_int_or_default(
+            get_image_asset_gc_grace_period_env(), DEFAULT_IMAGE_ASSET_GC_GRACE_PERIOD
+        )
+
+    @property
+    def gc_interval(self) -> int:
+        return parse_int_or_default(
+            get_image_asset_gc_interval_env(), DEFAULT_IMAGE_ASSET_GC_INTERVAL
+        )
+
+    def get_blob_path(
+        self, sha256: str, extension: str, directory: Optional[str] = None
+    ) -> str:
+        return os.path.join(
+            directory or get_images_directory(), f"{sha256}{extension.lower()}"
+        )
+
+    def _store_bytes(self, data: bytes, extension: str, directory: Optional[str]) -> str:
+        blob_path = self.get_blob_path(
+            hashlib.sha256(data).hexdigest(), extension, directory
+        )
+        try:
+            # Refreshed, so the garbage collector's grace period counts from now
+            os.utime(blob_path)
+        except FileNotFoundError:
+            write_file(blob_path, data)
+        else:
+            self._count_duplicate(len(data))
+        return blob_path
+
+    def _store_file(
+        self, file_path: str, sha256: Optional[str], directory: Optional[str]
+    ) -> str:
+        blob_path = self.get_blob_path(
+            sha256 or get_file_sha256(file_path),
+            os.path.splitext(file_path)[1],
+            directory or os.path.dirname(file_path),
+        )
+        try:
+            os.utime(blob_path)
+        except FileNotFoundError:
+            os.replace(file_path, blob_path)
+        else:
+            self._count_duplicate(os.path.getsize(file_path))
+            os.remove(file_path)
+        return blob_path
+
+    def _count_duplicate(self, size: int):
+        self._stats["duplicates"] += 1
+        self._stats["bytes_saved"] += size
+
+    async def store_bytes(
+        self, data: bytes, extension: str, directory: Optional[str] = None
+    ) -> str:
+        """
+        Returns the path of the image with these bytes, writing it if needed.
+        """
+        blob_path = await asyncio.to_thread(
+            self._store_bytes, data, extension, directory
+        )
+        IMAGE_RENDITION_SERVICE.schedule_renditions([blob_path])
+        return blob_path
+
+    async def store_file(
+        self,
+        file_path: str,
+        sha256: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> str:
+        """
+        Moves the file to its content-addressed path, or removes it when an
+        identical image is stored already, and returns that path.
+        """
+        blob_path = await asyncio.to_thread(
+            self._store_file, file_path, sha256, directory
+        )
+        IMAGE_RENDITION_SERVICE.schedule_renditions([blob_path])
+        return blob_path
+
+    async def get_reference_counts(self, sql_session: AsyncSession) -> Counter:
+        """
+        Counts the slides using each image file name.
+        """
+        references = Counter()
+        rows = await sql_session.execute(
+            select(SlideModel.content, SlideModel.html_content)
+        )
+        for content, html_content in rows:
+            text = f"{json.dumps(content)} {html_content or ''}"
+            references.update(set(FILE_NAME_PATTERN.findall(text)))
+        return references
+
+    def _is_orphaned(
+        self, asset: ImageAsset, references: Counter, cutoff: float
+    ) -> bool:
+        if not os.path.exists(asset.path):
+            return True
+        if asset.is_uploaded or references[os.path.basename(asset.path)]:
+            return False
+        created_at = asset.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return created_at.timestamp() < cutoff
+
+    def _get_blobs(self) -> list:
+        with os.scandir(get_images_directory()) as entries:
+            return [entry for entry in entries if entry.is_file()]
+
+    def _remove_blobs(self, used_names: Set[str], cutoff: float) -> Tuple[int, int]:
+        removed = 0
+        freed_bytes = 0
+        for entry in self._get_blobs():
+            if entry.name in used_names:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime >= cutoff:
+                continue
+            try:
+                os.remove(entry.path)
+                IMAGE_RENDITION_SERVICE.remove_renditions(entry.path)
+            except OSError as e:
+                print(f"Failed to remove image {entry.path}: {e}")
+                continue
+            removed += 1
+            freed_bytes += stat.st_size
+        return removed, freed_bytes
+
+    async def is_used_by_slides(self, sql_session: AsyncSession, file_name: str) -> bool:
+        """
+        Checks whether any slide mentions the file name, without loading them.
+        """
+        slides = await sql_session.scalars(
+            select(SlideModel.id)
+            .where(
+                or_(
+                    cast(SlideModel.content, String).contains(
+                        file_name, autoescape=True
+                    ),
+                    SlideModel.html_content.contains(file_name, autoescape=True),
+                )
+            )
+            .limit(1)
+        )
+        return slides.first() is not None
+
+    def _remove_file(self, path: str):
+        if os.path.exists(path):
+            os.remove(path)
+            IMAGE_RENDITION_SERVICE.remove_renditions(path)
+
+    async def remove_if_unreferenced(self, sql_session: AsyncSession, path: str):
+        """
+        Removes the file of a deleted asset unless other assets or slides use it.
+        """
+        other_assets = await sql_session.scalars(
+            select(ImageAsset.id).where(ImageAsset.path == path).limit(1)
+        )
+        if other_assets.first() is not None:
+            return
+        if not await self.is_used_by_slides(sql_session, os.path.basename(path)):
+            await asyncio.to_thread(self._remove_file, path)
+
+    async def collect_garbage(self, sql_session: AsyncSession) -> dict:
+        start = time.perf_counter()
+        cutoff = time.time() - self.grace_period
+        references = await self.get_reference_counts(sql_session)
+
+        removed_assets = 0
+        used_names = set(references)
+        for asset in await sql_session.scalars(select(ImageAsset)):
+            if self._is_orphaned(asset, references, cutoff):
+                await sql_session.delete(asset)
+                removed_assets += 1
+            else:
+                used_names.add(os.path.basename(asset.path))
+        await sql_session.commit()
+
+        removed_blobs, freed_bytes = await asyncio.to_thread(
+            self._remove_blobs, used_names, cutoff
+        )
+        self._last_collection = {
+            "collected_at": time.time(),
+            "removed_assets": removed_assets,
+            "removed_blobs": removed_blobs,
+            "freed_bytes": freed_bytes,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        print(
+            f"Image garbage collection removed {removed_assets} assets and "
+            f"{removed_blobs} files ({freed_bytes} bytes)"
+        )
+        return self._last_collection
+
+    async def run_garbage_collector(
+        self, session_maker: Callable[[], AsyncSession]
+    ):
+        """
+        Collects garbage every gc_interval seconds, never when it is 0.
+        """
+        while self.gc_interval > 0:
+            await asyncio.sleep(self.gc_interval)
+            try:
+                async with session_maker() as sql_session:
+                    await self.collect_garbage(sql_session)
+            except Exception as e:
+                print(f"Image garbage collection failed: {e}")
+
+    async def get_storage_stats(self, sql_session: AsyncSession) -> dict:
+        references = await self.get_reference_counts(sql_session)
+        asset_names = Counter(
+            os.path.basename(path)
+            for path in await sql_session.scalars(select(ImageAsset.path))
+        )
+        blobs = await asyncio.to_thread(self._get_blobs)
+
+        sizes = {entry.name: entry.stat().st_size for entry in blobs}
+        unreferenced = [
+            name for name in sizes if not references[name] and not asset_names[name]
+        ]
+        return {
+            "files": len(sizes),
+            "bytes": sum(sizes.values()),
+            "referenced_by_slides": sum(1 for name in sizes if references[name]),
+            "slide_references": sum(references[name] for name in sizes),
+            "assets": sum(asset_names.values()),
+            "unreferenced_files": len(unreferenced),
+            "unreferenced_bytes": sum(sizes[name] for name in unreferenced),
+            "duplicates_avoided": self._stats["duplicates"],
+            "bytes_saved": self._stats["bytes_saved"],
+            "last_collection": self._last_collection,
+        }
+
+
+IMAGE_ASSET_STORE_SERVICE = ImageAssetStoreService()
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google import genai
+from openai import AsyncOpenAI
+
+from constants.assets import (
+    DEFAULT_IMAGE_GENERATION_CONCURRENCY,
+    DEFAULT_IMAGE_GENERATION_PROVIDER_CONCURRENCY,
+    IMAGE_GENERATION_RESULT_CACHE_SIZE,
+)
+from utils.get_env import get_image_generation_concurrency_env
+from utils.latency_utils import get_latency_stats, record_latency
+from utils.parsers import parse_int_or_default
+
+
+class ImageGenerationSchedulerService:
+    """
+    Queues AI image generations with a concurrency limit per provider.
+
+    Generations of the same prompt share one request while it is in flight,
+    within a deck and across decks, and images generated before are reused
+    while their files exist. Provider clients are created once and shared.
+    """
+
+    def __init__(self):
+        self._semaphores: Dict[
+            str, Tuple[asyncio.Semaphore, asyncio.AbstractEventLoop]
+        ] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._results: OrderedDict[str, str] = OrderedDict()
+        self._openai_client: Optional[Tuple[AsyncOpenAI, asyncio.AbstractEventLoop]] = None
+        self._genai_client: Optional[genai.Client] = None
+        self._counts: Dict[str, Counter] = {}
+        self._queue_waits: Dict[str, List[float]] = {}
+        self._latencies: Dict[str, List[float]] = {}
+
+    def get_concurrency(self, provider: str) -> int:
+        return parse_int_or_default(
+            get_image_generation_concurrency_env(),
+            DEFAULT_IMAGE_GENERATION_CONCURRENCY.get(
+                provider, DEFAULT_IMAGE_GENERATION_PROVIDER_CONCURRENCY
+            ),
+        )
+
+    def get_openai_client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        # The client's connection pool belongs to the event loop it was used in
+        if self._openai_client is None or self._openai_client[1] is not loop:
+            self._openai_client = (AsyncOpenAI(), loop)
+        return self._openai_client[0]
+
+    def get_genai_client(self) -> genai.Client:
+        if self._genai_client is None:
+            self._genai_client = genai.Client()
+        return self._genai_client
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore, semaphore_loop = self._semaphores.get(provider, (None, None))
+        if semaphore is None or semaphore_loop is not loop:
+            semaphore = asyncio.Semaphore(self.get_concurrency(provider))
+            self._semaphores[provider] = (semaphore, loop)
+        return semaphore
+
+    def get_key(self, provider: str, prompt: str, output_directory: str) -> str:
+        key_data = f"{provider}:{output_directory}:{prompt.strip()}"
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def _count(self, provider: str, stat: str):
+        self._counts.setdefault(provider, Counter())[stat] += 1
+
+    def _remember(self, key: str, image_path: str):
+        self._results[key] = image_path
+        self._results.move_to_end(key)
+        while len(self._results) > IMAGE_GENERATION_RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+
+    async def _generate(
+        self, provider: str, key: str, generate: Callable[[], Awaitable[str]]
+    ) -> str:
+        queued_at = time.perf_counter()
+        async with self._get_semaphore(provider):
+            started_at = time.perf_counter()
+            record_latency(self._queue_waits, provider, started_at - queued_at)
+            self._count(provider, "generations")
+            try:
+                image_path = await generate()
+            except Exception:
+                self._count(provider, "errors")
+                raise
+            finally:
+                record_latency(
+                    self._latencies, provider, time.perf_counter() - started_at
+                )
+
+        if image_path and os.path.exists(image_path):
+            self._remember(key, image_path)
+        return image_path
+
+    async def generate(
+        self,
+        provider: str,
+        prompt: str,
+        output_directory: str,
+        generate: Callable[[], Awaitable[str]],
+        reuse: bool = True,
+    ) -> str:
+        """
+        Returns the path of the image generated for the prompt by generate,
+        which is only called when the prompt was not generated before and is
+        not being generated already. Without reuse, images generated before
+        are ignored, so asking again gives a new image.
+        """
+        self._count(provider, "requests")
+        key = self.get_key(provider, prompt, output_directory)
+
+        image_path = self._results.get(key) if reuse else None
+        if image_path is not None:
+            try:
+                # Refreshed, so the garbage collector keeps the reused image
+                os.utime(image_path)
+            except FileNotFoundError:
+                self._results.pop(key, None)
+            else:
+                self._results.move_to_end(key)
+                self._count(provider, "reused")
+                return image_path
+
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._generate(provider, key, generate))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self._count(provider, "deduplicated")
+
+        return await asyncio.shield(task)
+
+    def get_metrics(self) -> Dict[str, dict]:
+        metrics = {}
+        for provider, counts in self._counts.items():
+            metrics[provider] = {
+                "concurrency": self.get_concurrency(provider),
+                "requests": counts["requests"],
+                "reused": counts["reused"],
+                "deduplicated": counts["deduplicated"],
+                "generations": counts["generations"],
+                "errors": counts["errors"],
+                "queue_wait": get_latency_stats(self._queue_waits.get(provider, [])),
+                "latency": get_latency_stats(self._latencies.get(provider, [])),
+            }
+        return metrics
+
+
+IMAGE_GENERATION_SCHEDULER_SERVICE = ImageGenerationSchedulerService()
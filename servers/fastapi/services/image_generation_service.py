@@ -1,12 +1,17 @@
 import asyncio
+import base64
 import os
-import aiohttp
-from google import genai
+from typing import Optional
 from google.genai.types import GenerateContentConfig
-from openai import AsyncOpenAI
+from enums.image_provider import ImageProvider
 from models.image_prompt import ImagePrompt
 from models.sql.image_asset import ImageAsset
-from utils.download_helpers import download_file
+from services.image_asset_store_service import IMAGE_ASSET_STORE_SERVICE
+from services.image_generation_scheduler_service import (
+    IMAGE_GENERATION_SCHEDULER_SERVICE,
+)
+from services.stock_image_cache_service import STOCK_IMAGE_CACHE_SERVICE
+from services.stock_image_provider_service import STOCK_IMAGE_PROVIDER_SERVICE
 from utils.get_env import get_pexels_api_key_env
 from utils.get_env import get_pixabay_api_key_env
 from utils.image_provider import (
@@ -15,7 +20,6 @@ from utils.image_provider import (
     is_gemini_flash_selected,
     is_dalle3_selected,
 )
-import uuid
 
 
 class ImageGenerationService:
@@ -38,12 +42,15 @@ class ImageGenerationService:
     def is_stock_provider_selected(self):
         return is_pixels_selected() or is_pixabay_selected()
 
-    async def generate_image(self, prompt: ImagePrompt) -> str | ImageAsset:
+    async def generate_image(
+        self, prompt: ImagePrompt, reuse: bool = True
+    ) -> str | ImageAsset:
         """
         Generates an image based on the provided prompt.
         - If no image generation function is available, returns a placeholder image.
         - If stock providers are available, tries them with fallbacks (Pexels -> Pixabay).
-        - For AI providers, uses the configured provider.
+        - For AI providers, uses the configured provider. Images generated before
+          for the same prompt are reused unless reuse is False.
         - Output Directory is used for saving AI-generated images, not stock providers.
         """
         if not self.image_gen_func:
@@ -57,33 +64,21 @@ class ImageGenerationService:
 
         # For stock providers, try multiple sources with fallback
         if self.is_stock_provider_selected():
-            # Try Pexels first
-            if get_pexels_api_key_env():
-                try:
-                    print("Trying Pexels...")
-                    image_path = await self.get_image_from_pexels(image_prompt)
-                    if image_path:
-                        return image_path
-                except Exception as e:
-                    print(f"Pexels failed: {e}")
-            
-            # Fallback to Pixabay
-            if get_pixabay_api_key_env():
-                try:
-                    print("Trying Pixabay as fallback...")
-                    image_path = await self.get_image_from_pixabay(image_prompt)
-                    if image_path:
-                        return image_path
-                except Exception as e:
-                    print(f"Pixabay failed: {e}")
-            
+            image_url = await self.get_image_from_stock_providers(image_prompt)
+            if image_url:
+                return image_url
+
             print("All stock providers failed. Using placeholder.")
             return "/static/images/placeholder.jpg"
-        
+
         # For AI providers, use the configured one
         try:
-            image_path = await self.image_gen_func(
-                image_prompt, self.output_directory
+            image_path = await IMAGE_GENERATION_SCHEDULER_SERVICE.generate(
+                self.get_ai_provider_name(),
+                image_prompt,
+                self.output_directory,
+                lambda: self.image_gen_func(image_prompt, self.output_directory),
+                reuse=reuse,
             )
             if image_path:
                 if image_path.startswith("http"):
@@ -103,34 +98,90 @@ class ImageGenerationService:
             print(f"Error generating image: {e}")
             return "/static/images/placeholder.jpg"
 
+    def get_ai_provider_name(self) -> str:
+        if is_gemini_flash_selected():
+            return ImageProvider.GEMINI_FLASH.value
+        return ImageProvider.DALLE3.value
+
+    def get_stock_providers(self):
+        providers = []
+        if get_pexels_api_key_env():
+            providers.append(("Pexels", self.get_image_from_pexels))
+        if get_pixabay_api_key_env():
+            providers.append(("Pixabay", self.get_image_from_pixabay))
+        return providers
+
+    async def get_image_from_stock_providers(self, prompt: str) -> Optional[str]:
+        """
+        Tries providers in order (Pexels -> Pixabay), moving on when one fails.
+        In hedged mode the next provider is also queried once the current one
+        takes longer than the hedge delay, and the first image found is used.
+        """
+        remaining = self.get_stock_providers()
+        hedge_delay = STOCK_IMAGE_PROVIDER_SERVICE.hedge_delay
+        pending = {}
+
+        def start_next():
+            name, get_image = remaining.pop(0)
+            print(f"Trying {name}...")
+            pending[asyncio.create_task(get_image(prompt))] = name
+
+        try:
+            while remaining or pending:
+                if not pending:
+                    start_next()
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    STOCK_IMAGE_PROVIDER_SERVICE.count_hedged(remaining[0][0].lower())
+                    start_next()
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception():
+                        print(f"{name} failed: {task.exception()}")
+                    elif task.result():
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def generate_image_openai(self, prompt: str, output_directory: str) -> str:
-        client = AsyncOpenAI()
+        client = IMAGE_GENERATION_SCHEDULER_SERVICE.get_openai_client()
         result = await client.images.generate(
             model="dall-e-3",
             prompt=prompt,
             n=1,
             quality="standard",
             size="1024x1024",
+            response_format="b64_json",
+        )
+        return await IMAGE_ASSET_STORE_SERVICE.store_bytes(
+            base64.b64decode(result.data[0].b64_json), ".png", output_directory
         )
-        image_url = result.data[0].url
-        return await download_file(image_url, output_directory)
 
     async def generate_image_google(self, prompt: str, output_directory: str) -> str:
-        client = genai.Client()
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        client = IMAGE_GENERATION_SCHEDULER_SERVICE.get_genai_client()
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash-image-preview",
             contents=[prompt],
             config=GenerateContentConfig(response_modalities=["TEXT", "IMAGE"]),
         )
 
+        image_path = None
         for part in response.candidates[0].content.parts:
             if part.text is not None:
                 print(part.text)
             elif part.inline_data is not None:
-                image_path = os.path.join(output_directory, f"{uuid.uuid4()}.jpg")
-                with open(image_path, "wb") as f:
-                    f.write(part.inline_data.data)
+                image_path = await IMAGE_ASSET_STORE_SERVICE.store_bytes(
+                    part.inline_data.data, ".jpg", output_directory
+                )
 
         return image_path
 
@@ -138,19 +189,29 @@ class ImageGenerationService:
         api_key = get_pexels_api_key_env()
         if not api_key:
             raise Exception("PEXELS_API_KEY not configured")
-        
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            response = await session.get(
-                f"https://api.pexels.com/v1/search?query={prompt}&per_page=1",
-                headers={"Authorization": api_key},
-            )
+
+        image_url = await STOCK_IMAGE_CACHE_SERVICE.get_or_search(
+            "pexels", prompt, lambda: self._search_pexels(prompt, api_key)
+        )
+        if not image_url:
+            raise Exception(f"No images found for query: {prompt}")
+        return image_url
+
+    async def _search_pexels(self, prompt: str, api_key: str) -> Optional[str]:
+        session = STOCK_IMAGE_PROVIDER_SERVICE.get_session("pexels")
+        async with STOCK_IMAGE_PROVIDER_SERVICE.track("pexels"), session.get(
+            "https://api.pexels.com/v1/search",
+            params={"query": prompt, "per_page": 1},
+            headers={"Authorization": api_key},
+        ) as response:
+            STOCK_IMAGE_CACHE_SERVICE.record_response("pexels", response.headers)
             data = await response.json()
             
             if response.status != 200:
                 raise Exception(f"Pexels API error: {data.get('error', 'Unknown error')}")
             
             if not data.get("photos") or len(data["photos"]) == 0:
-                raise Exception(f"No images found for query: {prompt}")
+                return None
             
             image_url = data["photos"][0]["src"]["large"]
             return image_url
@@ -159,18 +220,28 @@ class ImageGenerationService:
         api_key = get_pixabay_api_key_env()
         if not api_key:
             raise Exception("PIXABAY_API_KEY not configured")
-        
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            response = await session.get(
-                f"https://pixabay.com/api/?key={api_key}&q={prompt}&image_type=photo&per_page=3"
-            )
+
+        image_url = await STOCK_IMAGE_CACHE_SERVICE.get_or_search(
+            "pixabay", prompt, lambda: self._search_pixabay(prompt, api_key)
+        )
+        if not image_url:
+            raise Exception(f"No images found for query: {prompt}")
+        return image_url
+
+    async def _search_pixabay(self, prompt: str, api_key: str) -> Optional[str]:
+        session = STOCK_IMAGE_PROVIDER_SERVICE.get_session("pixabay")
+        async with STOCK_IMAGE_PROVIDER_SERVICE.track("pixabay"), session.get(
+            "https://pixabay.com/api/",
+            params={"key": api_key, "q": prompt, "image_type": "photo", "per_page": 3},
+        ) as response:
+            STOCK_IMAGE_CACHE_SERVICE.record_response("pixabay", response.headers)
             data = await response.json()
             
             if response.status != 200:
                 raise Exception(f"Pixabay API error: {data.get('message', 'Unknown error')}")
             
             if not data.get("hits") or len(data["hits"]) == 0:
-                raise Exception(f"No images found for query: {prompt}")
+                return None
             
             image_url = data["hits"][0]["largeImageURL"]
             return image_url
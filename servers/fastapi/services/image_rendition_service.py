@@ -0,0 +1,182 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+
+from constants.assets import (
+    DEFAULT_IMAGE_RENDITION_WORKERS,
+    IMAGE_RENDITION_SOURCE_EXTENSIONS,
+    IMAGE_RENDITION_WEBP_QUALITY,
+    IMAGE_RENDITIONS,
+    IMAGE_RENDITIONS_DIRECTORY_NAME,
+)
+from utils.asset_directory_utils import get_images_directory
+from utils.file_utils import write_file
+from utils.get_env import get_image_rendition_workers_env
+from utils.parsers import parse_int_or_default
+
+
+def render_image_renditions(source_path: str, renditions: List[Tuple[str, int]]):
+    """
+    Writes a WebP of the image fitting in max_size for each (path, max_size),
+    decoding the source once. Runs in pool workers.
+    """
+    with Image.open(source_path) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    for rendition_path, max_size in renditions:
+        rendition = image.copy()
+        rendition.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        rendition.save(buffer, format="WEBP", quality=IMAGE_RENDITION_WEBP_QUALITY)
+        os.makedirs(os.path.dirname(rendition_path), exist_ok=True)
+        write_file(rendition_path, buffer.getvalue())
+
+
+class ImageRenditionService:
+    """
+    Derives thumbnail and medium WebP variants of the images directory.
+
+    The variant of images/<path> is images/renditions/<variant>/<path>.webp,
+    served at /app_data/images/renditions/<variant>/<path>.webp. Variants are
+    rendered in a pool of worker threads when images are written, and on
+    their first request when missing.
+    """
+
+    def __init__(self):
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def max_workers(self) -> int:
+        return parse_int_or_default(
+            get_image_rendition_workers_env(), DEFAULT_IMAGE_RENDITION_WORKERS
+        )
+
+    def get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="image-renditions",
+                )
+            return self._pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool = self._pool
+            self._pool = None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_renditions_directory(self) -> str:
+        return os.path.join(get_images_directory(), IMAGE_RENDITIONS_DIRECTORY_NAME)
+
+    def get_relative_path(self, source_path: str) -> Optional[str]:
+        """
+        Returns the path of a source image relative to the images directory,
+        or None when it cannot have renditions.
+        """
+        images_directory = os.path.realpath(get_images_directory())
+        source_path = os.path.realpath(source_path)
+        if os.path.commonpath([images_directory, source_path]) != images_directory:
+            return None
+        relative_path = os.path.relpath(source_path, images_directory)
+        if relative_path.split(os.sep)[0] == IMAGE_RENDITIONS_DIRECTORY_NAME:
+            return None
+        if os.path.splitext(relative_path)[1].lower() not in IMAGE_RENDITION_SOURCE_EXTENSIONS:
+            return None
+        return relative_path
+
+    def get_rendition_path(self, source_path: str, variant: str) -> Optional[str]:
+        relative_path = self.get_relative_path(source_path)
+        if relative_path is None or variant not in IMAGE_RENDITIONS:
+            return None
+        return os.path.join(
+            self._get_renditions_directory(), variant, f"{relative_path}.webp"
+        )
+
+    def get_rendition_url(self, source_path: str, variant: str) -> Optional[str]:
+        relative_path = self.get_relative_path(source_path)
+        if relative_path is None or variant not in IMAGE_RENDITIONS:
+            return None
+        url_path = relative_path.replace(os.sep, "/")
+        return f"/app_data/images/{IMAGE_RENDITIONS_DIRECTORY_NAME}/{variant}/{url_path}.webp"
+
+    async def _create_renditions(self, source_path: str):
+        renditions = []
+        for variant, max_size in IMAGE_RENDITIONS.items():
+            rendition_path = self.get_rendition_path(source_path, variant)
+            if not os.path.exists(rendition_path):
+                renditions.append((rendition_path, max_size))
+        if renditions:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.get_pool(), render_image_renditions, source_path, renditions
+            )
+
+    async def create_renditions(self, source_path: str):
+        """
+        Renders the missing variants of the image. Concurrent calls for the
+        same image share one render.
+        """
+        if self.get_relative_path(source_path) is None:
+            return
+
+        task = self._in_flight.get(source_path)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._create_renditions(source_path))
+            self._in_flight[source_path] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(source_path, None))
+        await asyncio.shield(task)
+
+    def schedule_renditions(self, source_paths: List[str]):
+        """
+        Renders the variants of images just written in the background, as
+        missing variants are rendered on request anyway.
+        """
+
+        async def create_renditions(source_path: str):
+            try:
+                await self.create_renditions(source_path)
+            except Exception as e:
+                print(f"Failed to render renditions of {source_path}: {e}")
+
+        for source_path in source_paths:
+            if self.get_relative_path(source_path) is not None:
+                task = asyncio.create_task(create_renditions(source_path))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+    async def get_rendition(self, variant: str, rendition_path: str) -> Optional[str]:
+        """
+        Returns the file of a rendition by its path under renditions/<variant>/,
+        rendering it on the first request. None when there is no such image.
+        """
+        if variant not in IMAGE_RENDITIONS or not rendition_path.endswith(".webp"):
+            return None
+        source_path = os.path.join(get_images_directory(), rendition_path[: -len(".webp")])
+        if self.get_relative_path(source_path) is None or not os.path.isfile(source_path):
+            return None
+
+        rendition_file_path = self.get_rendition_path(source_path, variant)
+        if not os.path.isfile(rendition_file_path):
+            await self.create_renditions(source_path)
+        return rendition_file_path
+
+    def remove_renditions(self, source_path: str):
+        for variant in IMAGE_RENDITIONS:
+            rendition_path = self.get_rendition_path(source_path, variant)
+            if rendition_path and os.path.exists(rendition_path):
+                os.remove(rendition_path)
+
+
+IMAGE_RENDITION_SERVICE = ImageRenditionService()
@@ -0,0 +1,253 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import pdfplumber
+
+from constants.assets import EXPORT_IMAGE_JPEG_QUALITY
+from constants.documents import (
+    DEFAULT_PDF_PAGE_IMAGE_FORMAT,
+    DEFAULT_PDF_PAGE_IMAGE_WORKERS,
+    PDF_PAGE_IMAGE_FORMATS,
+    PDF_PAGE_IMAGE_RESOLUTION,
+    PDF_PAGE_THUMBNAIL_RESOLUTION,
+)
+from utils.get_env import (
+    get_pdf_page_image_dpi_env,
+    get_pdf_page_image_format_env,
+    get_pdf_page_image_workers_env,
+)
+from utils.parsers import parse_int_or_default
+
+
+def get_page_image_extension(image_format: str) -> str:
+    return "jpg" if image_format == "jpeg" else image_format
+
+
+def get_page_image_path(
+    output_dir: str, prefix: str, page_number: int, image_format: str
+) -> str:
+    return os.path.join(
+        output_dir,
+        f"{prefix}_{page_number}.{get_page_image_extension(image_format)}",
+    )
+
+
+def render_pdf_pages(
+    file_path: str,
+    page_numbers: List[int],
+    output_dir: str,
+    resolution: int,
+    image_format: str,
+    prefix: str,
+) -> List[str]:
+    """
+    Renders the given 1-based pages. Runs in pool workers, so the PDF is
+    opened once per batch of pages.
+    """
+    image_paths = []
+    with pdfplumber.open(file_path) as pdf:
+        for page_number in page_numbers:
+            img = pdf.pages[page_number - 1].to_image(resolution=resolution)
+            image_path = get_page_image_path(
+                output_dir, prefix, page_number, image_format
+            )
+            if image_format == "png":
+                img.save(image_path)
+            else:
+                img.original.convert("RGB").save(
+                    image_path,
+                    format=image_format.upper(),
+                    quality=EXPORT_IMAGE_JPEG_QUALITY,
+                )
+            image_paths.append(image_path)
+    return image_paths
+
+
+def get_pdf_page_count(file_path: str) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+class PdfPageImageService:
+    """
+    Rasterizes PDF pages, spread across a pool of worker processes.
+
+    In lazy mode only thumbnails are rendered up front. The PDF is kept next to
+    them and full pages are rendered on request, once per page.
+    """
+
+    SOURCE_FILE_NAME = "source.pdf"
+    THUMBNAIL_PREFIX = "thumbnail"
+    PAGE_PREFIX = "slide"
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    @property
+    def resolution(self) -> int:
+        return parse_int_or_default(
+            get_pdf_page_image_dpi_env(), PDF_PAGE_IMAGE_RESOLUTION
+        )
+
+    @property
+    def image_format(self) -> str:
+        image_format = (get_pdf_page_image_format_env() or "").lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format in PDF_PAGE_IMAGE_FORMATS:
+            return image_format
+        return DEFAULT_PDF_PAGE_IMAGE_FORMAT
+
+    @property
+    def max_workers(self) -> int:
+        return parse_int_or_default(
+            get_pdf_page_image_workers_env(), DEFAULT_PDF_PAGE_IMAGE_WORKERS
+        )
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool = self._pool
+            self._pool = None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render_pages(
+        self,
+        file_path: str,
+        output_dir: str,
+        resolution: Optional[int] = None,
+        image_format: Optional[str] = None,
+        prefix: str = "page",
+        page_numbers: Optional[List[int]] = None,
+    ) -> List[str]:
+        """
+        Renders pages in contiguous batches, one per worker, and returns
+        image paths in page order.
+        """
+        resolution = resolution or self.resolution
+        image_format = image_format or self.image_format
+        if page_numbers is None:
+            page_count = await asyncio.to_thread(get_pdf_page_count, file_path)
+            page_numbers = list(range(1, page_count + 1))
+        if not page_numbers:
+            return []
+
+        n_batches = min(self.max_workers, len(page_numbers))
+        batch_size = -(-len(page_numbers) // n_batches)
+        batches = [
+            page_numbers[index : index + batch_size]
+            for index in range(0, len(page_numbers), batch_size)
+        ]
+
+        # A single batch is not worth the round trip to a worker process
+        if len(batches) == 1:
+            return await asyncio.to_thread(
+                render_pdf_pages,
+                file_path,
+                batches[0],
+                output_dir,
+                resolution,
+                image_format,
+                prefix,
+            )
+
+        loop = asyncio.get_running_loop()
+        pool = self.get_pool()
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    pool,
+                    render_pdf_pages,
+                    file_path,
+                    batch,
+                    output_dir,
+                    resolution,
+                    image_format,
+                    prefix,
+                )
+                for batch in batches
+            ]
+        )
+        return [image_path for batch_paths in results for image_path in batch_paths]
+
+    async def render_thumbnails(self, file_path: str, output_dir: str) -> List[str]:
+        """
+        Keeps a copy of the PDF in output_dir and renders only thumbnails.
+        Full pages are rendered later with get_page_image.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        await asyncio.to_thread(
+            shutil.copyfile, file_path, os.path.join(output_dir, self.SOURCE_FILE_NAME)
+        )
+        return await self.render_pages(
+            file_path,
+            output_dir,
+            resolution=PDF_PAGE_THUMBNAIL_RESOLUTION,
+            image_format="png",
+            prefix=self.THUMBNAIL_PREFIX,
+        )
+
+    async def _render_page_image(
+        self, source_path: str, page_number: int, image_path: str
+    ) -> Optional[str]:
+        page_count = await asyncio.to_thread(get_pdf_page_count, source_path)
+        if not 1 <= page_number <= page_count:
+            return None
+
+        # Rendered aside and moved, so the image is never served half written
+        render_dir = tempfile.mkdtemp(dir=os.path.dirname(image_path))
+        try:
+            rendered_paths = await self.render_pages(
+                source_path,
+                render_dir,
+                prefix=self.PAGE_PREFIX,
+                page_numbers=[page_number],
+            )
+            os.replace(rendered_paths[0], image_path)
+        finally:
+            shutil.rmtree(render_dir, ignore_errors=True)
+        return image_path
+
+    async def get_page_image(self, output_dir: str, page_number: int) -> Optional[str]:
+        """
+        Returns the full page image from output_dir, rendering it on first
+        request. Concurrent requests for the same page share one render.
+        """
+        image_path = get_page_image_path(
+            output_dir, self.PAGE_PREFIX, page_number, self.image_format
+        )
+        if os.path.isfile(image_path):
+            return image_path
+
+        source_path = os.path.join(output_dir, self.SOURCE_FILE_NAME)
+        if not os.path.isfile(source_path):
+            return None
+
+        task = self._in_flight.get(image_path)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(
+                self._render_page_image(source_path, page_number, image_path)
+            )
+            self._in_flight[image_path] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(image_path, None))
+        return await asyncio.shield(task)
+
+
+PDF_PAGE_IMAGE_SERVICE = PdfPageImageService()
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional
+from typing import IO, List, Optional, Union
 from lxml import etree
 from services.html_to_text_runs_service import (
     parse_html_text_to_text_runs as parse_inline_html_to_runs,
@@ -34,11 +34,14 @@ from models.pptx_models import (
     PptxTextBoxModel,
     PptxTextRunModel,
 )
-from utils.download_helpers import download_files
+from constants.assets import EXPORT_IMAGE_JPEG_QUALITY
+from services.asset_downloader_service import ASSET_DOWNLOADER_SERVICE
 from utils.image_utils import (
     clip_image,
     create_circle_image,
+    downsample_image,
     fit_image,
+    has_transparency,
     invert_image,
     round_image_corners,
     set_image_opacity,
@@ -50,9 +53,19 @@ BLANK_SLIDE_LAYOUT = 6
 
 class PptxPresentationCreator:
 
-    def __init__(self, ppt_model: PptxPresentationModel, temp_dir: str):
+    def __init__(
+        self,
+        ppt_model: PptxPresentationModel,
+        temp_dir: str,
+        image_dpi: Optional[int] = None,
+    ):
         self._temp_dir = temp_dir
 
+        # Pictures are resampled to their box size at this DPI when set
+        self._image_dpi = image_dpi
+        self._source_image_bytes = 0
+        self._embedded_image_bytes = 0
+
         self._ppt_model = ppt_model
         self._slide_models = ppt_model.slides
 
@@ -60,6 +73,10 @@ class PptxPresentationCreator:
         self._ppt.slide_width = Pt(1280)
         self._ppt.slide_height = Pt(720)
 
+    @property
+    def image_bytes_saved(self) -> int:
+        return self._source_image_bytes - self._embedded_image_bytes
+
     def get_sub_element(self, parent, tagname, **kwargs):
         """Helper method to create XML elements"""
         element = OxmlElement(tagname)
@@ -102,7 +119,7 @@ class PptxPresentationCreator:
                         models_with_network_asset.append(each_shape)
 
         if image_urls:
-            image_paths = await download_files(image_urls, self._temp_dir)
+            image_paths = await ASSET_DOWNLOADER_SERVICE.download_files(image_urls)
 
             for each_shape, each_image_path in zip(
                 models_with_network_asset, image_paths
@@ -177,6 +194,9 @@ class PptxPresentationCreator:
 
     def add_picture(self, slide: Slide, picture_model: PptxPictureBoxModel):
         image_path = picture_model.picture.path
+        margined_position = self.get_margined_position(
+            picture_model.position, picture_model.margin
+        )
         if (
             picture_model.clip
             or picture_model.border_radius
@@ -216,15 +236,81 @@ class PptxPresentationCreator:
                 image = invert_image(image)
             if picture_model.opacity:
                 image = set_image_opacity(image, picture_model.opacity)
-            image_path = os.path.join(self._temp_dir, f"{uuid.uuid4()}.png")
-            image.save(image_path)
 
-        margined_position = self.get_margined_position(
-            picture_model.position, picture_model.margin
-        )
+            if self._image_dpi:
+                # Format is picked when resampling
+                image_path = self.resample_picture(
+                    image_path, margined_position, image
+                )
+            else:
+                image_path = os.path.join(self._temp_dir, f"{uuid.uuid4()}.png")
+                image.save(image_path)
+
+        elif self._image_dpi:
+            image_path = self.resample_picture(image_path, margined_position)
 
         slide.shapes.add_picture(image_path, *margined_position.to_pt_list())
 
+    def resample_picture(
+        self,
+        image_path: str,
+        position: PptxPositionModel,
+        image: Optional[Image.Image] = None,
+    ) -> str:
+        """
+        Resamples the picture to its box size at the configured DPI.
+        Saves it as PNG if it has transparency, otherwise as JPEG.
+        Pictures that are not processed (image is None) are kept as they are
+        unless resampling makes them smaller.
+        """
+        try:
+            source_size = os.path.getsize(image_path)
+        except OSError:
+            source_size = 0
+
+        is_processed = image is not None
+        try:
+            if not is_processed:
+                image = Image.open(image_path)
+
+            box_width = round(position.width * self._image_dpi / 72)
+            box_height = round(position.height * self._image_dpi / 72)
+
+            resampled_image = image
+            if box_width > 0 and box_height > 0:
+                resampled_image = downsample_image(image, box_width, box_height)
+
+            if not is_processed and resampled_image is image:
+                self._source_image_bytes += source_size
+                self._embedded_image_bytes += source_size
+                return image_path
+
+            if has_transparency(resampled_image):
+                resampled_path = os.path.join(self._temp_dir, f"{uuid.uuid4()}.png")
+                resampled_image.save(resampled_path, optimize=True)
+            else:
+                resampled_path = os.path.join(self._temp_dir, f"{uuid.uuid4()}.jpg")
+                resampled_image.convert("RGB").save(
+                    resampled_path, quality=EXPORT_IMAGE_JPEG_QUALITY, optimize=True
+                )
+
+            resampled_size = os.path.getsize(resampled_path)
+            if not is_processed and resampled_size >= source_size:
+                resampled_path = image_path
+                resampled_size = source_size
+
+            self._source_image_bytes += source_size
+            self._embedded_image_bytes += resampled_size
+            return resampled_path
+
+        except Exception as e:
+            print(f"Could not resample image {image_path}: {e}")
+            if not is_processed:
+                return image_path
+            fallback_path = os.path.join(self._temp_dir, f"{uuid.uuid4()}.png")
+            image.save(fallback_path)
+            return fallback_path
+
     def add_autoshape(self, slide: Slide, autoshape_box_model: PptxAutoShapeBoxModel):
         position = autoshape_box_model.position
         if autoshape_box_model.margin:
@@ -478,5 +564,5 @@ class PptxPresentationCreator:
         except Exception as e:
             print(f"Could not apply strikethrough: {e}")
 
-    def save(self, path: str):
+    def save(self, path: Union[str, IO[bytes]]):
         self._ppt.save(path)
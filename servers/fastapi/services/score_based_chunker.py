@@ -1,21 +1,32 @@
 import asyncio
-from typing import List
+import re
+import tempfile
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from models.document_chunk import DocumentChunk
 
 
+# A line whose first non-whitespace character is "#"
+HEADING_LINE_PATTERN = re.compile(r"^[^\S\n]*#[^\n]*", re.MULTILINE)
+
+
 class ScoreBasedChunker:
 
-    def extract_headings(self, text: str) -> List[str]:
-        lines = text.split("\n")
+    def scan_headings(self, text: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """
+        Returns the stripped heading lines and the start and end offset of
+        each line, found in a single pass over text.
+        """
         headings = []
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("#"):
-                headings.append(line)
-        
-        return headings
+        offsets = []
+        for match in HEADING_LINE_PATTERN.finditer(text):
+            headings.append(match.group().strip())
+            offsets.append(match.span())
+        return headings, offsets
+
+    def extract_headings(self, text: str) -> List[str]:
+        return self.scan_headings(text)[0]
 
     def score_headings(self, headings: List[str]) -> List[float]:
         heading_scores = []
@@ -46,17 +57,9 @@ class ScoreBasedChunker:
 
         return heading_scores
 
-    def get_chunks_from_headings(
-        self,
-        text: str,
-        headings: List[str],
-        heading_scores: List[float],
-        top_k: int = 10,
-    ) -> List[DocumentChunk]:
-        if not heading_scores:
-            heading_scores = self.score_headings(headings)
-
-        chunks = []
+    def select_heading_indices(
+        self, heading_scores: List[float], top_k: int
+    ) -> List[int]:
         heading_indices = []
 
         for i, score in enumerate(heading_scores):
@@ -64,100 +67,243 @@ class ScoreBasedChunker:
                 heading_indices.append((i, score))
 
         if len(heading_indices) == 0:
-            return chunks
+            return []
 
         heading_indices.sort(key=lambda x: (-x[1], x[0]))
 
         if len(heading_indices) <= top_k:
             selected_indices = [idx for idx, _ in heading_indices]
             selected_indices.sort()
-        else:
-            score_groups = {}
-            for idx, score in heading_indices:
-                rounded_score = round(score)
-                if rounded_score not in score_groups:
-                    score_groups[rounded_score] = []
-                score_groups[rounded_score].append(idx)
-
-            sorted_groups = sorted(
-                score_groups.items(), key=lambda x: x[0], reverse=True
-            )
+            return selected_indices
+
+        score_groups = {}
+        for idx, score in heading_indices:
+            rounded_score = round(score)
+            if rounded_score not in score_groups:
+                score_groups[rounded_score] = []
+            score_groups[rounded_score].append(idx)
 
-            selected_indices = []
+        sorted_groups = sorted(score_groups.items(), key=lambda x: x[0], reverse=True)
 
-            for score, indices in sorted_groups:
-                indices.sort()
-                remaining_needed = top_k - len(selected_indices)
+        selected_indices = []
 
-                if remaining_needed <= 0:
-                    break
+        for score, indices in sorted_groups:
+            indices.sort()
+            remaining_needed = top_k - len(selected_indices)
 
-                if len(indices) <= remaining_needed:
-                    selected_indices.extend(indices)
+            if remaining_needed <= 0:
+                break
+
+            if len(indices) <= remaining_needed:
+                selected_indices.extend(indices)
+            else:
+                if remaining_needed == 1:
+                    mid_idx = len(indices) // 2
+                    selected_indices.append(indices[mid_idx])
+                elif remaining_needed == 2:
+                    selected_indices.append(indices[0])
+                    selected_indices.append(indices[-1])
                 else:
-                    if remaining_needed == 1:
-                        mid_idx = len(indices) // 2
-                        selected_indices.append(indices[mid_idx])
-                    elif remaining_needed == 2:
-                        selected_indices.append(indices[0])
-                        selected_indices.append(indices[-1])
-                    else:
-                        step = (len(indices) - 1) / (remaining_needed - 1)
-
-                        for i in range(remaining_needed):
-                            index = int(round(i * step))
-                            if index < len(indices):
-                                selected_indices.append(indices[index])
+                    step = (len(indices) - 1) / (remaining_needed - 1)
 
-            selected_indices.sort()
+                    for i in range(remaining_needed):
+                        index = int(round(i * step))
+                        if index < len(indices):
+                            selected_indices.append(indices[index])
 
-        lines = text.split("\n")
-        heading_positions = {}
-        
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
-            if line_stripped.startswith("#"):
-                for heading_idx, heading in enumerate(headings):
-                    if heading == line_stripped and heading_idx not in heading_positions:
-                        heading_positions[heading_idx] = i
-                        break
-        
+        selected_indices.sort()
+        return selected_indices
+
+    def _get_chunks_from_offsets(
+        self,
+        headings: List[str],
+        heading_scores: List[float],
+        selected_indices: List[int],
+        heading_offsets: Dict[int, Tuple[int, int]],
+        read_content: Callable[[int, Optional[int]], str],
+    ) -> Iterator[DocumentChunk]:
+        """
+        Content of a chunk runs from the line after its heading to the line
+        before the next selected heading, read with read_content(start, end).
+        """
         for i, heading_idx in enumerate(selected_indices):
-            if heading_idx not in heading_positions:
+            if heading_idx not in heading_offsets:
                 continue
-                
-            heading = headings[heading_idx]
-            heading_line_idx = heading_positions[heading_idx]
-            
+
+            content_start = heading_offsets[heading_idx][1] + 1
+            content_end = None
             if i + 1 < len(selected_indices):
                 next_heading_idx = selected_indices[i + 1]
-                if next_heading_idx in heading_positions:
-                    next_heading_line_idx = heading_positions[next_heading_idx]
-                    content_end = next_heading_line_idx
-                else:
-                    content_end = len(lines)
-            else:
-                content_end = len(lines)
+                if next_heading_idx in heading_offsets:
+                    content_end = heading_offsets[next_heading_idx][0]
 
-            content_lines = lines[heading_line_idx + 1 : content_end]
-            content = "\n".join(content_lines).strip()
-
-            chunk = DocumentChunk(
-                heading=heading,
-                content=content,
+            yield DocumentChunk(
+                heading=headings[heading_idx],
+                content=read_content(content_start, content_end).strip(),
                 heading_index=heading_idx,
                 score=heading_scores[heading_idx],
             )
-            chunks.append(chunk)
-            
+
+    def get_chunks_from_headings(
+        self,
+        text: str,
+        headings: List[str],
+        heading_scores: List[float],
+        top_k: int = 10,
+    ) -> List[DocumentChunk]:
+        if not heading_scores:
+            heading_scores = self.score_headings(headings)
+
+        selected_indices = self.select_heading_indices(heading_scores, top_k)
+        if not selected_indices:
+            return []
+
+        # Each heading line belongs to the first unmatched heading with the same text
+        unmatched_indices: Dict[str, deque] = {}
+        for heading_idx, heading in enumerate(headings):
+            unmatched_indices.setdefault(heading, deque()).append(heading_idx)
+
+        heading_offsets = {}
+        for heading, offsets in zip(*self.scan_headings(text)):
+            indices = unmatched_indices.get(heading)
+            if indices:
+                heading_offsets[indices.popleft()] = offsets
+
+        return list(
+            self._get_chunks_from_offsets(
+                headings,
+                heading_scores,
+                selected_indices,
+                heading_offsets,
+                lambda start, end: text[start:end],
+            )
+        )
+
+    def get_chunks(self, text: str, top_k: int = 10) -> List[DocumentChunk]:
+        headings, offsets = self.scan_headings(text)
+        heading_scores = self.score_headings(headings)
+        selected_indices = self.select_heading_indices(heading_scores, top_k)
+
+        return list(
+            self._get_chunks_from_offsets(
+                headings,
+                heading_scores,
+                selected_indices,
+                dict(enumerate(offsets)),
+                lambda start, end: text[start:end],
+            )
+        )
+
+    def iter_chunks_from_file(
+        self, file_path: str, top_k: int = 10
+    ) -> Iterator[DocumentChunk]:
+        """
+        Streaming variant of get_chunks. The file is read twice, once to find
+        headings and once to read the content of each selected chunk, so only
+        one chunk is held in memory at a time.
+        """
+        headings = []
+        offsets = []
+        with open(file_path, "rb") as file:
+            # Binary lines split on "\n" only, like str.split("\n")
+            position = 0
+            for line in file:
+                stripped_line = line.decode("utf-8", errors="replace").strip()
+                if stripped_line.startswith("#"):
+                    headings.append(stripped_line)
+                    offsets.append((position, position + len(line.rstrip(b"\n"))))
+                position += len(line)
+
+            heading_scores = self.score_headings(headings)
+            selected_indices = self.select_heading_indices(heading_scores, top_k)
+
+            def read_content(start: int, end: Optional[int]) -> str:
+                file.seek(start)
+                content = file.read() if end is None else file.read(max(end - start, 0))
+                return content.decode("utf-8", errors="replace")
+
+            yield from self._get_chunks_from_offsets(
+                headings,
+                heading_scores,
+                selected_indices,
+                dict(enumerate(offsets)),
+                read_content,
+            )
+
+    def iter_chunks_from_lines(
+        self, lines: Iterable[str], top_k: int = 10
+    ) -> Iterator[DocumentChunk]:
+        """
+        Streaming variant of get_chunks for text that arrives in pieces, such as
+        lines with their line endings. Pieces are spooled to a temporary file
+        as given instead of being joined in memory.
+        """
+        with tempfile.NamedTemporaryFile(suffix=".md") as spool_file:
+            for line in lines:
+                spool_file.write(line.encode("utf-8"))
+            spool_file.flush()
+
+            yield from self.iter_chunks_from_file(spool_file.name, top_k)
+
+    def split_into_sections(self, text: str) -> List[str]:
+        """
+        Splits text before each heading line. Text before the first heading
+        is its own section.
+        """
+        sections = []
+        section_lines = []
+        for line in text.split("\n"):
+            if line.strip().startswith("#") and section_lines:
+                sections.append("\n".join(section_lines))
+                section_lines = []
+            section_lines.append(line)
+        if section_lines:
+            sections.append("\n".join(section_lines))
+        return [section for section in sections if section.strip()]
+
+    def _split_long_section(self, section: str, max_chars: int) -> List[str]:
+        parts = []
+        for paragraph in section.split("\n\n"):
+            while len(paragraph) > max_chars:
+                parts.append(paragraph[:max_chars])
+                paragraph = paragraph[max_chars:]
+            parts.append(paragraph)
+
+        return self._pack(parts, max_chars, "\n\n")
+
+    def _pack(self, parts: List[str], max_chars: int, separator: str) -> List[str]:
+        chunks = []
+        current = []
+        current_chars = 0
+        for part in parts:
+            added_chars = len(part) + (len(separator) if current else 0)
+            if current and current_chars + added_chars > max_chars:
+                chunks.append(separator.join(current))
+                current = []
+                current_chars = 0
+                added_chars = len(part)
+            current.append(part)
+            current_chars += added_chars
+        if current:
+            chunks.append(separator.join(current))
         return chunks
 
+    def get_sized_chunks(self, text: str, max_chars: int) -> List[str]:
+        """
+        Splits text into chunks of at most max_chars, keeping sections under
+        the same heading together where they fit.
+        """
+        parts = []
+        for section in self.split_into_sections(text):
+            if len(section) > max_chars:
+                parts.extend(self._split_long_section(section, max_chars))
+            else:
+                parts.append(section)
+
+        return self._pack(parts, max_chars, "\n")
+
     async def get_n_chunks(self, text: str, n: int) -> List[DocumentChunk]:
-        headings = await asyncio.to_thread(self.extract_headings, text)
-        heading_scores = await asyncio.to_thread(self.score_headings, headings)
-        chunks = await asyncio.to_thread(
-            self.get_chunks_from_headings, text, headings, heading_scores, n
-        )
+        chunks = await asyncio.to_thread(self.get_chunks, text, n)
         if len(chunks) < n:
             raise ValueError(f"Only {len(chunks)} chunks found, requested {n}")
         return chunks
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+
+from constants.assets import (
+    DEFAULT_STOCK_IMAGE_CACHE_TTL,
+    STOCK_IMAGE_CACHE_SIZE,
+    STOCK_IMAGE_NEGATIVE_CACHE_TTL,
+)
+from utils.asset_directory_utils import get_stock_image_cache_directory
+from utils.file_utils import write_file
+from utils.get_env import get_stock_image_cache_ttl_env
+from utils.parsers import parse_int_or_default
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+
+class StockImageCacheService:
+    """
+    Remembers stock image search results per provider and normalized query.
+
+    Entries are kept in an in-memory LRU and as cache/stock_images/<key>.json,
+    so results are reused across decks and restarts until they expire.
+    Searches without results are remembered for a shorter time. Rate limit
+    headers of each provider are tracked, and a provider is skipped while its
+    quota is used up.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._quotas: Dict[str, dict] = {}
+        self._stats: Dict[str, Counter] = {}
+
+    @property
+    def ttl(self) -> int:
+        return parse_int_or_default(
+            get_stock_image_cache_ttl_env(), DEFAULT_STOCK_IMAGE_CACHE_TTL
+        )
+
+    def get_key(self, provider: str, query: str) -> str:
+        key_data = f"{provider}:{normalize_query(query)}"
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(get_stock_image_cache_directory(), f"{key}.json")
+
+    def _count(self, provider: str, stat: str):
+        self._stats.setdefault(provider, Counter())[stat] += 1
+
+    def _remember(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > STOCK_IMAGE_CACHE_SIZE:
+            self._entries.popitem(last=False)
+
+    def _read_entry(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._get_entry_path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, key: str, entry: dict):
+        try:
+            write_file(self._get_entry_path(key), json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            print(f"Failed to cache stock image search: {e}")
+
+    def _remove_entry(self, key: str):
+        try:
+            os.remove(self._get_entry_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Failed to remove expired stock image search: {e}")
+
+    async def get(self, provider: str, query: str) -> Optional[dict]:
+        """
+        Returns the unexpired entry for the query, whose url is None when the
+        search found nothing. Expired entries are removed.
+        """
+        key = self.get_key(provider, query)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = await asyncio.to_thread(self._read_entry, key)
+            if entry is None:
+                return None
+
+        if entry["expires_at"] <= time.time():
+            self._entries.pop(key, None)
+            await asyncio.to_thread(self._remove_entry, key)
+            return None
+
+        self._remember(key, entry)
+        return entry
+
+    async def set(self, provider: str, query: str, url: Optional[str]):
+        ttl = self.ttl if url else STOCK_IMAGE_NEGATIVE_CACHE_TTL
+        entry = {
+            "provider": provider,
+            "query": normalize_query(query),
+            "url": url,
+            "expires_at": time.time() + ttl,
+        }
+        key = self.get_key(provider, query)
+        self._remember(key, entry)
+        await asyncio.to_thread(self._write_entry, key, entry)
+
+    def record_response(self, provider: str, headers: Mapping[str, str]):
+        """
+        Tracks the rate limit headers sent by Pexels and Pixabay.
+        """
+        headers = {key.lower(): value for key, value in headers.items()}
+        try:
+            limit = int(headers["x-ratelimit-limit"])
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = int(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+
+        # Pexels sends a timestamp, Pixabay the seconds left in the window
+        reset_at = reset if reset > 1_000_000_000 else time.time() + reset
+        self._quotas[provider] = {
+            "limit": limit,
+            "remaining": remaining,
+            "reset_at": reset_at,
+        }
+
+    def is_quota_exhausted(self, provider: str) -> bool:
+        quota = self._quotas.get(provider)
+        return bool(
+            quota and quota["remaining"] <= 0 and quota["reset_at"] > time.time()
+        )
+
+    def get_stats(self) -> Dict[str, dict]:
+        stats = {}
+        for provider in sorted(set(self._stats) | set(self._quotas)):
+            counts = self._stats.get(provider, Counter())
+            stats[provider] = {
+                "requests": counts["requests"],
+                "cache_hits": counts["cache_hits"],
+                "negative_cache_hits": counts["negative_cache_hits"],
+                "quota": self._quotas.get(provider),
+            }
+        return stats
+
+    async def get_or_search(
+        self,
+        provider: str,
+        query: str,
+        search: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """
+        Returns the image url for the query, or None when there are no results.
+        search returns None when the provider has no results, which is cached,
+        and raises on errors, which are not. Concurrent searches for the same
+        query share one request.
+        """
+        entry = await self.get(provider, query)
+        if entry is not None:
+            self._count(
+                provider, "cache_hits" if entry["url"] else "negative_cache_hits"
+            )
+            return entry["url"]
+
+        if self.is_quota_exhausted(provider):
+            raise Exception(f"{provider} quota exhausted")
+
+        key = self.get_key(provider, query)
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+
+            async def search_and_cache() -> Optional[str]:
+                self._count(provider, "requests")
+                url = await search()
+                await self.set(provider, query, url)
+                return url
+
+            task = asyncio.create_task(search_and_cache())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+
+STOCK_IMAGE_CACHE_SERVICE = StockImageCacheService()
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from constants.assets import (
+    DEFAULT_STOCK_IMAGE_TIMEOUT,
+    STOCK_IMAGE_CONNECT_TIMEOUT,
+    STOCK_IMAGE_PER_PROVIDER_LIMIT,
+)
+from utils.get_env import (
+    get_stock_image_hedge_delay_ms_env,
+    get_stock_image_timeout_env,
+)
+from utils.latency_utils import get_latency_stats, record_latency
+from utils.parsers import parse_int_or_default
+
+
+class StockImageProviderService:
+    """
+    Holds one pooled session per stock image provider, so requests reuse
+    connections, and tracks the latency and errors of each provider.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+        self._counts: Dict[str, Counter] = {}
+        self._latencies: Dict[str, List[float]] = {}
+
+    @property
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds after which the next provider is also queried, None to query
+        providers one after another.
+        """
+        hedge_delay_ms = parse_int_or_default(get_stock_image_hedge_delay_ms_env(), 0)
+        return hedge_delay_ms / 1000 if hedge_delay_ms > 0 else None
+
+    def get_session(self, provider: str) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session, session_loop = self._sessions.get(provider, (None, None))
+        # A session can only be used on the event loop it was created in
+        if session is None or session.closed or session_loop is not loop:
+            session = aiohttp.ClientSession(
+                trust_env=True,
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=STOCK_IMAGE_PER_PROVIDER_LIMIT
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=parse_int_or_default(
+                        get_stock_image_timeout_env(), DEFAULT_STOCK_IMAGE_TIMEOUT
+                    ),
+                    connect=STOCK_IMAGE_CONNECT_TIMEOUT,
+                ),
+            )
+            self._sessions[provider] = (session, loop)
+        return session
+
+    async def close(self):
+        sessions = self._sessions
+        self._sessions = {}
+        for session, _ in sessions.values():
+            if not session.closed:
+                await session.close()
+
+    @asynccontextmanager
+    async def track(self, provider: str):
+        """
+        Records the duration of a provider request and whether it failed.
+        """
+        counts = self._counts.setdefault(provider, Counter())
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            counts["errors"] += 1
+            raise
+        finally:
+            counts["requests"] += 1
+            record_latency(self._latencies, provider, time.perf_counter() - start)
+
+    def get_metrics(self) -> Dict[str, dict]:
+        metrics = {}
+        for provider, counts in self._counts.items():
+            metrics[provider] = {
+                "requests": counts["requests"],
+                "errors": counts["errors"],
+                "hedged": counts["hedged"],
+                **get_latency_stats(self._latencies.get(provider, [])),
+            }
+        return metrics
+
+    def count_hedged(self, provider: str):
+        self._counts.setdefault(provider, Counter())["hedged"] += 1
+
+
+STOCK_IMAGE_PROVIDER_SERVICE = StockImageProviderService()
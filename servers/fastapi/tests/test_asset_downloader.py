@@ -0,0 +1,147 @@
+import asyncio
+import os
+
+from aiohttp import web
+
+from services.asset_downloader_service import AssetDownloaderService
+
+
+IMAGE_BYTES = b"\x89PNG fake image bytes"
+
+
+async def start_asset_server(requests_log: list):
+    async def image(request: web.Request):
+        requests_log.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        await asyncio.sleep(0.05)
+        return web.Response(
+            body=IMAGE_BYTES, content_type="image/png", headers={"ETag": '"v1"'}
+        )
+
+    async def large(_: web.Request):
+        return web.Response(body=b"0" * (2 * 1024 * 1024), content_type="image/png")
+
+    app = web.Application()
+    app.router.add_get("/image", image)
+    app.router.add_get("/large", large)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_downloads_are_deduplicated_cached_and_revalidated(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("ASSET_DOWNLOAD_REVALIDATE_AFTER", "0")
+    requests_log = []
+
+    async def run():
+        runner, base_url = await start_asset_server(requests_log)
+        downloader = AssetDownloaderService()
+        try:
+            url = f"{base_url}/image"
+            first = await downloader.download_files([url, url, url])
+            second = await downloader.download_files([url])
+            return first, second
+        finally:
+            await downloader.close()
+            await runner.cleanup()
+
+    first, second = asyncio.run(run())
+
+    assert len(set(first)) == 1
+    assert first[0].endswith(".png")
+    with open(first[0], "rb") as f:
+        assert f.read() == IMAGE_BYTES
+    assert second == [first[0]]
+    # One download for the batch, then a conditional request
+    assert requests_log == [None, '"v1"']
+
+
+def test_fresh_cache_entries_skip_the_network(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    requests_log = []
+
+    async def run():
+        runner, base_url = await start_asset_server(requests_log)
+        downloader = AssetDownloaderService()
+        try:
+            await downloader.download_file(f"{base_url}/image")
+            return await downloader.download_file(f"{base_url}/image")
+        finally:
+            await downloader.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run())
+    assert requests_log == [None]
+
+
+def test_oversized_downloads_are_rejected(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("ASSET_DOWNLOAD_MAX_SIZE_MB", "1")
+
+    async def run():
+        runner, base_url = await start_asset_server([])
+        downloader = AssetDownloaderService()
+        try:
+            return await downloader.download_file(f"{base_url}/large")
+        finally:
+            await downloader.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) is None
+    blobs_directory = tmp_path / "cache" / "downloads" / "blobs"
+    assert not blobs_directory.exists() or not os.listdir(blobs_directory)
+
+
+async def start_changing_asset_server(bodies: dict):
+    async def asset(request: web.Request):
+        return web.Response(
+            body=bodies[request.match_info["name"]], content_type="image/png"
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", asset)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_replaced_and_least_recently_used_files_are_removed(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("ASSET_DOWNLOAD_REVALIDATE_AFTER", "0")
+    monkeypatch.setattr(AssetDownloaderService, "cache_max_size", 25)
+    bodies = {"a": b"a" * 10, "b": b"b" * 10, "c": b"c" * 10}
+
+    async def run():
+        runner, base_url = await start_changing_asset_server(bodies)
+        downloader = AssetDownloaderService()
+        try:
+            b = await downloader.download_file(f"{base_url}/b")
+            old_a = await downloader.download_file(f"{base_url}/a")
+            bodies["a"] = b"A" * 10
+            new_a = await downloader.download_file(f"{base_url}/a")
+            # The old content of a is gone, not left behind
+            assert new_a != old_a and not os.path.exists(old_a)
+
+            # Used again, so b is more recent than a
+            monkeypatch.setenv("ASSET_DOWNLOAD_REVALIDATE_AFTER", "3600")
+            await downloader.download_file(f"{base_url}/b")
+            c = await downloader.download_file(f"{base_url}/c")
+            return new_a, b, c
+        finally:
+            await downloader.close()
+            await runner.cleanup()
+
+    a, b, c = asyncio.run(run())
+
+    assert not os.path.exists(a)
+    assert os.path.exists(b) and os.path.exists(c)
+    index_directory = tmp_path / "cache" / "downloads" / "index"
+    assert len(os.listdir(index_directory)) == 2
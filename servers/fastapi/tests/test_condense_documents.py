@@ -0,0 +1,61 @@
+import asyncio
+
+from utils.llm_calls import condense_documents as condense_module
+from utils.llm_calls.condense_documents import (
+    condense_documents,
+    get_additional_context_token_budget,
+    get_model_context_window,
+)
+
+
+def test_token_budget_follows_model_context_window(monkeypatch):
+    monkeypatch.delenv("ADDITIONAL_CONTEXT_MAX_TOKENS", raising=False)
+    assert get_model_context_window("claude-sonnet-4-20250514") == 200_000
+    assert get_model_context_window("llama3.1:8b") == 8_192
+
+    assert get_additional_context_token_budget("llama3.1:8b") == 2_048
+    assert get_additional_context_token_budget("gpt-4.1") == 32_000
+
+    monkeypatch.setenv("ADDITIONAL_CONTEXT_MAX_TOKENS", "1000")
+    assert get_additional_context_token_budget("gpt-4.1") == 1000
+
+
+def test_small_documents_are_not_condensed(monkeypatch):
+    async def fail_summarize(*args):
+        raise AssertionError("Should not summarize")
+
+    monkeypatch.setattr(condense_module, "summarize_chunk", fail_summarize)
+
+    context = asyncio.run(condense_documents(["# One\nshort", "# Two\nshort"], "gpt-4.1"))
+    assert context == "# One\nshort\n\n# Two\nshort"
+
+
+def test_large_documents_are_condensed_to_budget(monkeypatch):
+    monkeypatch.setenv("ADDITIONAL_CONTEXT_MAX_TOKENS", "1000")
+    monkeypatch.setenv("CONTEXT_CONDENSE_CONCURRENCY", "2")
+    monkeypatch.setattr(condense_module, "LLMClient", lambda: None)
+
+    running = 0
+    max_running = 0
+    summarized_chunks = []
+
+    async def summarize(client, model, chunk, max_tokens):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        summarized_chunks.append(chunk)
+        return chunk.split("\n")[0]
+
+    monkeypatch.setattr(condense_module, "summarize_chunk", summarize)
+
+    documents = [
+        "\n".join(f"# Section {index}\n" + "detail " * 2000 for index in range(10))
+    ]
+    context = asyncio.run(condense_documents(documents, "llama3.1:8b"))
+
+    assert len(summarized_chunks) > 1
+    assert max_running == 2
+    assert context.startswith("# Section 0")
+    assert len(context) <= 1000 * 4
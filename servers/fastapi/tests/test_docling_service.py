@@ -0,0 +1,83 @@
+import asyncio
+import os
+
+from services.docling_service import DoclingService
+
+
+def initialize_worker():
+    pass
+
+
+def parse(file_path: str):
+    # Files named big report a worker past the memory limit
+    worker_rss_mb = 10_000 if os.path.basename(file_path) == "big" else 1
+    return f"{file_path} parsed by {os.getpid()}", worker_rss_mb
+
+
+def get_worker_pid(markdown: str) -> str:
+    return markdown.rsplit(" ", 1)[1]
+
+
+def make_service(**kwargs) -> DoclingService:
+    return DoclingService(
+        max_workers=kwargs.pop("max_workers", 1),
+        max_worker_rss_mb=1_000,
+        initialize_worker=initialize_worker,
+        parse=parse,
+        **kwargs,
+    )
+
+
+def test_documents_are_parsed_in_worker_processes():
+    service = make_service(max_workers=2, max_tasks_per_worker=100)
+
+    async def run():
+        await service.prewarm()
+        return await asyncio.gather(
+            *[service.parse_to_markdown(f"doc_{index}") for index in range(4)]
+        )
+
+    markdowns = asyncio.run(run())
+    assert [markdown.split(" ")[0] for markdown in markdowns] == [
+        f"doc_{index}" for index in range(4)
+    ]
+    worker_pids = {get_worker_pid(markdown) for markdown in markdowns}
+    assert str(os.getpid()) not in worker_pids
+    assert len(worker_pids) <= 2
+
+    pool = service._pool
+    service.shutdown()
+    assert service._pool is None
+    # The next conversion starts a new pool
+    assert asyncio.run(service.parse_to_markdown("doc")).startswith("doc ")
+    assert service._pool is not pool
+    service.shutdown()
+
+
+def test_workers_are_replaced_after_max_tasks():
+    service = make_service(max_tasks_per_worker=1)
+
+    async def run():
+        return [await service.parse_to_markdown(f"doc_{index}") for index in range(3)]
+
+    worker_pids = [get_worker_pid(markdown) for markdown in asyncio.run(run())]
+    assert len(set(worker_pids)) == 3
+    service.shutdown()
+
+
+def test_pool_is_recycled_when_a_worker_grows_too_large():
+    service = make_service(max_tasks_per_worker=100)
+
+    async def run():
+        first = await service.parse_to_markdown("doc")
+        pool = service._pool
+        big = await service.parse_to_markdown("big")
+        assert service._pool is None
+        after = await service.parse_to_markdown("doc")
+        assert service._pool is not pool
+        return first, big, after
+
+    first, big, after = asyncio.run(run())
+    assert get_worker_pid(first) == get_worker_pid(big)
+    assert get_worker_pid(after) != get_worker_pid(big)
+    service.shutdown()
@@ -0,0 +1,71 @@
+import os
+
+from services.document_cache_service import DocumentCacheService
+
+
+def write_file(path, content: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_cache_key_depends_on_content_and_options(tmp_path):
+    cache = DocumentCacheService()
+    first = write_file(tmp_path / "first.pdf", b"same bytes")
+    second = write_file(tmp_path / "second.pdf", b"same bytes")
+    other = write_file(tmp_path / "other.pdf", b"other bytes")
+
+    options = {"parser": "docling", "do_ocr": False}
+    key = cache.get_cache_key(cache.get_file_hash(first), options)
+
+    assert cache.get_cache_key(cache.get_file_hash(second), options) == key
+    assert cache.get_cache_key(cache.get_file_hash(other), options) != key
+    assert (
+        cache.get_cache_key(cache.get_file_hash(first), {**options, "do_ocr": True})
+        != key
+    )
+
+
+def test_markdown_and_page_images_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path / "app_data"))
+    cache = DocumentCacheService()
+
+    assert cache.get_markdown("markdown-key") is None
+    cache.cache_markdown("markdown-key", "# Title")
+    assert cache.get_markdown("markdown-key") == "# Title"
+
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    image_paths = [
+        write_file(source_dir / f"page_{index}.png", f"page {index}".encode())
+        for index in (1, 2)
+    ]
+    cache.cache_page_images("pages-key", image_paths)
+
+    temp_dir = tmp_path / "temp"
+    temp_dir.mkdir()
+    cached_paths = cache.get_page_images("pages-key", str(temp_dir))
+
+    assert cached_paths == [str(temp_dir / "page_1.png"), str(temp_dir / "page_2.png")]
+    with open(cached_paths[1], "rb") as f:
+        assert f.read() == b"page 2"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("DOCUMENT_CACHE_MAX_SIZE_MB", "1")
+    cache = DocumentCacheService()
+    markdown = "x" * (400 * 1024)
+
+    cache.cache_markdown("first", markdown)
+    cache.cache_markdown("second", markdown)
+    os.utime(cache.get_entry_dir("first"), (0, 0))
+    os.utime(cache.get_entry_dir("second"), (1, 1))
+    # Reading refreshes the entry, so the second one is now the oldest
+    assert cache.get_markdown("first") == markdown
+
+    cache.cache_markdown("third", markdown)
+
+    assert cache.get_markdown("first") == markdown
+    assert cache.get_markdown("second") is None
+    assert cache.get_markdown("third") == markdown
@@ -0,0 +1,66 @@
+import asyncio
+
+import numpy as np
+
+from services.document_retrieval_service import DocumentRetrievalService
+import uuid
+
+
+VOCABULARY = ["solar", "wind", "battery", "policy", "market"]
+
+
+def embed(texts):
+    """Bag of words over a small vocabulary, normalized like MiniLM embeddings."""
+    embeddings = np.array(
+        [[text.lower().count(word) + 0.01 for word in VOCABULARY] for text in texts],
+        dtype=np.float32,
+    ).reshape(len(texts), len(VOCABULARY))
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+DOCUMENTS = [
+    "# Solar\nsolar panels and solar farms\n# Wind\nwind turbines and wind farms",
+    "# Storage\nbattery storage and battery prices\n# Policy\npolicy and market rules",
+]
+
+
+def test_search_returns_relevant_chunks(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = DocumentRetrievalService(embed)
+    presentation_id = uuid.uuid4()
+
+    async def build_and_search():
+        await service.build_index(presentation_id, DOCUMENTS)
+        return await service.search(presentation_id, "battery", k=1)
+
+    assert asyncio.run(build_and_search()) == [
+        "# Storage\nbattery storage and battery prices\n# Policy\npolicy and market rules"
+    ]
+
+
+def test_index_is_loaded_from_disk_and_removed(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    presentation_id = uuid.uuid4()
+    asyncio.run(DocumentRetrievalService(embed).build_index(presentation_id, DOCUMENTS))
+
+    service = DocumentRetrievalService(embed)
+    results = asyncio.run(service.search(presentation_id, "wind solar", k=2))
+    assert results[0].startswith("# Solar")
+
+    service.remove_index(presentation_id)
+    assert asyncio.run(service.search(presentation_id, "wind")) == []
+
+
+def test_search_keeps_results_within_token_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = DocumentRetrievalService(embed)
+    presentation_id = uuid.uuid4()
+    documents = [f"# Part {index}\n" + "solar " * 200 for index in range(5)]
+
+    async def build_and_search():
+        await service.build_index(presentation_id, documents)
+        return await service.search(presentation_id, "solar", k=5, max_tokens=700)
+
+    results = asyncio.run(build_and_search())
+    assert len(results) == 2
+    assert sum(len(result) for result in results) <= 700 * 4
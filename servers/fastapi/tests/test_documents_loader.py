@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from constants.documents import DEFAULT_DOCUMENTS_LOADER_CONCURRENCY
+from services.documents_loader import DocumentsLoader
+
+
+def make_files(tmp_path, names):
+    file_paths = []
+    for name in names:
+        file_path = tmp_path / name
+        file_path.write_text(f"Contents of {name}")
+        file_paths.append(str(file_path))
+    return file_paths
+
+
+def test_concurrency_defaults_when_not_configured(tmp_path, monkeypatch):
+    monkeypatch.delenv("DOCUMENTS_LOADER_CONCURRENCY", raising=False)
+    loader = DocumentsLoader(file_paths=make_files(tmp_path, ["notes.txt"]))
+    assert loader._concurrency == DEFAULT_DOCUMENTS_LOADER_CONCURRENCY
+
+    asyncio.run(loader.load_documents())
+    assert loader.documents == ["Contents of notes.txt"]
+    assert loader.results[0].error is None
+
+    monkeypatch.setenv("DOCUMENTS_LOADER_CONCURRENCY", "2")
+    assert DocumentsLoader(file_paths=[])._concurrency == 2
+
+
+def test_documents_are_loaded_concurrently_in_order(tmp_path, monkeypatch):
+    file_paths = make_files(tmp_path, [f"notes_{index}.txt" for index in range(6)])
+    running = 0
+    max_running = 0
+
+    async def load_text(self, file_path):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return file_path
+
+    monkeypatch.setattr(DocumentsLoader, "load_text", load_text)
+    loader = DocumentsLoader(file_paths=file_paths, concurrency=3)
+    asyncio.run(loader.load_documents())
+
+    assert loader.documents == file_paths
+    assert max_running == 3
+
+
+def test_failed_files_do_not_fail_the_others(tmp_path, monkeypatch):
+    file_paths = make_files(tmp_path, ["notes.txt", "report.pdf"])
+
+    async def parse_to_markdown(self, file_path):
+        raise ValueError("not a pdf")
+
+    monkeypatch.setattr(DocumentsLoader, "parse_to_markdown", parse_to_markdown)
+    loader = DocumentsLoader(file_paths=file_paths)
+    asyncio.run(loader.load_documents())
+
+    assert loader.documents == ["Contents of notes.txt", ""]
+    assert loader.results[1].error == "not a pdf"
+
+    # With nothing loaded there is nothing to continue with
+    loader = DocumentsLoader(file_paths=file_paths[1:])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(loader.load_documents())
+    assert error.value.status_code == 400
+    assert "report.pdf: not a pdf" in error.value.detail
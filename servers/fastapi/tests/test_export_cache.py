@@ -0,0 +1,71 @@
+import os
+import uuid
+
+from models.sql.presentation import PresentationModel
+from models.sql.slide import SlideModel
+from services.export_cache_service import ExportCacheService
+
+
+def get_presentation_and_slides():
+    presentation = PresentationModel(
+        id=uuid.uuid4(),
+        content="Solar energy",
+        n_slides=2,
+        language="English",
+        title="Solar",
+        layout={"name": "general", "slides": []},
+    )
+    slides = [
+        SlideModel(
+            presentation=presentation.id,
+            layout_group="general",
+            layout=f"layout-{index}",
+            index=index,
+            content={"title": f"Slide {index}"},
+        )
+        for index in range(2)
+    ]
+    return presentation, slides
+
+
+def test_content_revision_ignores_slide_ids_and_order():
+    presentation, slides = get_presentation_and_slides()
+    revision = presentation.get_content_revision(slides)
+
+    copied_slides = [slide.get_new_slide(presentation.id) for slide in slides]
+    assert presentation.get_content_revision(reversed(copied_slides)) == revision
+
+
+def test_content_revision_changes_with_content():
+    presentation, slides = get_presentation_and_slides()
+    revision = presentation.get_content_revision(slides)
+
+    slides[1].content = {"title": "Edited"}
+    assert presentation.get_content_revision(slides) != revision
+
+    slides[1].content = {"title": "Slide 1"}
+    presentation.title = "Wind"
+    assert presentation.get_content_revision(slides) != revision
+
+
+def test_export_cache_keeps_latest_revision(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    cache = ExportCacheService()
+    presentation_id = uuid.uuid4()
+
+    exported_path = tmp_path / "Solar.pptx"
+    exported_path.write_bytes(b"first")
+    first_path = cache.cache_export(
+        presentation_id, "rev1", "Solar.pptx", file_path=str(exported_path)
+    )
+
+    assert not exported_path.exists()
+    assert os.path.basename(first_path) == "Solar.pptx"
+    assert cache.get_cached_export(presentation_id, "rev1", "Solar.pptx") == first_path
+    assert cache.get_cached_export(presentation_id, "rev1", "Solar.pdf") is None
+
+    cache.cache_export(presentation_id, "rev2", "Solar.pptx", content=b"second")
+    assert cache.get_cached_export(presentation_id, "rev1", "Solar.pptx") is None
+
+    cache.invalidate(presentation_id)
+    assert cache.get_cached_export(presentation_id, "rev2", "Solar.pptx") is None
@@ -0,0 +1,22 @@
+from utils.export_utils import get_export_response
+
+
+def test_non_ascii_titles_are_sent_as_utf8_file_names():
+    response = get_export_response(iter([b"pptx"]), "प्रस्तुति.pptx", "pptx", "etag")
+
+    content_disposition = response.headers["content-disposition"]
+    assert content_disposition == (
+        "attachment; filename=\"presentation.pptx\"; filename*=UTF-8''"
+        "%E0%A4%AA%E0%A5%8D%E0%A4%B0%E0%A4%B8%E0%A5%8D%E0%A4%A4%E0%A5%81"
+        "%E0%A4%A4%E0%A4%BF.pptx"
+    )
+
+
+def test_ascii_titles_keep_their_file_name():
+    response = get_export_response(iter([b"pdf"]), "Solar energy.pdf", "pdf", "etag")
+
+    assert response.headers["content-disposition"] == (
+        "attachment; filename=\"Solar energy.pdf\"; "
+        "filename*=UTF-8''Solar%20energy.pdf"
+    )
+    assert response.headers["etag"] == '"etag"'
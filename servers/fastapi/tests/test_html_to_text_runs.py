@@ -0,0 +1,46 @@
+import pytest
+
+from benchmarks.html_to_text_runs_benchmark import (
+    legacy_parse_html_text_to_text_runs,
+    make_paragraph,
+)
+from models.pptx_models import PptxFontModel
+from services.html_to_text_runs_service import parse_html_text_to_text_runs
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "plain text",
+        "<b>bold <i>both</i></b> <u>under</u> <s>strike</s> <code>x()</code>",
+        "<B>upper</B> <strong><b>nested</b> still</strong> after",
+        "line one\r\nline two\rline three\nend",
+        "unclosed <b>bold <i>italic",
+        "stray </i> close <del>deleted</del> &amp; &lt;tag&gt;",
+        "<span>ignored <em>em</em></span><br/>next",
+        make_paragraph(0, sentences=12),
+    ],
+)
+@pytest.mark.parametrize(
+    "base_font",
+    [None, PptxFontModel(name="Inter", size=20, color="FF0000", italic=True)],
+)
+def test_parse_html_text_to_text_runs_matches_legacy(text, base_font):
+    runs = parse_html_text_to_text_runs(text, base_font)
+    legacy_runs = legacy_parse_html_text_to_text_runs(text, base_font)
+
+    assert [run.model_dump() for run in runs] == [
+        run.model_dump() for run in legacy_runs
+    ]
+
+
+def test_parse_html_text_to_text_runs_caches_by_text_and_font():
+    first = parse_html_text_to_text_runs("<b>cached</b>", PptxFontModel(size=12))
+    second = parse_html_text_to_text_runs("<b>cached</b>", PptxFontModel(size=12))
+    other_font = parse_html_text_to_text_runs("<b>cached</b>", PptxFontModel(size=14))
+
+    assert first[0] is second[0]
+    assert first is not second
+    assert other_font[0].font.size == 14
+    assert other_font[0].font.font_weight == 700
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import numpy as np
+
+from services.icon_finder_service import IconFinderService
+
+VOCABULARY = ["chart", "users", "rocket", "mail"]
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        embeddings = np.zeros((len(texts), len(VOCABULARY)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.replace("-", " ").split():
+                if word in VOCABULARY:
+                    embeddings[row, VOCABULARY.index(word)] += 1
+        return embeddings
+
+
+def make_service(tmp_path):
+    icons = [
+        {"name": f"{word}-bold", "tags": f"{word} icon"} for word in VOCABULARY
+    ]
+    icons_path = tmp_path / "icons.json"
+    with open(icons_path, "w") as f:
+        json.dump({"icons": icons}, f)
+    embed = FakeEmbedder()
+    service = IconFinderService(embed, str(icons_path), str(tmp_path / "index"))
+    return service, embed
+
+
+def test_index_is_loaded_on_warm_up(tmp_path):
+    service, embed = make_service(tmp_path)
+
+    assert service.get_status()["status"] == "not_loaded"
+    assert embed.calls == []
+
+    asyncio.run(service.warm_up())
+
+    status = service.get_status()
+    assert status["status"] == "ready"
+    assert status["icons"] == 4
+    assert (tmp_path / "index" / "embeddings.npy").exists()
+
+
+def test_prebuilt_index_is_reused(tmp_path):
+    service, _ = make_service(tmp_path)
+    asyncio.run(service.warm_up())
+
+    service, embed = make_service(tmp_path)
+    service.get_index()
+
+    assert embed.calls == []
+
+
+def test_failed_warm_up_is_reported(tmp_path):
+    service = IconFinderService(
+        FakeEmbedder(), str(tmp_path / "missing.json"), str(tmp_path / "index")
+    )
+
+    asyncio.run(service.warm_up())
+
+    status = service.get_status()
+    assert status["status"] == "error"
+    assert status["error"]
+
+
+def test_search_icons_batch_deduplicates_and_caches_queries(tmp_path):
+    service, embed = make_service(tmp_path)
+    service.get_index()
+    embed.calls.clear()
+
+    urls = asyncio.run(
+        service.search_icons_batch(["rocket launch", "Mail letter ", "rocket launch"])
+    )
+
+    assert urls == [
+        ["/static/icons/bold/rocket-bold.svg"],
+        ["/static/icons/bold/mail-bold.svg"],
+        ["/static/icons/bold/rocket-bold.svg"],
+    ]
+    assert embed.calls == [["rocket launch", "mail letter"]]
+
+    urls = asyncio.run(service.search_icons_batch(["users group", "rocket launch"]))
+
+    assert urls[0] == ["/static/icons/bold/users-bold.svg"]
+    assert embed.calls[-1] == ["users group"]
+
+
+def test_exact_keyword_matches_skip_embedding(tmp_path):
+    service, embed = make_service(tmp_path)
+    service.get_index()
+    embed.calls.clear()
+
+    assert asyncio.run(service.search_icons("Chart")) == [
+        "/static/icons/bold/chart-bold.svg"
+    ]
+    assert asyncio.run(service.search_icons("rock")) == [
+        "/static/icons/bold/rocket-bold.svg"
+    ]
+    assert embed.calls == [["rock"]]
+
+    metrics = service.get_metrics()
+    assert metrics["queries"] == 2
+    assert metrics["keyword_hits"] == 1
+    assert metrics["embedding_searches"] == 1
+    assert metrics["keyword_hit_rate"] == 0.5
@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+
+from services.icon_index import (
+    IconIndex,
+    IconKeywordIndex,
+    get_top_k_indices,
+    load_icon_documents,
+)
+
+VOCABULARY = ["chart", "users", "rocket", "mail", "lock", "bold", "regular"]
+
+
+def fake_embed(texts):
+    embeddings = np.zeros((len(texts), len(VOCABULARY)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.replace("-", " ").split():
+            if word in VOCABULARY:
+                embeddings[row, VOCABULARY.index(word)] += 1
+    return embeddings
+
+
+def write_catalog(path):
+    icons = [
+        {"name": "chart-bold", "tags": "chart graph"},
+        {"name": "chart-regular", "tags": "chart graph"},
+        {"name": "users-bold", "tags": "users people"},
+        {"name": "rocket-bold", "tags": "rocket launch"},
+        {"name": "mail-bold", "tags": "mail letter"},
+    ]
+    with open(path, "w") as f:
+        json.dump({"icons": icons}, f)
+
+
+def test_load_icon_documents_keeps_bold_icons(tmp_path):
+    icons_path = tmp_path / "icons.json"
+    write_catalog(icons_path)
+
+    ids, documents = load_icon_documents(str(icons_path))
+
+    assert ids == ["chart-bold", "users-bold", "rocket-bold", "mail-bold"]
+    assert documents[0] == "chart-bold chart graph"
+
+
+def test_icon_index_round_trip_and_search(tmp_path):
+    icons_path = tmp_path / "icons.json"
+    write_catalog(icons_path)
+    ids, documents = load_icon_documents(str(icons_path))
+    index_dir = str(tmp_path / "index")
+
+    IconIndex.build(ids, documents, fake_embed).save(index_dir, "catalog-hash")
+    index = IconIndex.load(index_dir, "catalog-hash")
+
+    assert isinstance(index.embeddings, np.memmap)
+    assert index.search(fake_embed(["rocket"]), 1) == [["rocket-bold"]]
+    assert index.search(fake_embed(["users", "mail"]), 2)[1][0] == "mail-bold"
+    assert len(index.search(fake_embed(["chart"]), 10)[0]) == len(ids)
+    assert IconIndex.load(index_dir, "other-hash") is None
+    assert IconIndex.load(str(tmp_path / "missing"), "catalog-hash") is None
+
+
+def test_get_top_k_indices_orders_best_first():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.8, 0.2, 0.3, 0.1]], dtype=np.float32)
+
+    assert get_top_k_indices(scores, 3).tolist() == [[1, 3, 2], [0, 2, 1]]
+
+
+def test_keyword_index_scores_names_tags_and_prefixes():
+    ids = ["chart-bold", "chart-pie-bold", "presentation-chart-bold", "users-bold"]
+    documents = [
+        "chart-bold ['graph']",
+        "chart-pie-bold ['graph', 'slice']",
+        "presentation-chart-bold ['slides']",
+        "users-bold ['people', 'team']",
+    ]
+    keywords = IconKeywordIndex(ids, documents)
+
+    scores = keywords.score("chart")
+    assert scores[0] == scores[1] == scores[2] == 1.0
+    assert keywords.get_strong_matches(scores, 2, 0.8) == [0, 1]
+    assert keywords.score("team") == {3: 0.8}
+    assert keywords.score("peop") == {3: 0.4}
+    assert keywords.score("chart people") == {0: 0.5, 1: 0.5, 2: 0.5, 3: 0.4}
+    assert keywords.get_strong_matches(keywords.score("slice"), 2, 0.8) is None
+
+
+def test_icon_index_search_adds_keyword_scores():
+    ids = ["a-bold", "b-bold"]
+    index = IconIndex(ids, ids, np.array([[1, 0], [0.9, 0.1]], dtype=np.float32))
+
+    query = np.array([[1, 0]], dtype=np.float32)
+    assert index.search(query, 1) == [["a-bold"]]
+    assert index.search(query, 1, [{1: 1.0}], 0.3) == [["b-bold"]]
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from models.sql.image_asset import ImageAsset
+from models.sql.presentation import PresentationModel
+from models.sql.slide import SlideModel
+from services.image_asset_store_service import ImageAssetStoreService
+
+
+def make_session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                lambda sync_conn: SQLModel.metadata.create_all(
+                    sync_conn,
+                    tables=[
+                        PresentationModel.__table__,
+                        SlideModel.__table__,
+                        ImageAsset.__table__,
+                    ],
+                )
+            )
+
+    asyncio.run(create_tables())
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def test_identical_images_are_stored_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    store = ImageAssetStoreService()
+
+    first = asyncio.run(store.store_bytes(b"image", ".PNG"))
+    second = asyncio.run(store.store_bytes(b"image", ".png"))
+    assert first == second
+    assert os.path.basename(first).endswith(".png")
+
+    upload_path = tmp_path / "images" / "upload.png"
+    upload_path.write_bytes(b"image")
+    assert asyncio.run(store.store_file(str(upload_path))) == first
+    assert not upload_path.exists()
+    assert store._stats["duplicates"] == 2
+    assert store._stats["bytes_saved"] == 10
+
+
+def test_stored_duplicates_are_refreshed(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    store = ImageAssetStoreService()
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+
+    path = asyncio.run(store.store_bytes(b"image", ".png"))
+    os.utime(path, (old.timestamp(), old.timestamp()))
+    asyncio.run(store.store_bytes(b"image", ".png"))
+    # Counted from the last store, so the grace period covers the new user
+    assert os.path.getmtime(path) > old.timestamp() + 60
+
+    os.utime(path, (old.timestamp(), old.timestamp()))
+    upload_path = tmp_path / "images" / "upload.png"
+    upload_path.write_bytes(b"image")
+    asyncio.run(store.store_file(str(upload_path)))
+    assert os.path.getmtime(path) > old.timestamp() + 60
+
+
+def test_garbage_collection_keeps_referenced_images(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    session_maker = make_session_maker(tmp_path)
+    store = ImageAssetStoreService()
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+
+    async def run():
+        used = await store.store_bytes(b"used", ".jpg")
+        unused = await store.store_bytes(b"unused", ".jpg")
+        uploaded = await store.store_bytes(b"uploaded", ".jpg")
+        recent = await store.store_bytes(b"recent", ".jpg")
+        for path in [used, unused, uploaded]:
+            os.utime(path, (old.timestamp(), old.timestamp()))
+
+        async with session_maker() as sql_session:
+            presentation = PresentationModel(content="", n_slides=1, language="en")
+            sql_session.add(presentation)
+            sql_session.add(
+                SlideModel(
+                    presentation=presentation.id,
+                    layout_group="general",
+                    layout="image",
+                    index=0,
+                    content={
+                        "image": {
+                            "__image_url__": f"/app_data/images/{os.path.basename(used)}"
+                        }
+                    },
+                    html_content=None,
+                )
+            )
+            sql_session.add_all(
+                [
+                    ImageAsset(path=used, created_at=old),
+                    ImageAsset(path=unused, created_at=old),
+                    ImageAsset(path=uploaded, is_uploaded=True, created_at=old),
+                    ImageAsset(path=recent),
+                    ImageAsset(path=str(tmp_path / "missing.jpg")),
+                ]
+            )
+            await sql_session.commit()
+
+            stats = await store.get_storage_stats(sql_session)
+            assert stats["files"] == 4
+            assert stats["referenced_by_slides"] == 1
+            assert stats["unreferenced_files"] == 0
+
+            collection = await store.collect_garbage(sql_session)
+            remaining = set(await sql_session.scalars(select(ImageAsset.path)))
+        return used, unused, uploaded, recent, collection, remaining
+
+    used, unused, uploaded, recent, collection, remaining = asyncio.run(run())
+    assert remaining == {used, uploaded, recent}
+    assert collection["removed_assets"] == 2
+    assert collection["removed_blobs"] == 1
+    assert not os.path.exists(unused)
+    assert all(os.path.exists(path) for path in [used, uploaded, recent])
+
+
+def test_deleted_assets_keep_files_other_users_need(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    session_maker = make_session_maker(tmp_path)
+    store = ImageAssetStoreService()
+
+    async def run():
+        in_content = await store.store_bytes(b"content", ".png")
+        in_html = await store.store_bytes(b"html", ".png")
+        in_asset = await store.store_bytes(b"asset", ".png")
+        unused = await store.store_bytes(b"unused", ".png")
+
+        async with session_maker() as sql_session:
+            presentation = PresentationModel(content="", n_slides=1, language="en")
+            sql_session.add(presentation)
+            sql_session.add(
+                SlideModel(
+                    presentation=presentation.id,
+                    layout_group="general",
+                    layout="image",
+                    index=0,
+                    content={
+                        "image": {
+                            "__image_url__": f"/app_data/images/{os.path.basename(in_content)}"
+                        }
+                    },
+                    html_content=f'<img src="/app_data/images/{os.path.basename(in_html)}">',
+                )
+            )
+            sql_session.add(ImageAsset(path=in_asset, is_uploaded=True))
+            await sql_session.commit()
+
+            for path in [in_content, in_html, in_asset, unused]:
+                await store.remove_if_unreferenced(sql_session, path)
+        return in_content, in_html, in_asset, unused
+
+    in_content, in_html, in_asset, unused = asyncio.run(run())
+
+    assert os.path.exists(in_content)
+    assert os.path.exists(in_html)
+    assert os.path.exists(in_asset)
+    assert not os.path.exists(unused)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+
+import pytest
+
+from services.image_generation_scheduler_service import ImageGenerationSchedulerService
+
+
+def make_generate(tmp_path, calls: list, running: list, name: str):
+    async def generate():
+        calls.append(name)
+        running.append(len(running) + 1)
+        await asyncio.sleep(0.02)
+        running.pop()
+        image_path = tmp_path / f"{name}.png"
+        image_path.write_bytes(b"image")
+        return str(image_path)
+
+    return generate
+
+
+def test_same_prompts_are_generated_once(tmp_path):
+    scheduler = ImageGenerationSchedulerService()
+    calls = []
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                scheduler.generate(
+                    "dall-e-3", prompt, str(tmp_path), make_generate(tmp_path, calls, [], name)
+                )
+                for prompt, name in [("sunset", "a"), ("sunset ", "b"), ("forest", "c")]
+            ]
+        )
+
+    paths = asyncio.run(run())
+    assert paths[0] == paths[1]
+    assert sorted(calls) == ["a", "c"]
+
+    # Another deck reuses the generated image while its file exists
+    os.utime(paths[0], (0, 0))
+    path = asyncio.run(
+        scheduler.generate("dall-e-3", "sunset", str(tmp_path), make_generate(tmp_path, calls, [], "d"))
+    )
+    assert path == paths[0]
+    assert sorted(calls) == ["a", "c"]
+    assert os.path.getmtime(path) > 0
+
+    # Asked for explicitly, the prompt is generated again
+    path = asyncio.run(
+        scheduler.generate(
+            "dall-e-3",
+            "sunset",
+            str(tmp_path),
+            make_generate(tmp_path, calls, [], "regenerated"),
+            reuse=False,
+        )
+    )
+    assert path.endswith("regenerated.png")
+    # and the new image is the one reused afterwards
+    path = asyncio.run(
+        scheduler.generate("dall-e-3", "sunset", str(tmp_path), make_generate(tmp_path, calls, [], "f"))
+    )
+    assert path.endswith("regenerated.png")
+
+    (tmp_path / "regenerated.png").unlink()
+    path = asyncio.run(
+        scheduler.generate("dall-e-3", "sunset", str(tmp_path), make_generate(tmp_path, calls, [], "e"))
+    )
+    assert path.endswith("e.png")
+
+    metrics = scheduler.get_metrics()["dall-e-3"]
+    assert metrics["requests"] == 7
+    assert metrics["deduplicated"] == 1
+    assert metrics["reused"] == 2
+    assert metrics["generations"] == 4
+    assert metrics["latency"]["p50_ms"] >= 20
+
+
+def test_generations_are_limited_per_provider(tmp_path, monkeypatch):
+    monkeypatch.setenv("IMAGE_GENERATION_CONCURRENCY", "2")
+    scheduler = ImageGenerationSchedulerService()
+    calls = []
+    running = []
+    peak = []
+
+    async def run():
+        async def watch():
+            while len(calls) < 6 or running:
+                peak.append(len(running))
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(
+            watch(),
+            *[
+                scheduler.generate(
+                    "gemini_flash",
+                    f"prompt {index}",
+                    str(tmp_path),
+                    make_generate(tmp_path, calls, running, str(index)),
+                )
+                for index in range(6)
+            ],
+        )
+
+    asyncio.run(run())
+    assert len(calls) == 6
+    assert max(peak) == 2
+    assert scheduler.get_metrics()["gemini_flash"]["queue_wait"]["p95_ms"] >= 20
+
+
+def test_errors_are_not_reused(tmp_path):
+    scheduler = ImageGenerationSchedulerService()
+    calls = []
+
+    async def failing_generate():
+        raise Exception("API error")
+
+    with pytest.raises(Exception):
+        asyncio.run(scheduler.generate("dall-e-3", "x", str(tmp_path), failing_generate))
+
+    path = asyncio.run(
+        scheduler.generate("dall-e-3", "x", str(tmp_path), make_generate(tmp_path, calls, [], "x"))
+    )
+    assert path.endswith("x.png")
+    assert scheduler.get_metrics()["dall-e-3"]["errors"] == 1
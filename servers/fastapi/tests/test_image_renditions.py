@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+from PIL import Image
+
+from services.image_rendition_service import ImageRenditionService
+
+
+def make_image(tmp_path, relative_path: str, size=(2000, 1000), mode="RGB") -> str:
+    image_path = tmp_path / "images" / relative_path
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new(mode, size, (255, 0, 0, 128) if mode == "RGBA" else "red").save(image_path)
+    return str(image_path)
+
+
+def test_renditions_are_rendered_as_webp(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = ImageRenditionService()
+    image_path = make_image(tmp_path, "presentation/slide_1.png", mode="RGBA")
+
+    assert (
+        service.get_rendition_url(image_path, "thumbnail")
+        == "/app_data/images/renditions/thumbnail/presentation/slide_1.png.webp"
+    )
+
+    asyncio.run(service.create_renditions(image_path))
+    with Image.open(service.get_rendition_path(image_path, "thumbnail")) as thumbnail:
+        assert thumbnail.format == "WEBP"
+        assert thumbnail.size == (320, 160)
+        assert thumbnail.mode == "RGBA"
+    with Image.open(service.get_rendition_path(image_path, "medium")) as medium:
+        assert medium.size == (1280, 640)
+
+    service.remove_renditions(image_path)
+    assert not os.path.exists(service.get_rendition_path(image_path, "thumbnail"))
+    service.shutdown()
+
+
+def test_missing_renditions_are_rendered_on_request(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = ImageRenditionService()
+    image_path = make_image(tmp_path, "photo.jpg", size=(100, 50))
+
+    rendition_path = asyncio.run(service.get_rendition("medium", "photo.jpg.webp"))
+    assert rendition_path == service.get_rendition_path(image_path, "medium")
+    with Image.open(rendition_path) as medium:
+        # Small images are not enlarged
+        assert medium.size == (100, 50)
+
+    assert asyncio.run(service.get_rendition("large", "photo.jpg.webp")) is None
+    assert asyncio.run(service.get_rendition("medium", "missing.jpg.webp")) is None
+    # Only images of the images directory have renditions
+    Image.new("RGB", (10, 10)).save(tmp_path / "secret.png")
+    assert asyncio.run(service.get_rendition("medium", "../secret.png.webp")) is None
+    service.shutdown()
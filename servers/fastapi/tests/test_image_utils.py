@@ -0,0 +1,65 @@
+import pytest
+from PIL import Image
+
+from benchmarks.image_utils_benchmark import (
+    legacy_invert_image,
+    legacy_round_image_corners,
+    legacy_set_image_opacity,
+    make_test_image,
+)
+from utils.image_utils import invert_image, round_image_corners, set_image_opacity
+
+
+@pytest.mark.parametrize("size", [(1, 1), (64, 48), (97, 131)])
+def test_invert_image_matches_legacy(size):
+    image = make_test_image(*size)
+    assert invert_image(image).tobytes() == legacy_invert_image(image).tobytes()
+
+
+def test_invert_image_clears_transparent_pixels():
+    image = Image.new("RGBA", (2, 1), (10, 20, 30, 0))
+    image.putpixel((1, 0), (10, 20, 30, 128))
+
+    inverted = invert_image(image)
+
+    assert inverted.getpixel((0, 0)) == (0, 0, 0, 0)
+    assert inverted.getpixel((1, 0)) == (245, 235, 225, 128)
+
+
+@pytest.mark.parametrize("opacity", [0.0, 0.37, 0.5, 1.0, 1.5])
+def test_set_image_opacity_matches_legacy(opacity):
+    image = make_test_image(64, 48)
+    assert (
+        set_image_opacity(image, opacity).tobytes()
+        == legacy_set_image_opacity(image, opacity).tobytes()
+    )
+
+
+@pytest.mark.parametrize(
+    "size, radii",
+    [
+        ((64, 48), [8, 8, 8, 8]),
+        ((64, 48), [0, 5, 100, 13]),
+        ((97, 131), [48, 1, 0, 30]),
+        ((2, 2), [1, 1, 1, 1]),
+    ],
+)
+def test_round_image_corners_matches_legacy(size, radii):
+    image = make_test_image(*size)
+    assert (
+        round_image_corners(image, radii).tobytes()
+        == legacy_round_image_corners(image, radii).tobytes()
+    )
+
+
+def test_round_image_corners_converts_rgb():
+    image = Image.new("RGB", (20, 20), (255, 0, 0))
+    rounded = round_image_corners(image, [10, 10, 10, 10])
+
+    assert rounded.mode == "RGBA"
+    assert rounded.tobytes() == legacy_round_image_corners(image, [10] * 4).tobytes()
+
+
+def test_round_image_corners_requires_four_radii():
+    with pytest.raises(ValueError):
+        round_image_corners(make_test_image(4, 4), [1, 2, 3])
@@ -0,0 +1,15 @@
+from utils.latency_utils import MAX_LATENCY_SAMPLES, get_latency_stats, record_latency
+
+
+def test_latency_percentiles_use_recent_samples():
+    assert get_latency_stats([]) == {"p50_ms": None, "p95_ms": None}
+
+    latencies = {}
+    for _ in range(MAX_LATENCY_SAMPLES):
+        record_latency(latencies, "pexels", 10.0)
+    for index in range(100):
+        record_latency(latencies, "pexels", index / 1000)
+
+    assert len(latencies["pexels"]) == MAX_LATENCY_SAMPLES
+    assert get_latency_stats(latencies["pexels"]) == {"p50_ms": 10000.0, "p95_ms": 10000.0}
+    assert get_latency_stats([0.01, 0.02, 0.03]) == {"p50_ms": 20.0, "p95_ms": 30.0}
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from models.presentation_layout import SlideLayoutModel
+from models.presentation_outline_model import SlideOutlineModel
+from utils.llm_calls import generate_slide_content
+from utils.partial_json import JsonStringFieldScanner
+
+SLIDE = {
+    "title": "Growth \"this\" year",
+    "image": {"__image_prompt__": "rocket launch at dawn"},
+    "items": [
+        {"__icon_query__": "chart", "text": "Revenue doubled"},
+        {"__icon_query__": "users", "text": "Team of \\\\ 40, [growing]"},
+    ],
+    "tags": ["__icon_query__", "not a field"],
+    "__speaker_note__": "Talk about growth.",
+}
+
+
+def stream_chunks(text: str, size: int):
+    return [text[index : index + size] for index in range(0, len(text), size)]
+
+
+def test_fields_are_found_when_their_values_close():
+    text = json.dumps(SLIDE)
+    scanner = JsonStringFieldScanner(["__image_prompt__", "__icon_query__"])
+
+    fields = []
+    fields_at = {}
+    for position, chunk in enumerate(stream_chunks(text, 7)):
+        for field in scanner.feed(chunk):
+            fields.append(field)
+            fields_at[field[1]] = (position + 1) * 7
+
+    assert fields == [
+        ("__image_prompt__", "rocket launch at dawn"),
+        ("__icon_query__", "chart"),
+        ("__icon_query__", "users"),
+    ]
+    # Found right after the value closes, long before the end of the document
+    image_prompt_end = text.index("rocket launch at dawn") + len("rocket launch at dawn")
+    assert fields_at["rocket launch at dawn"] - image_prompt_end <= 7
+    assert fields_at["users"] < len(text) - 40
+
+
+def test_slide_content_is_streamed_with_asset_prefetch(monkeypatch):
+    chunks = stream_chunks(json.dumps(SLIDE), 5)
+    prefetched_fields = []
+    prefetched_before_chunk = []
+
+    class FakeLLMClient:
+        async def stream_structured(self, **kwargs):
+            for chunk in chunks:
+                prefetched_before_chunk.append(len(prefetched_fields))
+                yield chunk
+
+    monkeypatch.setattr(generate_slide_content, "LLMClient", FakeLLMClient)
+    monkeypatch.setattr(generate_slide_content, "get_model", lambda: "model")
+
+    content = asyncio.run(
+        generate_slide_content.get_slide_content_from_type_and_outline(
+            SlideLayoutModel(id="layout", json_schema={"type": "object", "properties": {}}),
+            SlideOutlineModel(content="Growth"),
+            "English",
+            prefetch_asset=lambda key, value: prefetched_fields.append((key, value)),
+        )
+    )
+
+    assert content == SLIDE
+    assert prefetched_fields[0] == ("__image_prompt__", "rocket launch at dawn")
+    assert len(prefetched_fields) == 3
+    # All assets were prefetched while the slide was still streaming
+    assert prefetched_before_chunk[-1] == 3
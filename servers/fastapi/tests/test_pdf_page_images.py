@@ -0,0 +1,74 @@
+import asyncio
+import os
+
+from PIL import Image
+
+from services.pdf_page_image_service import PdfPageImageService
+
+
+def create_pdf(path, n_pages: int) -> str:
+    pages = [
+        Image.new("RGB", (200, 100), (index * 40 % 255, 80, 160))
+        for index in range(n_pages)
+    ]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+    return str(path)
+
+
+def test_render_pages_in_page_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_PAGE_IMAGE_WORKERS", "2")
+    service = PdfPageImageService()
+    pdf_path = create_pdf(tmp_path / "deck.pdf", 5)
+
+    try:
+        image_paths = asyncio.run(service.render_pages(pdf_path, str(tmp_path)))
+    finally:
+        service.shutdown()
+
+    assert image_paths == [str(tmp_path / f"page_{index}.png") for index in range(1, 6)]
+    with Image.open(image_paths[0]) as image:
+        # 200pt wide page at the default 150 DPI
+        assert image.width == round(200 * 150 / 72)
+
+
+def test_render_pages_with_format_and_resolution(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_PAGE_IMAGE_FORMAT", "jpg")
+    monkeypatch.setenv("PDF_PAGE_IMAGE_DPI", "72")
+    service = PdfPageImageService()
+    pdf_path = create_pdf(tmp_path / "deck.pdf", 1)
+
+    image_paths = asyncio.run(service.render_pages(pdf_path, str(tmp_path)))
+
+    assert image_paths == [str(tmp_path / "page_1.jpg")]
+    with Image.open(image_paths[0]) as image:
+        assert image.format == "JPEG"
+        assert image.width == 200
+
+
+def test_lazy_pages_render_thumbnails_first(tmp_path):
+    service = PdfPageImageService()
+    pdf_path = create_pdf(tmp_path / "deck.pdf", 3)
+    output_dir = str(tmp_path / "slides")
+
+    async def render():
+        thumbnails = await service.render_thumbnails(pdf_path, output_dir)
+        assert not os.path.exists(os.path.join(output_dir, "slide_2.png"))
+
+        pages = await asyncio.gather(
+            service.get_page_image(output_dir, 2),
+            service.get_page_image(output_dir, 2),
+        )
+        missing_page = await service.get_page_image(output_dir, 4)
+        # Nothing is kept for pages already rendered
+        assert service._in_flight == {}
+        return thumbnails, pages, missing_page
+
+    thumbnails, pages, missing_page = asyncio.run(render())
+
+    assert len(thumbnails) == 3
+    with Image.open(thumbnails[0]) as image:
+        assert image.width == 100
+    assert pages == [os.path.join(output_dir, "slide_2.png")] * 2
+    with Image.open(pages[0]) as image:
+        assert image.width == round(200 * 150 / 72)
+    assert missing_page is None
@@ -1,12 +1,18 @@
 import asyncio
+import hashlib
 from models.pptx_models import (
     PptxAutoShapeBoxModel,
     PptxFillModel,
+    PptxPictureBoxModel,
+    PptxPictureModel,
     PptxPositionModel,
     PptxPresentationModel,
     PptxSlideModel,
 )
+from benchmarks.export_benchmark import run_export_case
+from benchmarks.image_utils_benchmark import make_test_image
 from services.pptx_presentation_creator import PptxPresentationCreator
+from utils.export_utils import get_pptx_export_response
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
 
 
@@ -38,3 +44,98 @@ def test_pptx_creator():
     pptx_creator = PptxPresentationCreator(pptx_model, temp_dir)
     asyncio.run(pptx_creator.create_ppt())
     pptx_creator.save("debug/test.pptx")
+
+
+def test_pptx_export_response_streams_file():
+    async def read_response():
+        response = await get_pptx_export_response(pptx_model, "test.pptx")
+        content = b""
+        async for chunk in response.body_iterator:
+            content += chunk
+        return response, content
+
+    response, content = asyncio.run(read_response())
+
+    assert content.startswith(b"PK")
+    assert response.headers["etag"] == f'"{hashlib.sha256(content).hexdigest()}"'
+    assert 'filename="test.pptx"' in response.headers["content-disposition"]
+
+    not_modified = asyncio.run(
+        get_pptx_export_response(pptx_model, "test.pptx", response.headers["etag"])
+    )
+    assert not_modified.status_code == 304
+
+
+def get_picture_model(image_path: str, **kwargs) -> PptxPresentationModel:
+    return PptxPresentationModel(
+        slides=[
+            PptxSlideModel(
+                shapes=[
+                    PptxPictureBoxModel(
+                        position=PptxPositionModel(
+                            left=20, top=20, width=200, height=150
+                        ),
+                        picture=PptxPictureModel(is_network=False, path=image_path),
+                        **kwargs,
+                    )
+                ]
+            )
+        ]
+    )
+
+
+def test_pptx_creator_resamples_pictures_to_box_size(tmp_path):
+    image_path = str(tmp_path / "large.png")
+    make_test_image(2000, 1500).convert("RGB").save(image_path)
+
+    pptx_creator = PptxPresentationCreator(
+        get_picture_model(image_path, clip=False), str(tmp_path), image_dpi=144
+    )
+    asyncio.run(pptx_creator.create_ppt())
+
+    picture = pptx_creator._ppt.slides[0].shapes[0]
+    assert picture.image.size == (400, 300)
+    assert picture.image.content_type == "image/jpeg"
+    assert pptx_creator.image_bytes_saved > 0
+
+
+def test_pptx_creator_keeps_png_for_transparent_pictures(tmp_path):
+    image_path = str(tmp_path / "large.png")
+    make_test_image(800, 600).save(image_path)
+
+    pptx_creator = PptxPresentationCreator(
+        get_picture_model(image_path, border_radius=[10, 10, 10, 10]),
+        str(tmp_path),
+        image_dpi=144,
+    )
+    asyncio.run(pptx_creator.create_ppt())
+
+    picture = pptx_creator._ppt.slides[0].shapes[0]
+    assert picture.image.content_type == "image/png"
+
+
+def test_pptx_creator_keeps_small_pictures_untouched(tmp_path):
+    image_path = str(tmp_path / "small.png")
+    make_test_image(100, 75).save(image_path)
+
+    pptx_creator = PptxPresentationCreator(
+        get_picture_model(image_path, clip=False), str(tmp_path), image_dpi=144
+    )
+    asyncio.run(pptx_creator.create_ppt())
+
+    picture = pptx_creator._ppt.slides[0].shapes[0]
+    with open(image_path, "rb") as f:
+        assert picture.image.blob == f.read()
+    assert pptx_creator.image_bytes_saved == 0
+
+
+def test_export_benchmark_cases_run():
+    for kind in ["text", "image"]:
+        result = run_export_case(2, kind, image_dpi=144)
+        assert result["output_bytes"] > 0
+        assert set(result["phases_s"]) == {
+            "build_model",
+            "fetch_network_assets",
+            "create_ppt",
+            "save",
+        }
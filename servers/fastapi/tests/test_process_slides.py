@@ -0,0 +1,60 @@
+import asyncio
+import uuid
+
+from models.sql.slide import SlideModel
+from utils import process_slides
+from utils.process_slides import process_slides_and_fetch_icons
+
+
+class StubIconFinder:
+    def __init__(self):
+        self.batches = []
+
+    async def search_icons_batch(self, queries, k=1):
+        self.batches.append(queries)
+        return [[f"/static/icons/{query.strip().lower()}.svg"] for query in queries]
+
+
+def make_slide(index: int, content: dict) -> SlideModel:
+    return SlideModel(
+        presentation=uuid.uuid4(),
+        layout_group="general",
+        layout="icons",
+        index=index,
+        content=content,
+    )
+
+
+def test_icons_of_all_slides_are_fetched_in_one_batch(monkeypatch):
+    icon_finder = StubIconFinder()
+    monkeypatch.setattr(process_slides, "ICON_FINDER_SERVICE", icon_finder)
+    slides = [
+        make_slide(
+            0,
+            {
+                "title": "Growth",
+                "icon": {"__icon_query__": "chart"},
+                "items": [
+                    {"icon": {"__icon_query__": "users"}},
+                    {"icon": {"__icon_query__": "Chart "}},
+                ],
+            },
+        ),
+        make_slide(1, {"title": "No icons"}),
+        make_slide(2, {"items": [{"icon": {"__icon_query__": "chart"}}]}),
+    ]
+
+    asyncio.run(process_slides_and_fetch_icons(slides))
+
+    assert icon_finder.batches == [["chart", "users", "Chart ", "chart"]]
+    assert slides[0].content["icon"]["__icon_url__"] == "/static/icons/chart.svg"
+    assert [item["icon"]["__icon_url__"] for item in slides[0].content["items"]] == [
+        "/static/icons/users.svg",
+        "/static/icons/chart.svg",
+    ]
+    assert slides[1].content == {"title": "No icons"}
+    assert slides[2].content["items"][0]["icon"]["__icon_url__"] == "/static/icons/chart.svg"
+
+    # Nothing is searched without icons
+    asyncio.run(process_slides_and_fetch_icons([make_slide(0, {"title": "Text"})]))
+    assert len(icon_finder.batches) == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.score_based_chunker_benchmark import (
+    LegacyScoreBasedChunker,
+    make_markdown,
+)
+from services.score_based_chunker import ScoreBasedChunker
+
+
+TEXTS = [
+    "",
+    "no headings\nat all",
+    "# Title\nintro\n## Part\nbody\n### Detail\nmore",
+    "preface\n  # Indented\ntext\r\n# Windows\r\nline\r\n#\n# Title\nrepeated\n# Title\nagain",
+    "# Last heading without content",
+    make_markdown(0.05, seed=3),
+]
+
+
+def get_legacy_chunks(text, top_k):
+    chunker = LegacyScoreBasedChunker()
+    headings = chunker.extract_headings(text)
+    return chunker.get_chunks_from_headings(
+        text, headings, chunker.score_headings(headings), top_k
+    )
+
+
+def dump(chunks):
+    return [chunk.model_dump() for chunk in chunks]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("top_k", [1, 2, 3, 10])
+def test_chunks_match_legacy(text, top_k, tmp_path):
+    expected = dump(get_legacy_chunks(text, top_k))
+    chunker = ScoreBasedChunker()
+
+    assert dump(chunker.get_chunks(text, top_k)) == expected
+
+    headings = chunker.extract_headings(text)
+    assert (
+        dump(
+            chunker.get_chunks_from_headings(
+                text, headings, chunker.score_headings(headings), top_k
+            )
+        )
+        == expected
+    )
+
+    file_path = tmp_path / "document.md"
+    file_path.write_bytes(text.encode("utf-8"))
+    assert dump(chunker.iter_chunks_from_file(str(file_path), top_k)) == expected
+    assert (
+        dump(chunker.iter_chunks_from_lines(text.splitlines(keepends=True), top_k))
+        == expected
+    )
+
+
+def test_headings_not_in_text_are_skipped():
+    text = "# One\na\n# Two\nb\n# One\nc"
+    headings = ["# One", "# Missing", "# One"]
+    scores = [10.0, 9.0, 8.0]
+
+    chunker = ScoreBasedChunker()
+    assert dump(chunker.get_chunks_from_headings(text, headings, scores, 3)) == dump(
+        LegacyScoreBasedChunker().get_chunks_from_headings(text, headings, scores, 3)
+    )
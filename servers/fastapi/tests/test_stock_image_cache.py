@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from services.stock_image_cache_service import StockImageCacheService
+
+
+def make_search(results: list, url):
+    async def search():
+        results.append(url)
+        await asyncio.sleep(0.01)
+        return url
+
+    return search
+
+
+def test_results_are_cached_by_normalized_query(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = StockImageCacheService()
+    searches = []
+
+    async def run():
+        return await asyncio.gather(
+            service.get_or_search("pexels", "Mountain sunset", make_search(searches, "a")),
+            service.get_or_search("pexels", "mountain  sunset!", make_search(searches, "b")),
+        )
+
+    assert asyncio.run(run()) == ["a", "a"]
+    assert searches == ["a"]
+
+    # A new instance reads the persisted entry, as after a restart
+    service = StockImageCacheService()
+    url = asyncio.run(
+        service.get_or_search("pexels", "mountain sunset", make_search(searches, "c"))
+    )
+    assert url == "a"
+    assert searches == ["a"]
+    assert service.get_stats()["pexels"]["cache_hits"] == 1
+
+
+def test_empty_results_are_cached_and_errors_are_not(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = StockImageCacheService()
+    searches = []
+
+    assert asyncio.run(service.get_or_search("pixabay", "x", make_search(searches, None))) is None
+    assert asyncio.run(service.get_or_search("pixabay", "x", make_search(searches, "y"))) is None
+    assert searches == [None]
+    assert service.get_stats()["pixabay"]["negative_cache_hits"] == 1
+
+    async def failing_search():
+        raise Exception("API error")
+
+    with pytest.raises(Exception):
+        asyncio.run(service.get_or_search("pixabay", "z", failing_search))
+    assert asyncio.run(service.get_or_search("pixabay", "z", make_search(searches, "z"))) == "z"
+
+
+def test_expired_entries_are_searched_again(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("STOCK_IMAGE_CACHE_TTL", "1")
+    service = StockImageCacheService()
+    searches = []
+
+    asyncio.run(service.get_or_search("pexels", "q", make_search(searches, "old")))
+    monkeypatch.setattr(time, "time", lambda: 10**12)
+
+    assert asyncio.run(service.get_or_search("pexels", "q", make_search(searches, "new"))) == "new"
+
+
+def test_expired_entries_are_removed(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = StockImageCacheService()
+
+    asyncio.run(service.set("pexels", "q", "old"))
+    entry_path = service._get_entry_path(service.get_key("pexels", "q"))
+    assert os.path.exists(entry_path)
+    monkeypatch.setattr(time, "time", lambda: 10**12)
+
+    # Read from disk, as after a restart
+    assert asyncio.run(StockImageCacheService().get("pexels", "q")) is None
+    assert not os.path.exists(entry_path)
+
+
+def test_exhausted_quota_skips_provider_until_reset(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    service = StockImageCacheService()
+
+    service.record_response(
+        "pixabay",
+        {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "60"},
+    )
+
+    assert service.is_quota_exhausted("pixabay")
+    assert service.get_stats()["pixabay"]["quota"]["limit"] == 100
+    with pytest.raises(Exception, match="quota"):
+        asyncio.run(service.get_or_search("pixabay", "q", make_search([], "a")))
+
+    service.record_response(
+        "pixabay",
+        {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"},
+    )
+    assert not service.is_quota_exhausted("pixabay")
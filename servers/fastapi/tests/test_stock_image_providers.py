@@ -0,0 +1,99 @@
+import asyncio
+
+from services.image_generation_service import ImageGenerationService
+from services.stock_image_provider_service import (
+    STOCK_IMAGE_PROVIDER_SERVICE,
+    StockImageProviderService,
+)
+
+
+def make_service(tmp_path, monkeypatch, pexels_delay: float, pexels_url, pixabay_url):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("IMAGE_PROVIDER", "pexels")
+    monkeypatch.setenv("PEXELS_API_KEY", "pexels_key")
+    monkeypatch.setenv("PIXABAY_API_KEY", "pixabay_key")
+    service = ImageGenerationService(str(tmp_path))
+    calls = []
+
+    async def get_image_from_pexels(prompt):
+        calls.append("pexels")
+        await asyncio.sleep(pexels_delay)
+        if isinstance(pexels_url, Exception):
+            raise pexels_url
+        return pexels_url
+
+    async def get_image_from_pixabay(prompt):
+        calls.append("pixabay")
+        return pixabay_url
+
+    service.get_image_from_pexels = get_image_from_pexels
+    service.get_image_from_pixabay = get_image_from_pixabay
+    return service, calls
+
+
+def test_providers_are_tried_in_order_without_hedging(tmp_path, monkeypatch):
+    monkeypatch.delenv("STOCK_IMAGE_HEDGE_DELAY_MS", raising=False)
+    service, calls = make_service(tmp_path, monkeypatch, 0.05, "pexels.jpg", "pixabay.jpg")
+    assert asyncio.run(service.get_image_from_stock_providers("sunset")) == "pexels.jpg"
+    assert calls == ["pexels"]
+
+    service, calls = make_service(
+        tmp_path, monkeypatch, 0, Exception("API error"), "pixabay.jpg"
+    )
+    assert asyncio.run(service.get_image_from_stock_providers("sunset")) == "pixabay.jpg"
+    assert calls == ["pexels", "pixabay"]
+
+
+def test_slow_provider_is_hedged(tmp_path, monkeypatch):
+    monkeypatch.setenv("STOCK_IMAGE_HEDGE_DELAY_MS", "10")
+    service, calls = make_service(tmp_path, monkeypatch, 1, "pexels.jpg", "pixabay.jpg")
+    hedged = STOCK_IMAGE_PROVIDER_SERVICE.get_metrics().get("pixabay", {}).get("hedged", 0)
+
+    assert asyncio.run(service.get_image_from_stock_providers("sunset")) == "pixabay.jpg"
+    assert calls == ["pexels", "pixabay"]
+    assert STOCK_IMAGE_PROVIDER_SERVICE.get_metrics()["pixabay"]["hedged"] == hedged + 1
+
+    # A provider answering within the delay is not hedged
+    service, calls = make_service(tmp_path, monkeypatch, 0, "pexels.jpg", "pixabay.jpg")
+    assert asyncio.run(service.get_image_from_stock_providers("sunset")) == "pexels.jpg"
+    assert calls == ["pexels"]
+
+
+def test_sessions_are_pooled_per_provider_and_loop():
+    service = StockImageProviderService()
+
+    async def get_sessions():
+        sessions = [
+            service.get_session("pexels"),
+            service.get_session("pexels"),
+            service.get_session("pixabay"),
+        ]
+        await service.close()
+        return sessions
+
+    first = asyncio.run(get_sessions())
+    assert first[0] is first[1]
+    assert first[0] is not first[2]
+    assert all(session.closed for session in first)
+
+    second = asyncio.run(get_sessions())
+    assert second[0] is not first[0]
+
+
+def test_metrics_track_latency_and_errors():
+    service = StockImageProviderService()
+
+    async def run():
+        async with service.track("pexels"):
+            await asyncio.sleep(0.01)
+        try:
+            async with service.track("pexels"):
+                raise Exception("API error")
+        except Exception:
+            pass
+
+    asyncio.run(run())
+    metrics = service.get_metrics()["pexels"]
+    assert metrics["requests"] == 2
+    assert metrics["errors"] == 1
+    assert metrics["p95_ms"] >= 10
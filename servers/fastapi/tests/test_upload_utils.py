@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from constants.documents import PDF_MIME_TYPES, UPLOAD_CHUNK_SIZE
+from utils.upload_utils import has_expected_signature, save_upload_file
+
+
+def make_upload_file(content: bytes, content_type: str, size=None) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        filename="upload.bin",
+        size=size,
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+def test_save_upload_file_streams_and_hashes(tmp_path):
+    content = b"%PDF-1.4\n" + os.urandom(UPLOAD_CHUNK_SIZE * 2 + 17)
+    path = str(tmp_path / "document.pdf")
+
+    result = asyncio.run(
+        save_upload_file(
+            make_upload_file(content, "application/pdf"), path, 10, PDF_MIME_TYPES
+        )
+    )
+
+    with open(path, "rb") as f:
+        assert f.read() == content
+    assert result.size == len(content)
+    assert result.sha256 == hashlib.sha256(content).hexdigest()
+    assert os.listdir(tmp_path) == ["document.pdf"]
+
+
+def test_save_upload_file_aborts_when_oversized(tmp_path):
+    content = b"%PDF-1.4\n" + b"0" * (UPLOAD_CHUNK_SIZE * 3)
+    path = str(tmp_path / "document.pdf")
+
+    # The declared size is missing, so the limit is enforced while streaming
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            save_upload_file(make_upload_file(content, "application/pdf"), path, 2)
+        )
+
+    assert exc_info.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_upload_file_rejects_content_not_matching_type(tmp_path):
+    path = str(tmp_path / "document.pdf")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            save_upload_file(
+                make_upload_file(b"not a pdf", "application/pdf"),
+                path,
+                accepted_types=PDF_MIME_TYPES,
+            )
+        )
+
+    assert "does not match" in exc_info.value.detail
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_upload_file_rejects_unaccepted_type(tmp_path):
+    path = str(tmp_path / "notes.txt")
+
+    with pytest.raises(HTTPException):
+        asyncio.run(
+            save_upload_file(
+                make_upload_file(b"text", "text/plain"),
+                path,
+                accepted_types=PDF_MIME_TYPES,
+            )
+        )
+
+    assert not os.path.exists(path)
+
+
+def test_signatures_are_matched_at_their_offsets():
+    assert has_expected_signature("image/png", b"\x89PNG\r\n\x1a\n" + b"0" * 10)
+    assert not has_expected_signature("image/png", b"GIF89a \x89PNG\r\n\x1a\n")
+    assert has_expected_signature("image/webp", b"RIFF\x24\x00\x00\x00WEBPVP8 ")
+    assert not has_expected_signature("image/webp", b"text mentioning WEBP")
+    assert not has_expected_signature("application/pdf", b"junk %PDF-1.4")
+    # Types without a known signature are not checked
+    assert has_expected_signature("text/plain", b"anything")
@@ -13,7 +13,46 @@ def get_exports_directory():
     os.makedirs(export_directory, exist_ok=True)
     return export_directory
 
+
+def get_export_cache_directory():
+    export_cache_directory = os.path.join(get_exports_directory(), "cache")
+    os.makedirs(export_cache_directory, exist_ok=True)
+    return export_cache_directory
+
+
 def get_uploads_directory():
     uploads_directory = os.path.join(get_app_data_directory_env(), "uploads")
     os.makedirs(uploads_directory, exist_ok=True)
     return uploads_directory
+
+
+def get_download_cache_directory():
+    download_cache_directory = os.path.join(
+        get_app_data_directory_env(), "cache", "downloads"
+    )
+    os.makedirs(download_cache_directory, exist_ok=True)
+    return download_cache_directory
+
+
+def get_stock_image_cache_directory():
+    stock_image_cache_directory = os.path.join(
+        get_app_data_directory_env(), "cache", "stock_images"
+    )
+    os.makedirs(stock_image_cache_directory, exist_ok=True)
+    return stock_image_cache_directory
+
+
+def get_document_cache_directory():
+    document_cache_directory = os.path.join(
+        get_app_data_directory_env(), "cache", "documents"
+    )
+    os.makedirs(document_cache_directory, exist_ok=True)
+    return document_cache_directory
+
+
+def get_retrieval_index_directory():
+    retrieval_index_directory = os.path.join(
+        get_app_data_directory_env(), "retrieval"
+    )
+    os.makedirs(retrieval_index_directory, exist_ok=True)
+    return retrieval_index_directory
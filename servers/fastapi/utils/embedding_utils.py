@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+
+@lru_cache(maxsize=1)
+def get_embedding_function() -> ONNXMiniLM_L6_V2:
+    """
+    Local MiniLM model shipped in chroma/models, shared by icon search and
+    document retrieval.
+    """
+    embedding_function = ONNXMiniLM_L6_V2()
+    embedding_function.DOWNLOAD_PATH = "chroma/models"
+    embedding_function._download_model_if_not_exists()
+    return embedding_function
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Returns one normalized float32 row per text, so dot products are cosine similarities.
+    """
+    if not texts:
+        return np.zeros((0, 384), dtype=np.float32)
+    return np.asarray(get_embedding_function()(texts), dtype=np.float32)
@@ -1,67 +1,291 @@
-import json
+import asyncio
+import hashlib
 import os
+from io import BytesIO
+from urllib.parse import quote
 import aiohttp
-from typing import Literal
-import uuid
+from typing import Iterator, Literal, Optional
 from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pathvalidate import sanitize_filename
 
 from models.pptx_models import PptxPresentationModel
 from models.presentation_and_path import PresentationAndPath
+from services.export_cache_service import EXPORT_CACHE_SERVICE
 from services.pptx_presentation_creator import PptxPresentationCreator
 from services.temp_file_service import TEMP_FILE_SERVICE
 from utils.asset_directory_utils import get_exports_directory
+from utils.get_env import get_export_image_dpi_env
+from utils.parsers import parse_int_or_default
 import uuid
 
 
+EXPORT_MEDIA_TYPES = {
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "pdf": "application/pdf",
+}
+
+EXPORT_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def get_pptx_model(presentation_id: uuid.UUID) -> PptxPresentationModel:
+    # Get the converted PPTX model from the Next.js service
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            f"http://localhost/api/presentation_to_pptx_model?id={presentation_id}"
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                print(f"Failed to get PPTX model: {error_text}")
+                raise HTTPException(
+                    status_code=500,
+                    detail="Failed to convert presentation to PPTX model",
+                )
+            pptx_model_data = await response.json()
+
+    return PptxPresentationModel(**pptx_model_data)
+
+
+def get_export_image_dpi() -> Optional[int]:
+    return parse_int_or_default(get_export_image_dpi_env(), 0) or None
+
+
+async def create_pptx(pptx_model: PptxPresentationModel, temp_dir: str):
+    pptx_creator = PptxPresentationCreator(
+        pptx_model, temp_dir, get_export_image_dpi()
+    )
+    await pptx_creator.create_ppt()
+
+    if pptx_creator.image_bytes_saved:
+        print(
+            f"Image resampling saved {pptx_creator.image_bytes_saved} bytes in export"
+        )
+    return pptx_creator
+
+
+async def create_pptx_buffer(pptx_model: PptxPresentationModel) -> BytesIO:
+    """
+    Builds the PPTX file in memory and removes the temporary assets used to build it.
+    """
+    temp_dir = TEMP_FILE_SERVICE.create_temp_dir()
+    try:
+        pptx_creator = await create_pptx(pptx_model, temp_dir)
+
+        buffer = BytesIO()
+        pptx_creator.save(buffer)
+        buffer.seek(0)
+        return buffer
+    finally:
+        TEMP_FILE_SERVICE.cleanup_temp_dir(temp_dir)
+
+
+async def export_pdf(presentation_id: uuid.UUID, title: str) -> str:
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            "http://localhost/api/export-as-pdf",
+            json={
+                "id": str(presentation_id),
+                "title": sanitize_filename(title or str(uuid.uuid4())),
+            },
+        ) as response:
+            response_json = await response.json()
+
+    return response_json["path"]
+
+
+def get_export_file_name(title: str, export_as: Literal["pptx", "pdf"]) -> str:
+    return f"{sanitize_filename(title or str(uuid.uuid4()))}.{export_as}"
+
+
 async def export_presentation(
-    presentation_id: uuid.UUID, title: str, export_as: Literal["pptx", "pdf"]
+    presentation_id: uuid.UUID,
+    title: str,
+    export_as: Literal["pptx", "pdf"],
+    revision: Optional[str] = None,
 ) -> PresentationAndPath:
-    if export_as == "pptx":
+    """
+    Exports the presentation to the exports directory.
+    If revision is given, the export is served from and stored in the export cache.
+    """
+    file_name = get_export_file_name(title, export_as)
 
-        # Get the converted PPTX model from the Next.js service
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"http://localhost/api/presentation_to_pptx_model?id={presentation_id}"
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    print(f"Failed to get PPTX model: {error_text}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Failed to convert presentation to PPTX model",
-                    )
-                pptx_model_data = await response.json()
+    if revision:
+        cached_path = EXPORT_CACHE_SERVICE.get_cached_export(
+            presentation_id, revision, file_name
+        )
+        if cached_path:
+            return PresentationAndPath(
+                presentation_id=presentation_id,
+                path=cached_path,
+            )
+
+    if export_as == "pptx":
 
         # Create PPTX file using the converted model
-        pptx_model = PptxPresentationModel(**pptx_model_data)
+        pptx_model = await get_pptx_model(presentation_id)
         temp_dir = TEMP_FILE_SERVICE.create_temp_dir()
-        pptx_creator = PptxPresentationCreator(pptx_model, temp_dir)
-        await pptx_creator.create_ppt()
+        pptx_creator = await create_pptx(pptx_model, temp_dir)
 
         export_directory = get_exports_directory()
-        pptx_path = os.path.join(
-            export_directory,
-            f"{sanitize_filename(title or str(uuid.uuid4()))}.pptx",
+        export_path = os.path.join(export_directory, file_name)
+        pptx_creator.save(export_path)
+    else:
+        export_path = await export_pdf(presentation_id, title)
+
+    if revision:
+        export_path = EXPORT_CACHE_SERVICE.cache_export(
+            presentation_id, revision, file_name, file_path=export_path
         )
-        pptx_creator.save(pptx_path)
 
-        return PresentationAndPath(
-            presentation_id=presentation_id,
-            path=pptx_path,
+    return PresentationAndPath(
+        presentation_id=presentation_id,
+        path=export_path,
+    )
+
+
+def iter_buffer_chunks(buffer: BytesIO) -> Iterator[bytes]:
+    while chunk := buffer.read(EXPORT_STREAM_CHUNK_SIZE):
+        yield chunk
+
+
+def iter_file_chunks(file_path: str, delete_after: bool = False) -> Iterator[bytes]:
+    try:
+        with open(file_path, "rb") as file:
+            while chunk := file.read(EXPORT_STREAM_CHUNK_SIZE):
+                yield chunk
+    finally:
+        if delete_after:
+            TEMP_FILE_SERVICE.cleanup_temp_file(file_path)
+
+
+def get_file_sha256(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def is_etag_matched(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    return etag in [each.strip() for each in if_none_match.split(",")]
+
+
+def get_content_disposition(file_name: str, export_as: Literal["pptx", "pdf"]) -> str:
+    """
+    Headers are Latin-1, so the UTF-8 file name goes in filename* (RFC 6266)
+    with an ASCII filename for clients that don't read it.
+    """
+    file_name = sanitize_filename(file_name)
+    name, extension = os.path.splitext(file_name)
+    ascii_name = name.encode("ascii", "ignore").decode().replace('"', "").strip()
+    ascii_file_name = f"{ascii_name or 'presentation'}{extension or f'.{export_as}'}"
+    return (
+        f'attachment; filename="{ascii_file_name}"; '
+        f"filename*=UTF-8''{quote(file_name)}"
+    )
+
+
+def get_export_response(
+    chunks: Iterator[bytes],
+    file_name: str,
+    export_as: Literal["pptx", "pdf"],
+    etag: str,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Streams an exported file as an attachment.
+    Returns 304 if the client already holds the file with the same ETag.
+    """
+    etag = f'"{etag}"'
+    headers = {"ETag": etag}
+
+    if is_etag_matched(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = get_content_disposition(file_name, export_as)
+    return StreamingResponse(
+        chunks, media_type=EXPORT_MEDIA_TYPES[export_as], headers=headers
+    )
+
+
+async def get_pptx_export_response(
+    pptx_model: PptxPresentationModel,
+    file_name: str,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    buffer = await create_pptx_buffer(pptx_model)
+    etag = hashlib.sha256(buffer.getbuffer()).hexdigest()
+
+    return get_export_response(
+        iter_buffer_chunks(buffer), file_name, "pptx", etag, if_none_match
+    )
+
+
+async def export_presentation_as_stream(
+    presentation_id: uuid.UUID,
+    title: str,
+    export_as: Literal["pptx", "pdf"],
+    if_none_match: Optional[str] = None,
+    revision: Optional[str] = None,
+) -> Response:
+    """
+    Exports the presentation and streams it in the response body instead of
+    returning a path in the exports directory.
+    If revision is given, the export cache is used and the ETag is derived from it,
+    so unchanged presentations are neither rebuilt nor downloaded again.
+    """
+    file_name = get_export_file_name(title, export_as)
+
+    if revision:
+        etag = f"{revision}-{export_as}"
+        if is_etag_matched(f'"{etag}"', if_none_match):
+            return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+
+        cached_path = EXPORT_CACHE_SERVICE.get_cached_export(
+            presentation_id, revision, file_name
         )
-    else:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "http://localhost/api/export-as-pdf",
-                json={
-                    "id": str(presentation_id),
-                    "title": sanitize_filename(title or str(uuid.uuid4())),
-                },
-            ) as response:
-                response_json = await response.json()
-
-        return PresentationAndPath(
-            presentation_id=presentation_id,
-            path=response_json["path"],
+        if cached_path:
+            return get_export_response(
+                iter_file_chunks(cached_path), file_name, export_as, etag
+            )
+
+    if export_as == "pptx":
+        pptx_model = await get_pptx_model(presentation_id)
+        if not revision:
+            return await get_pptx_export_response(pptx_model, file_name, if_none_match)
+
+        buffer = await create_pptx_buffer(pptx_model)
+        await asyncio.to_thread(
+            EXPORT_CACHE_SERVICE.cache_export,
+            presentation_id,
+            revision,
+            file_name,
+            content=buffer.getvalue(),
         )
+        return get_export_response(
+            iter_buffer_chunks(buffer), file_name, "pptx", etag
+        )
+
+    # PDF is rendered to a file by the Next.js service
+    pdf_path = await export_pdf(presentation_id, title)
+
+    if revision:
+        cached_path = EXPORT_CACHE_SERVICE.cache_export(
+            presentation_id, revision, file_name, file_path=pdf_path
+        )
+        return get_export_response(
+            iter_file_chunks(cached_path), file_name, "pdf", etag
+        )
+
+    # Without a revision there is nothing to reuse it for, stream and remove it
+    etag = await asyncio.to_thread(get_file_sha256, pdf_path)
+
+    response = get_export_response(
+        iter_file_chunks(pdf_path, delete_after=True),
+        file_name,
+        "pdf",
+        etag,
+        if_none_match,
+    )
+    if response.status_code == 304:
+        TEMP_FILE_SERVICE.cleanup_temp_file(pdf_path)
+    return response
@@ -42,3 +42,17 @@ def set_file_ext(file_path: str, ext: str) -> str:
     if get_file_ext_or_none(file_path):
         return f"{os.path.splitext(file_path)[0]}{ext}"
     return f"{file_path}{ext}"
+
+
+def write_file(file_path: str, data: bytes):
+    """
+    Writes through a temporary file, so readers never see a partial file.
+    """
+    temp_path = f"{file_path}.{uuid.uuid4()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
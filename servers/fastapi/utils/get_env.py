@@ -97,3 +97,103 @@ def get_extended_reasoning_env():
 
 def get_web_grounding_env():
     return os.getenv("WEB_GROUNDING")
+
+
+def get_asset_download_max_size_mb_env():
+    return os.getenv("ASSET_DOWNLOAD_MAX_SIZE_MB")
+
+
+def get_asset_download_timeout_env():
+    return os.getenv("ASSET_DOWNLOAD_TIMEOUT")
+
+
+def get_asset_download_per_host_limit_env():
+    return os.getenv("ASSET_DOWNLOAD_PER_HOST_LIMIT")
+
+
+def get_asset_download_revalidate_after_env():
+    return os.getenv("ASSET_DOWNLOAD_REVALIDATE_AFTER")
+
+
+def get_asset_download_cache_max_size_mb_env():
+    return os.getenv("ASSET_DOWNLOAD_CACHE_MAX_SIZE_MB")
+
+
+def get_export_image_dpi_env():
+    return os.getenv("EXPORT_IMAGE_DPI")
+
+
+def get_docling_workers_env():
+    return os.getenv("DOCLING_WORKERS")
+
+
+def get_docling_max_tasks_per_worker_env():
+    return os.getenv("DOCLING_MAX_TASKS_PER_WORKER")
+
+
+def get_docling_max_worker_rss_mb_env():
+    return os.getenv("DOCLING_MAX_WORKER_RSS_MB")
+
+
+def get_document_cache_max_size_mb_env():
+    return os.getenv("DOCUMENT_CACHE_MAX_SIZE_MB")
+
+
+def get_documents_loader_concurrency_env():
+    return os.getenv("DOCUMENTS_LOADER_CONCURRENCY")
+
+
+def get_pdf_page_image_dpi_env():
+    return os.getenv("PDF_PAGE_IMAGE_DPI")
+
+
+def get_pdf_page_image_format_env():
+    return os.getenv("PDF_PAGE_IMAGE_FORMAT")
+
+
+def get_pdf_page_image_workers_env():
+    return os.getenv("PDF_PAGE_IMAGE_WORKERS")
+
+
+def get_additional_context_max_tokens_env():
+    return os.getenv("ADDITIONAL_CONTEXT_MAX_TOKENS")
+
+
+def get_context_condense_concurrency_env():
+    return os.getenv("CONTEXT_CONDENSE_CONCURRENCY")
+
+
+def get_icon_search_min_keyword_score_env():
+    return os.getenv("ICON_SEARCH_MIN_KEYWORD_SCORE")
+
+
+def get_icon_search_keyword_weight_env():
+    return os.getenv("ICON_SEARCH_KEYWORD_WEIGHT")
+
+
+def get_stock_image_cache_ttl_env():
+    return os.getenv("STOCK_IMAGE_CACHE_TTL")
+
+
+def get_stock_image_timeout_env():
+    return os.getenv("STOCK_IMAGE_TIMEOUT")
+
+
+def get_stock_image_hedge_delay_ms_env():
+    return os.getenv("STOCK_IMAGE_HEDGE_DELAY_MS")
+
+
+def get_image_generation_concurrency_env():
+    return os.getenv("IMAGE_GENERATION_CONCURRENCY")
+
+
+def get_image_asset_gc_interval_env():
+    return os.getenv("IMAGE_ASSET_GC_INTERVAL")
+
+
+def get_image_asset_gc_grace_period_env():
+    return os.getenv("IMAGE_ASSET_GC_GRACE_PERIOD")
+
+
+def get_image_rendition_workers_env():
+    return os.getenv("IMAGE_RENDITION_WORKERS")
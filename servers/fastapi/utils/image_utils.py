@@ -1,6 +1,7 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
-from PIL import Image, ImageDraw
+from PIL import Image, ImageChops, ImageDraw
 
 from models.pptx_models import PptxObjectFitEnum, PptxObjectFitModel
 
@@ -46,6 +47,21 @@ def clip_image(
     return clipped_image
 
 
+@lru_cache(maxsize=128)
+def _get_corner_masks(radius: int) -> Tuple[Image.Image, ...]:
+    # Quarter circles for top-left, top-right, bottom-right and bottom-left
+    circle = Image.new("L", (radius * 2, radius * 2), 0)
+    draw = ImageDraw.Draw(circle)
+    draw.ellipse((0, 0, radius * 2 - 1, radius * 2 - 1), fill=255)
+
+    return (
+        circle.crop((0, 0, radius, radius)),
+        circle.crop((radius, 0, radius * 2, radius)),
+        circle.crop((radius, radius, radius * 2, radius * 2)),
+        circle.crop((0, radius, radius, radius * 2)),
+    )
+
+
 def round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
     if len(radii) != 4:
         raise ValueError(
@@ -62,80 +78,54 @@ def round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
     if image.mode != "RGBA":
         image = image.convert("RGBA")
 
-    # Create a mask for the rounded corners (start with fully transparent)
-    rounded_mask = Image.new("L", image.size, 0)
-
-    # Create a rectangular mask (fully opaque)
-    rectangular_mask = Image.new("L", image.size, 255)
+    # Start fully opaque and cut each corner with a cached quarter circle
+    corner_mask = Image.new("L", image.size, 255)
 
-    # Process each corner
     for i, radius in enumerate(clamped_radii):
         if radius > 0:  # Only process if radius is positive
-            # Create a circle for this radius
-            circle = Image.new("L", (radius * 2, radius * 2), 0)
-            draw = ImageDraw.Draw(circle)
-            draw.ellipse((0, 0, radius * 2 - 1, radius * 2 - 1), fill=255)
+            quarter_circle = _get_corner_masks(radius)[i]
 
             # Calculate position based on corner index
             if i == 0:  # top-left
-                rounded_mask.paste(circle.crop((0, 0, radius, radius)), (0, 0))
-                rectangular_mask.paste(0, (0, 0, radius, radius))
+                corner_mask.paste(quarter_circle, (0, 0))
             elif i == 1:  # top-right
-                rounded_mask.paste(
-                    circle.crop((radius, 0, radius * 2, radius)), (w - radius, 0)
-                )
-                rectangular_mask.paste(0, (w - radius, 0, w, radius))
+                corner_mask.paste(quarter_circle, (w - radius, 0))
             elif i == 2:  # bottom-right
-                rounded_mask.paste(
-                    circle.crop((radius, radius, radius * 2, radius * 2)),
-                    (w - radius, h - radius),
-                )
-                rectangular_mask.paste(0, (w - radius, h - radius, w, h))
+                corner_mask.paste(quarter_circle, (w - radius, h - radius))
             else:  # bottom-left
-                rounded_mask.paste(
-                    circle.crop((0, radius, radius, radius * 2)), (0, h - radius)
-                )
-                rectangular_mask.paste(0, (0, h - radius, radius, h))
-
-    # Get the original alpha channel
-    original_alpha = image.getchannel("A")
-
-    # Combine the rectangular mask with the rounded corners
-    corner_mask = Image.composite(rounded_mask, rectangular_mask, rounded_mask)
+                corner_mask.paste(quarter_circle, (0, h - radius))
 
     # Combine the corner mask with the original alpha channel
     final_alpha = Image.composite(
-        original_alpha, Image.new("L", image.size, 0), corner_mask
+        image.getchannel("A"), Image.new("L", image.size, 0), corner_mask
     )
 
-    # Create a new image with the modified alpha channel
-    result = Image.new("RGBA", image.size)
-    result.paste(image.convert("RGB"), (0, 0))
+    result = image.copy()
     result.putalpha(final_alpha)
 
     return result
 
 
+# Maps alpha to 255 for visible pixels and 0 for fully transparent ones
+_VISIBLE_ALPHA_LUT = [0] + [255] * 255
+
+
 def invert_image(img: Image.Image) -> Image.Image:
-    # Get image data
-    data = img.getdata()
-
-    # Process each pixel
-    new_data = []
-    for item in data:
-        # Get current pixel values
-        r, g, b, a = item
-
-        # Invert RGB values while preserving transparency
-        if a != 0:  # Skip fully transparent pixels
-            new_data.append((255 - r, 255 - g, 255 - b, a))
-        else:
-            new_data.append((0, 0, 0, 0))
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
 
-    # Create new image with modified data
-    new_img = Image.new("RGBA", img.size)
-    new_img.putdata(new_data)
-    return new_img
+    alpha = img.getchannel("A")
+
+    # Invert RGB values while preserving transparency
+    inverted = ImageChops.invert(img.convert("RGB")).convert("RGBA")
+    inverted.putalpha(alpha)
+
+    # Fully transparent pixels become (0, 0, 0, 0)
+    return Image.composite(
+        inverted,
+        Image.new("RGBA", img.size, (0, 0, 0, 0)),
+        alpha.point(_VISIBLE_ALPHA_LUT),
+    )
 
 
 def create_circle_image(
@@ -180,20 +170,40 @@ def set_image_opacity(image: Image.Image, opacity: float) -> Image.Image:
     if image.mode != "RGBA":
         image = image.convert("RGBA")
 
-    # Get the original alpha channel
-    original_alpha = image.getchannel("A")
-
-    # Create new alpha channel with adjusted opacity
-    new_alpha = original_alpha.point(lambda x: int(x * opacity))
+    # Scale the alpha channel through a lookup table
+    opacity_lut = [int(x * opacity) for x in range(256)]
+    new_alpha = image.getchannel("A").point(opacity_lut)
 
-    # Create new image with modified alpha channel
-    result = Image.new("RGBA", image.size)
-    result.paste(image.convert("RGB"), (0, 0))
+    result = image.copy()
     result.putalpha(new_alpha)
 
     return result
 
 
+def has_transparency(image: Image.Image) -> bool:
+    if image.mode == "P":
+        return "transparency" in image.info
+    if image.mode not in ("RGBA", "LA", "PA"):
+        return False
+    return image.getchannel("A").getextrema()[0] < 255
+
+
+def downsample_image(image: Image.Image, width: int, height: int) -> Image.Image:
+    """
+    Shrinks the image keeping its aspect ratio until one side matches the box.
+    Images already smaller than the box are returned as they are.
+    """
+    scale = max(width / image.width, height / image.height)
+    if scale >= 1:
+        return image
+
+    new_size = (
+        max(1, round(image.width * scale)),
+        max(1, round(image.height * scale)),
+    )
+    return image.resize(new_size, Image.LANCZOS)
+
+
 def fit_image(
     image: Image.Image, width: int, height: int, object_fit: PptxObjectFitModel
 ) -> Image.Image:
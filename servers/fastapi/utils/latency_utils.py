@@ -0,0 +1,20 @@
+from typing import Dict, List
+
+# Recent samples are enough for the percentiles
+MAX_LATENCY_SAMPLES = 1000
+
+
+def record_latency(latencies: Dict[str, List[float]], key: str, seconds: float):
+    values = latencies.setdefault(key, [])
+    values.append(seconds)
+    del values[:-MAX_LATENCY_SAMPLES]
+
+
+def get_latency_stats(latencies: List[float]) -> dict:
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None}
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+    }
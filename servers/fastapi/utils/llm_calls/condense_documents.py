@@ -0,0 +1,132 @@
+import asyncio
+from typing import List, Optional
+
+from constants.llm import (
+    ADDITIONAL_CONTEXT_WINDOW_RATIO,
+    CHARS_PER_TOKEN,
+    DEFAULT_ADDITIONAL_CONTEXT_MAX_TOKENS,
+    DEFAULT_CONTEXT_CONDENSE_CONCURRENCY,
+    DEFAULT_MODEL_CONTEXT_WINDOW,
+    MODEL_CONTEXT_WINDOWS,
+)
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from services.llm_client import LLMClient
+from services.score_based_chunker import ScoreBasedChunker
+from utils.get_env import (
+    get_additional_context_max_tokens_env,
+    get_context_condense_concurrency_env,
+)
+from utils.llm_provider import get_model
+from utils.parsers import parse_int_or_default
+
+# Reduce rounds before the condensed context is truncated to the budget
+MAX_CONDENSE_ROUNDS = 3
+MIN_SUMMARY_TOKENS = 256
+MAX_CHUNK_TOKENS = 16_000
+
+system_prompt = """
+    You condense parts of documents that will be used to create a presentation.
+
+    - Keep headings, key facts, numbers, names, dates and conclusions.
+    - Drop repetition, boilerplate, navigation text and formatting noise.
+    - Keep the language of the original text.
+    - Return only the condensed text in markdown, without any commentary.
+"""
+
+
+def get_user_prompt(chunk: str, max_tokens: int):
+    return f"""
+        Condense the following text to at most {max_tokens} tokens.
+
+        **Text:**
+        {chunk}
+    """
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def get_model_context_window(model: str) -> int:
+    model = (model or "").lower()
+    for prefix, context_window in MODEL_CONTEXT_WINDOWS.items():
+        if model.startswith(prefix):
+            return context_window
+    return DEFAULT_MODEL_CONTEXT_WINDOW
+
+
+def get_additional_context_token_budget(model: str) -> int:
+    max_tokens = parse_int_or_default(
+        get_additional_context_max_tokens_env(),
+        DEFAULT_ADDITIONAL_CONTEXT_MAX_TOKENS,
+    )
+    return min(
+        int(get_model_context_window(model) * ADDITIONAL_CONTEXT_WINDOW_RATIO),
+        max_tokens,
+    )
+
+
+async def summarize_chunk(
+    client: LLMClient, model: str, chunk: str, max_tokens: int
+) -> str:
+    return await client.generate(
+        model=model,
+        messages=[
+            LLMSystemMessage(content=system_prompt),
+            LLMUserMessage(content=get_user_prompt(chunk, max_tokens)),
+        ],
+        max_tokens=max_tokens,
+    )
+
+
+async def condense_documents(
+    documents: List[str], model: Optional[str] = None
+) -> str:
+    """
+    Joins documents for the outline prompt. If they exceed the token budget
+    of the model, chunks are summarized in parallel and the summaries are
+    condensed again until they fit.
+    """
+    context = "\n\n".join(documents)
+    model = model or get_model()
+    budget = get_additional_context_token_budget(model)
+    if estimate_tokens(context) <= budget:
+        return context
+
+    client = LLMClient()
+    chunker = ScoreBasedChunker()
+    semaphore = asyncio.Semaphore(
+        parse_int_or_default(
+            get_context_condense_concurrency_env(),
+            DEFAULT_CONTEXT_CONDENSE_CONCURRENCY,
+        )
+    )
+    chunk_tokens = min(get_model_context_window(model) // 2, MAX_CHUNK_TOKENS)
+
+    async def condense_chunk(chunk: str, max_tokens: int) -> str:
+        async with semaphore:
+            try:
+                return await summarize_chunk(client, model, chunk, max_tokens)
+            except Exception as e:
+                # Keep the start of the chunk rather than losing it
+                print(f"Failed to condense document chunk: {e}")
+                return chunk[: max_tokens * CHARS_PER_TOKEN]
+
+    for round_index in range(MAX_CONDENSE_ROUNDS):
+        chunks = await asyncio.to_thread(
+            chunker.get_sized_chunks, context, chunk_tokens * CHARS_PER_TOKEN
+        )
+        summary_tokens = max(MIN_SUMMARY_TOKENS, budget // len(chunks))
+        print(
+            f"Condensing {estimate_tokens(context)} tokens of documents in "
+            f"{len(chunks)} chunks to fit {budget} tokens (round {round_index + 1})"
+        )
+
+        summaries = await asyncio.gather(
+            *[condense_chunk(chunk, summary_tokens) for chunk in chunks]
+        )
+        context = "\n\n".join(summaries)
+        if estimate_tokens(context) <= budget:
+            return context
+
+    return context[: budget * CHARS_PER_TOKEN]
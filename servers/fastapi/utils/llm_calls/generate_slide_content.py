@@ -1,12 +1,19 @@
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional
+import dirtyjson
+from fastapi import HTTPException
 from models.llm_message import LLMSystemMessage, LLMUserMessage
 from models.presentation_layout import SlideLayoutModel
 from models.presentation_outline_model import SlideOutlineModel
+from services.document_retrieval_service import DOCUMENT_RETRIEVAL_SERVICE
 from services.llm_client import LLMClient
 from utils.llm_client_error_handler import handle_llm_client_exceptions
 from utils.llm_provider import get_model
+from utils.partial_json import JsonStringFieldScanner
 from utils.schema_utils import add_field_in_schema, remove_fields_from_schema
+import uuid
+
+SLIDE_ASSET_FIELDS = ["__image_prompt__", "__icon_query__"]
 
 
 def get_system_prompt(
@@ -43,6 +50,7 @@ def get_system_prompt(
         - Generate content as per the given tone.
         - Be very careful with number of words to generate for given field. As generating more than max characters will overflow in the design. So, analyze early and never generate more characters than allowed.
         - Do not add emoji in the content.
+        - If excerpts from uploaded documents are provided, use them for facts and figures, but keep the slide about its outline.
         - Metrics should be in abbreviated form with least possible characters. Do not add long sequence of words for metrics.
         - For verbosity:
             - If verbosity is 'concise', then generate description as 1/3 or lower of the max character limit. Don't worry if you miss content or context.
@@ -64,7 +72,10 @@ def get_system_prompt(
     """
 
 
-def get_user_prompt(outline: str, language: str):
+def get_user_prompt(
+    outline: str, language: str, document_excerpts: Optional[List[str]] = None
+):
+    excerpts = "\n\n---\n\n".join(document_excerpts) if document_excerpts else ""
     return f"""
         ## Current Date and Time
         {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
@@ -77,6 +88,9 @@ def get_user_prompt(outline: str, language: str):
 
         ## Slide Outline
         {outline}
+
+        {"## Relevant Excerpts From Uploaded Documents" if document_excerpts else ""}
+        {excerpts}
     """
 
 
@@ -86,6 +100,7 @@ def get_messages(
     tone: Optional[str] = None,
     verbosity: Optional[str] = None,
     instructions: Optional[str] = None,
+    document_excerpts: Optional[List[str]] = None,
 ):
 
     return [
@@ -93,7 +108,7 @@ def get_messages(
             content=get_system_prompt(tone, verbosity, instructions),
         ),
         LLMUserMessage(
-            content=get_user_prompt(outline, language),
+            content=get_user_prompt(outline, language, document_excerpts),
         ),
     ]
 
@@ -105,10 +120,25 @@ async def get_slide_content_from_type_and_outline(
     tone: Optional[str] = None,
     verbosity: Optional[str] = None,
     instructions: Optional[str] = None,
+    presentation_id: Optional[uuid.UUID] = None,
+    prefetch_asset: Optional[Callable[[str, str], None]] = None,
 ):
+    """
+    If presentation_id is given, excerpts of its uploaded documents that are
+    relevant to the outline are added to the prompt.
+
+    If prefetch_asset is given, the response is streamed and prefetch_asset is
+    called with each image prompt and icon query as soon as it is complete.
+    """
     client = LLMClient()
     model = get_model()
 
+    document_excerpts = None
+    if presentation_id:
+        document_excerpts = await DOCUMENT_RETRIEVAL_SERVICE.search(
+            presentation_id, outline.content
+        )
+
     response_schema = remove_fields_from_schema(
         slide_layout.json_schema, ["__image_url__", "__icon_url__"]
     )
@@ -125,20 +155,44 @@ async def get_slide_content_from_type_and_outline(
         True,
     )
 
+    messages = get_messages(
+        outline.content,
+        language,
+        tone,
+        verbosity,
+        instructions,
+        document_excerpts,
+    )
+
     try:
-        response = await client.generate_structured(
+        if not prefetch_asset:
+            return await client.generate_structured(
+                model=model,
+                messages=messages,
+                response_format=response_schema,
+                strict=False,
+            )
+
+        # Asset fields usually close before the text of the slide is done
+        scanner = JsonStringFieldScanner(SLIDE_ASSET_FIELDS)
+        chunks = []
+        async for chunk in client.stream_structured(
             model=model,
-            messages=get_messages(
-                outline.content,
-                language,
-                tone,
-                verbosity,
-                instructions,
-            ),
+            messages=messages,
             response_format=response_schema,
             strict=False,
-        )
-        return response
+        ):
+            chunks.append(chunk)
+            for key, value in scanner.feed(chunk):
+                prefetch_asset(key, value)
+
+        response_text = "".join(chunks)
+        if not response_text.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="LLM did not return any content",
+            )
+        return dict(dirtyjson.loads(response_text))
 
     except Exception as e:
         raise handle_llm_client_exceptions(e)
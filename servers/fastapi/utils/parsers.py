@@ -2,3 +2,17 @@ def parse_bool_or_none(value: str | None) -> bool | None:
     if value is None:
         return None
     return value.lower() == "true"
+
+
+def parse_int_or_default(value: str | None, default: int) -> int:
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+def parse_float_or_default(value: str | None, default: float) -> float:
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
@@ -0,0 +1,64 @@
+import json
+from typing import Iterable, List, Tuple
+
+
+class JsonStringFieldScanner:
+    """
+    Finds string fields with the given keys, at any depth, in a JSON document
+    fed in chunks as it is streamed. Each field is returned by the feed call
+    in which its value closes, long before the document is complete.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = set(keys)
+        self._containers: List[str] = []
+        self._expect_key = False
+        self._in_string = False
+        self._escaped = False
+        self._string_is_key = False
+        self._string_chars: List[str] = []
+        self._last_key = None
+
+    def _is_in_object(self) -> bool:
+        return bool(self._containers) and self._containers[-1] == "{"
+
+    def _close_string(self, fields: List[Tuple[str, str]]):
+        raw = "".join(self._string_chars)
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            value = raw
+
+        if self._string_is_key:
+            self._last_key = value
+        elif self._last_key in self.keys and self._is_in_object():
+            fields.append((self._last_key, value))
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        fields = []
+        for char in chunk:
+            if self._in_string:
+                if char == '"' and not self._escaped:
+                    self._in_string = False
+                    self._close_string(fields)
+                    continue
+                self._escaped = char == "\\" and not self._escaped
+                self._string_chars.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = self._expect_key
+                self._string_chars = []
+            elif char in "{[":
+                self._containers.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]":
+                if self._containers:
+                    self._containers.pop()
+                self._expect_key = False
+            elif char == ":":
+                self._expect_key = False
+            elif char == ",":
+                self._expect_key = self._is_in_object()
+        return fields
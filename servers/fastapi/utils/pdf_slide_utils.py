@@ -0,0 +1,88 @@
+import os
+import re
+import shutil
+import uuid
+from typing import List, Optional, Tuple
+
+from services.documents_loader import DocumentsLoader
+from services.image_rendition_service import IMAGE_RENDITION_SERVICE
+from services.pdf_page_image_service import PDF_PAGE_IMAGE_SERVICE
+from utils.asset_directory_utils import get_images_directory
+
+
+async def save_pdf_slide_screenshots(
+    pdf_path: str, temp_dir: str, lazy: bool = False
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Renders the PDF pages into the images directory.
+    Returns screenshot and thumbnail URLs of each page.
+
+    In lazy mode only thumbnails are rendered, and screenshot URLs point to
+    the page endpoint, which renders each full page on its first request.
+    """
+    images_dir = get_images_directory()
+    presentation_id = uuid.uuid4()
+    presentation_images_dir = os.path.join(images_dir, str(presentation_id))
+    os.makedirs(presentation_images_dir, exist_ok=True)
+
+    if lazy:
+        thumbnail_paths = await PDF_PAGE_IMAGE_SERVICE.render_thumbnails(
+            pdf_path, presentation_images_dir
+        )
+        return [
+            (
+                f"/api/v1/ppt/pdf-slides/{presentation_id}/pages/{i}",
+                f"/app_data/images/{presentation_id}/{os.path.basename(thumbnail_path)}",
+            )
+            for i, thumbnail_path in enumerate(thumbnail_paths, 1)
+        ]
+
+    screenshot_paths = await DocumentsLoader.get_page_images_from_pdf_async(
+        pdf_path, temp_dir
+    )
+    print(f"Generated {len(screenshot_paths)} PDF screenshots")
+
+    screenshot_urls = []
+    permanent_screenshot_paths = []
+    for i, screenshot_path in enumerate(screenshot_paths, 1):
+        # Move screenshot to permanent location
+        screenshot_filename = f"slide_{i}{os.path.splitext(screenshot_path)[1]}"
+        permanent_screenshot_path = os.path.join(
+            presentation_images_dir, screenshot_filename
+        )
+
+        if os.path.exists(screenshot_path) and os.path.getsize(screenshot_path) > 0:
+            # Use shutil.copy2 instead of os.rename to handle cross-device moves
+            shutil.copy2(screenshot_path, permanent_screenshot_path)
+            screenshot_url = f"/app_data/images/{presentation_id}/{screenshot_filename}"
+            thumbnail_url = IMAGE_RENDITION_SERVICE.get_rendition_url(
+                permanent_screenshot_path, "thumbnail"
+            )
+            permanent_screenshot_paths.append(permanent_screenshot_path)
+        else:
+            # Fallback if screenshot generation failed or file is empty placeholder
+            screenshot_url = "/static/images/placeholder.jpg"
+            thumbnail_url = None
+
+        screenshot_urls.append((screenshot_url, thumbnail_url))
+
+    IMAGE_RENDITION_SERVICE.schedule_renditions(permanent_screenshot_paths)
+    return screenshot_urls
+
+
+LAZY_PAGE_URL_PATTERN = re.compile(
+    r"^/api/v1/ppt/pdf-slides/(?P<presentation_id>[0-9a-fA-F-]{36})/pages/(?P<page_number>\d+)$"
+)
+
+
+async def get_lazy_page_image_path(page_url: str) -> Optional[str]:
+    """
+    Resolves a page URL returned in lazy mode to its image, rendering it if needed.
+    """
+    match = LAZY_PAGE_URL_PATTERN.match(page_url)
+    if not match:
+        return None
+    return await PDF_PAGE_IMAGE_SERVICE.get_page_image(
+        os.path.join(get_images_directory(), match.group("presentation_id")),
+        int(match.group("page_number")),
+    )
@@ -1,5 +1,5 @@
 import asyncio
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from models.image_prompt import ImagePrompt
 from models.sql.image_asset import ImageAsset
 from models.sql.slide import SlideModel
@@ -12,12 +12,17 @@ from utils.dict_utils import get_dict_at_path, get_dict_paths_with_key, set_dict
 async def process_slide_and_fetch_assets(
     image_generation_service: ImageGenerationService,
     slide: SlideModel,
+    fetch_icons: bool = True,
 ) -> List[ImageAsset]:
+    """
+    Fetches images and icons of the slide and sets their urls in its content.
+    Pass fetch_icons=False when icons are fetched for a batch of slides with
+    process_slides_and_fetch_icons.
+    """
 
     async_tasks = []
 
     image_paths = get_dict_paths_with_key(slide.content, "__image_prompt__")
-    icon_paths = get_dict_paths_with_key(slide.content, "__icon_query__")
 
     for image_path in image_paths:
         __image_prompt__parent = get_dict_at_path(slide.content, image_path)
@@ -29,19 +34,14 @@ async def process_slide_and_fetch_assets(
             )
         )
 
-    for icon_path in icon_paths:
-        __icon_query__parent = get_dict_at_path(slide.content, icon_path)
-        async_tasks.append(
-            ICON_FINDER_SERVICE.search_icons(__icon_query__parent["__icon_query__"])
-        )
+    if fetch_icons:
+        async_tasks.append(process_slides_and_fetch_icons([slide]))
 
     results = await asyncio.gather(*async_tasks)
-    results.reverse()
 
     return_assets = []
-    for image_path in image_paths:
+    for image_path, result in zip(image_paths, results):
         image_dict = get_dict_at_path(slide.content, image_path)
-        result = results.pop()
         if isinstance(result, ImageAsset):
             return_assets.append(result)
             image_dict["__image_url__"] = result.path
@@ -49,14 +49,28 @@ async def process_slide_and_fetch_assets(
             image_dict["__image_url__"] = result
         set_dict_at_path(slide.content, image_path, image_dict)
 
-    for icon_path in icon_paths:
-        icon_dict = get_dict_at_path(slide.content, icon_path)
-        icon_dict["__icon_url__"] = results.pop()[0]
-        set_dict_at_path(slide.content, icon_path, icon_dict)
-
     return return_assets
 
 
+async def process_slides_and_fetch_icons(slides: List[SlideModel]):
+    """
+    Looks up the icons of all slides in one batched search and sets their urls.
+    """
+    icon_dicts = []
+    for slide in slides:
+        for icon_path in get_dict_paths_with_key(slide.content, "__icon_query__"):
+            icon_dicts.append(get_dict_at_path(slide.content, icon_path))
+
+    if not icon_dicts:
+        return
+
+    icon_urls = await ICON_FINDER_SERVICE.search_icons_batch(
+        [icon_dict["__icon_query__"] for icon_dict in icon_dicts]
+    )
+    for icon_dict, urls in zip(icon_dicts, icon_urls):
+        icon_dict["__icon_url__"] = urls[0]
+
+
 async def process_old_and_new_slides_and_fetch_assets(
     image_generation_service: ImageGenerationService,
     old_slide_content: dict,
@@ -100,8 +114,8 @@ async def process_old_and_new_slides_and_fetch_assets(
     async_image_fetch_tasks = []
     new_images_fetch_status = []
 
-    # Creates async tasks for fetching new icons
-    async_icon_fetch_tasks = []
+    # Queries of new icons to search in one batch
+    new_icon_queries = []
     new_icons_fetch_status = []
 
     # Creates async tasks for fetching new images
@@ -135,13 +149,13 @@ async def process_old_and_new_slides_and_fetch_assets(
             new_icons_fetch_status.append(False)
             continue
 
-        async_icon_fetch_tasks.append(
-            ICON_FINDER_SERVICE.search_icons(new_icon["__icon_query__"])
-        )
+        new_icon_queries.append(new_icon["__icon_query__"])
         new_icons_fetch_status.append(True)
 
-    new_images = await asyncio.gather(*async_image_fetch_tasks)
-    new_icons = await asyncio.gather(*async_icon_fetch_tasks)
+    new_images, new_icons = await asyncio.gather(
+        asyncio.gather(*async_image_fetch_tasks),
+        ICON_FINDER_SERVICE.search_icons_batch(new_icon_queries),
+    )
 
     # list of new assets
     new_assets = []
@@ -157,9 +171,10 @@ async def process_old_and_new_slides_and_fetch_assets(
                 image_url = fetched_image
             new_image_dicts[i]["__image_url__"] = image_url
 
-    for i, new_icon in enumerate(new_icons):
-        if new_icons_fetch_status[i]:
-            new_icon_dicts[i]["__icon_url__"] = new_icons[i][0]
+    fetched_icons = iter(new_icons)
+    for new_icon_dict, fetched in zip(new_icon_dicts, new_icons_fetch_status):
+        if fetched:
+            new_icon_dict["__icon_url__"] = next(fetched_icons)[0]
 
     for i, new_image_dict in enumerate(new_image_dicts):
         set_dict_at_path(new_slide_content, new_image_dict_paths[i], new_image_dict)
@@ -170,6 +185,43 @@ async def process_old_and_new_slides_and_fetch_assets(
     return new_assets
 
 
+class SlideAssetsPrefetcher:
+    """
+    Starts image and icon lookups for the prompts and queries of slides still
+    being generated. They share requests and caches with the lookups of
+    process_slide_and_fetch_assets and process_slides_and_fetch_icons, which
+    then find them done or in flight.
+    """
+
+    def __init__(self, image_generation_service: ImageGenerationService):
+        self.image_generation_service = image_generation_service
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def _prefetch(self, coroutine):
+        try:
+            await coroutine
+        except Exception as e:
+            print(f"Failed to prefetch slide asset: {e}")
+
+    def prefetch(self, key: str, value: str):
+        if not isinstance(value, str) or not value.strip() or (key, value) in self._tasks:
+            return
+
+        if key == "__image_prompt__":
+            coroutine = self.image_generation_service.generate_image(
+                ImagePrompt(prompt=value)
+            )
+        elif key == "__icon_query__":
+            coroutine = ICON_FINDER_SERVICE.search_icons_batch([value])
+        else:
+            return
+        self._tasks[(key, value)] = asyncio.create_task(self._prefetch(coroutine))
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+
+
 def process_slide_add_placeholder_assets(slide: SlideModel):
 
     image_paths = get_dict_paths_with_key(slide.content, "__image_prompt__")
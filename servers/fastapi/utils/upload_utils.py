@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import List, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from constants.documents import (
+    DEFAULT_UPLOAD_MAX_SIZE_MB,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_FILE_SIGNATURES,
+)
+from models.upload_result import UploadResult
+import uuid
+
+
+def has_expected_signature(content_type: Optional[str], header: bytes) -> bool:
+    signatures = UPLOAD_FILE_SIGNATURES.get(content_type or "")
+    if not signatures:
+        return True
+    return all(
+        header[offset : offset + len(signature)] == signature
+        for offset, signature in signatures
+    )
+
+
+async def save_upload_file(
+    file: UploadFile,
+    path: str,
+    max_size_mb: int = DEFAULT_UPLOAD_MAX_SIZE_MB,
+    accepted_types: Optional[List[str]] = None,
+) -> UploadResult:
+    """
+    Copies an uploaded file to path in fixed size chunks, hashing it on the way.
+    Starlette has spooled the request body already, so only a declared size
+    over max_size_mb is rejected before reading. The copy stops once it
+    exceeds max_size_mb or its first bytes don't match its content type, and
+    nothing is left at path.
+    """
+    if accepted_types and file.content_type not in accepted_types:
+        raise HTTPException(
+            400,
+            detail=f"File '{file.filename}' not accepted. Accepted types: {accepted_types}",
+        )
+
+    max_size = max_size_mb * 1024 * 1024
+    size_error = HTTPException(
+        400,
+        detail=f"File '{file.filename}' exceeded max upload size of {max_size_mb} MB",
+    )
+    if file.size and file.size > max_size:
+        raise size_error
+
+    start = time.perf_counter()
+    hasher = hashlib.sha256()
+    size = 0
+    temp_path = f"{path}.{uuid.uuid4()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if size == 0 and not has_expected_signature(file.content_type, chunk):
+                    raise HTTPException(
+                        400,
+                        detail=f"File '{file.filename}' content does not match its type {file.content_type}",
+                    )
+
+                size += len(chunk)
+                if size > max_size:
+                    raise size_error
+
+                hasher.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    duration = time.perf_counter() - start
+    print(
+        f"Uploaded {file.filename}: {size / (1024 * 1024):.2f} MB in {duration:.2f}s "
+        f"({size / (1024 * 1024) / max(duration, 1e-6):.1f} MB/s)"
+    )
+
+    return UploadResult(
+        path=path, size=size, sha256=hasher.hexdigest(), duration=duration
+    )